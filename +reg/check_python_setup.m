@@ -13,6 +13,9 @@ function status = check_python_setup()
 %       3. Required packages installed (pdfplumber, pymupdf, pillow)
 %       4. Test extraction on sample PDF
 %
+%   Checks 2 and 3 come from a single reg.python_probe call, whose result
+%   is cached for the session and reused by reg.ingest_pdf_python.
+%
 %   DISPLAYS:
 %       - ✓ for passed checks
 %       - ✗ for failed checks
@@ -25,7 +28,7 @@ function status = check_python_setup()
 %           fprintf('Please complete Python setup first.\n');
 %       end
 %
-%   SEE ALSO: reg.ingest_pdf_python, docs/PDF_EXTRACTION_GUIDE.md
+%   SEE ALSO: reg.ingest_pdf_python, reg.python_probe, docs/PDF_EXTRACTION_GUIDE.md
 
 fprintf('\n========================================\n');
 fprintf('  Python Setup Checker for PDF Extraction\n');
@@ -54,22 +57,27 @@ end
 
 fprintf('[2/4] Checking Python version... ');
 
-cmd = sprintf('%s --version', python_exe);
-[exit_code, output] = system(cmd);
-
-if exit_code ~= 0
+% One probe (cached for the session) reports the version and packages;
+% a failing cached result is refreshed in case packages were just installed
+try
+    info = reg.python_probe(python_exe);
+    if ~info.ok
+        info = reg.python_probe(python_exe, 'Refresh', true);
+    end
+catch ME
     fprintf('✗ FAILED\n');
-    fprintf('   Could not determine Python version.\n\n');
+    fprintf('   Could not determine Python version.\n');
+    fprintf('   %s\n\n', ME.message);
     status = false;
     return;
 end
 
 % Parse version
-version_match = regexp(output, 'Python (\d+)\.(\d+)\.(\d+)', 'tokens');
+version_match = regexp(info.python.version, '(\d+)\.(\d+)', 'tokens');
 
 if isempty(version_match)
     fprintf('✗ FAILED\n');
-    fprintf('   Could not parse Python version from: %s\n', output);
+    fprintf('   Could not parse Python version from: %s\n', info.python.version);
     status = false;
     return;
 end
@@ -91,31 +99,22 @@ end
 
 fprintf('[3/4] Checking required packages... \n');
 
-required = struct(...
-    'pdfplumber', 'pdfplumber', ...
-    'pymupdf', 'fitz', ...
-    'pillow', 'PIL');
-
-package_names = fieldnames(required);
-missing = {};
+package_names = {'pdfplumber', 'pymupdf', 'pillow'};
 
 for i = 1:numel(package_names)
     pkg_name = package_names{i};
-    import_name = required.(pkg_name);
 
     fprintf('   - %s: ', pkg_name);
 
-    cmd = sprintf('%s -c "import %s"', python_exe, import_name);
-    [exit_code, ~] = system(cmd);
-
-    if exit_code == 0
-        fprintf('✓ installed\n');
-    else
+    if ismember(pkg_name, info.missing)
         fprintf('✗ missing\n');
-        missing{end+1} = pkg_name;
+    else
+        fprintf('✓ installed (%s)\n', info.packages.(pkg_name));
     end
 end
 
+missing = info.missing;
+
 if ~isempty(missing)
     fprintf('\n   Missing packages: %s\n', strjoin(missing, ', '));
     fprintf('\n   Install with:\n');
@@ -14,6 +14,23 @@ function [textStr, metadata] = ingest_pdf_python(pdfPath, varargin)
 %       'PythonExe'     - Path to Python executable (auto-detected)
 %       'Verbose'       - Display progress (default: true)
 %       'CleanupTemp'   - Delete temporary files (default: true)
+%       'Workers'       - Python worker processes for page-parallel
+%                         extraction (default: 1 = serial, 0 = all cores)
+%       'Backend'       - Layout engine: 'pdfplumber' (default) or
+%                         'pymupdf' (single pass per page, much faster)
+%       'Tables'        - Table extraction: 'always' (default), 'auto'
+%                         (only pages with ruling lines) or 'never'
+%       'Triage'        - Route pages to column splitting and formula
+%                         detection only when cheap signals call for it;
+%                         faster, but page text can differ (default: false)
+%       'UseCache'      - Reuse cached results for unchanged PDFs (default: true)
+%       'CacheDir'      - Extraction cache directory (default: Python
+%                         default, ~/.cache/regclassifier/pdf_extract)
+%       'Server'        - 'host:port' of a running extraction server
+%                         (extract_regulatory_pdf.py --serve --port N).
+%                         Skips Python discovery and interpreter startup;
+%                         'Workers' and 'CacheDir' are then set on the server.
+%       'ServerTimeout' - Seconds to wait for a server response (default: 600)
 %
 %   OUTPUTS:
 %       textStr  - Extracted text as string
@@ -40,7 +57,15 @@ function [textStr, metadata] = ingest_pdf_python(pdfPath, varargin)
 %           % Process text...
 %       end
 %
-%   EXAMPLE 3: Use specific Python environment
+%   EXAMPLE 3: Reuse one warm extraction server for a whole folder
+%       % In a terminal: python python/extract_regulatory_pdf.py --serve --workers 0 --port 8765
+%       for i = 1:numel(pdf_files)
+%           [text, meta] = reg.ingest_pdf_python(...
+%               fullfile(pdf_files(i).folder, pdf_files(i).name), ...
+%               'Server', 'localhost:8765');
+%       end
+%
+%   EXAMPLE 4: Use specific Python environment
 %       [text, meta] = reg.ingest_pdf_python('document.pdf', ...
 %           'PythonExe', 'C:\Anaconda3\envs\regclassifier\python.exe');
 %
@@ -48,7 +73,7 @@ function [textStr, metadata] = ingest_pdf_python(pdfPath, varargin)
 %       If this function fails, run: reg.check_python_setup()
 %       This will diagnose issues and provide fix instructions.
 %
-%   SEE ALSO: reg.check_python_setup, reg.ingest_pdfs, extractFileText
+%   SEE ALSO: reg.check_python_setup, reg.python_probe, reg.ingest_pdfs, extractFileText
 
 % Parse arguments
 p = inputParser;
@@ -58,6 +83,14 @@ addParameter(p, 'IncludeFormulas', true, @islogical);
 addParameter(p, 'PythonExe', '', @(x) ischar(x) || isstring(x));
 addParameter(p, 'Verbose', true, @islogical);
 addParameter(p, 'CleanupTemp', true, @islogical);
+addParameter(p, 'Workers', 1, @(x) isnumeric(x) && isscalar(x) && x >= 0);
+addParameter(p, 'Backend', 'pdfplumber', @(x) ismember(x, {'pdfplumber', 'pymupdf'}));
+addParameter(p, 'Tables', 'always', @(x) ismember(x, {'auto', 'always', 'never'}));
+addParameter(p, 'Triage', false, @islogical);
+addParameter(p, 'UseCache', true, @islogical);
+addParameter(p, 'CacheDir', '', @(x) ischar(x) || isstring(x));
+addParameter(p, 'Server', '', @(x) ischar(x) || isstring(x));
+addParameter(p, 'ServerTimeout', 600, @(x) isnumeric(x) && isscalar(x) && x > 0);
 parse(p, pdfPath, varargin{:});
 
 format_type = p.Results.Format;
@@ -65,6 +98,14 @@ include_formulas = p.Results.IncludeFormulas;
 python_exe = p.Results.PythonExe;
 verbose = p.Results.Verbose;
 cleanup_temp = p.Results.CleanupTemp;
+workers = p.Results.Workers;
+backend = p.Results.Backend;
+tables = p.Results.Tables;
+triage = p.Results.Triage;
+use_cache = p.Results.UseCache;
+cache_dir = char(p.Results.CacheDir);
+server = char(p.Results.Server);
+server_timeout = p.Results.ServerTimeout;
 
 % Convert to absolute path
 pdfPath = char(pdfPath);
@@ -74,94 +115,118 @@ end
 [~, fname, ext] = fileparts(pdfPath);
 pdfPath = GetFullPath(pdfPath);  % Use absolute path
 
-%% Find Python executable
+%% Create temporary output file
 
-if isempty(python_exe)
-    python_exe = find_python_executable();
-    if isempty(python_exe)
-        error('reg:ingest_pdf_python:PythonNotFound', ...
-            ['Python not found. Please install Python 3.7+ or specify path:\n', ...
-             '  ingest_pdf_python(..., ''PythonExe'', ''path/to/python'')\n\n', ...
-             'Installation guide: docs/PYTHON_PDF_SETUP.md']);
-    end
+temp_dir = tempdir;
+if strcmp(format_type, 'json')
+    temp_output = fullfile(temp_dir, sprintf('pdf_extract_%s_%s.json', fname, datestr(now, 'yyyymmdd_HHMMSS')));
+else
+    temp_output = fullfile(temp_dir, sprintf('pdf_extract_%s_%s.txt', fname, datestr(now, 'yyyymmdd_HHMMSS')));
 end
 
-if verbose
-    fprintf('Using Python: %s\n', python_exe);
-end
+%% Run extraction
 
-%% Check if required packages are installed
+if ~isempty(server)
+    % Extract via a running extraction server
 
-missing_packages = check_python_packages(python_exe);
-if ~isempty(missing_packages)
-    error('reg:ingest_pdf_python:MissingPackages', ...
-        ['Missing Python packages: %s\n\n', ...
-         'Install with: pip install %s\n\n', ...
-         'Full setup guide: docs/PYTHON_PDF_SETUP.md'], ...
-        strjoin(missing_packages, ', '), strjoin(missing_packages, ' '));
-end
+    extract_via_server(server, server_timeout, pdfPath, temp_output, format_type, ...
+        include_formulas, backend, tables, triage, use_cache, verbose, cleanup_temp);
+else
+    % Find Python executable
 
-%% Find extraction script
+    if isempty(python_exe)
+        python_exe = find_python_executable();
+        if isempty(python_exe)
+            error('reg:ingest_pdf_python:PythonNotFound', ...
+                ['Python not found. Please install Python 3.7+ or specify path:\n', ...
+                 '  ingest_pdf_python(..., ''PythonExe'', ''path/to/python'')\n\n', ...
+                 'Installation guide: docs/PYTHON_PDF_SETUP.md']);
+        end
+    end
 
-script_path = fullfile(fileparts(mfilename('fullpath')), '..', 'python', 'extract_regulatory_pdf.py');
-if ~isfile(script_path)
-    error('reg:ingest_pdf_python:ScriptNotFound', ...
-        'Python extraction script not found: %s', script_path);
-end
-script_path = GetFullPath(script_path);
+    if verbose
+        fprintf('Using Python: %s\n', python_exe);
+    end
 
-%% Create temporary output file
+    % Check if required packages are installed (probed once per session)
 
-temp_dir = tempdir;
-if strcmp(format_type, 'json')
-    temp_output = fullfile(temp_dir, sprintf('pdf_extract_%s_%s.json', fname, datestr(now, 'yyyymmdd_HHMMSS')));
-else
-    temp_output = fullfile(temp_dir, sprintf('pdf_extract_%s_%s.txt', fname, datestr(now, 'yyyymmdd_HHMMSS')));
-end
+    missing_packages = reg.python_probe(python_exe).missing;
+    if ~isempty(missing_packages)
+        error('reg:ingest_pdf_python:MissingPackages', ...
+            ['Missing Python packages: %s\n\n', ...
+             'Install with: pip install %s\n\n', ...
+             'Full setup guide: docs/PYTHON_PDF_SETUP.md'], ...
+            strjoin(missing_packages, ', '), strjoin(missing_packages, ' '));
+    end
 
-%% Build command
+    % Find extraction script
 
-cmd_args = {python_exe, script_path, pdfPath, '--output', temp_output, '--format', format_type};
+    script_path = fullfile(fileparts(mfilename('fullpath')), '..', 'python', 'extract_regulatory_pdf.py');
+    if ~isfile(script_path)
+        error('reg:ingest_pdf_python:ScriptNotFound', ...
+            'Python extraction script not found: %s', script_path);
+    end
+    script_path = GetFullPath(script_path);
 
-if ~include_formulas
-    cmd_args{end+1} = '--no-formulas';
-end
+    % Build command
 
-if ~verbose
-    cmd_args{end+1} = '--quiet';
-end
+    cmd_args = {python_exe, script_path, pdfPath, '--output', temp_output, '--format', format_type, ...
+        '--backend', backend, '--tables', tables};
 
-% Join command
-if ispc
-    % Windows: use double quotes
-    cmd_str = strjoin(cellfun(@(x) sprintf('"%s"', x), cmd_args, 'UniformOutput', false), ' ');
-else
-    % Unix: use single quotes for paths with spaces
-    cmd_str = strjoin(cmd_args, ' ');
-end
+    if ~include_formulas
+        cmd_args{end+1} = '--no-formulas';
+    end
 
-%% Execute Python script
+    if ~verbose
+        cmd_args{end+1} = '--quiet';
+    end
 
-if verbose
-    fprintf('Extracting PDF: %s\n', fname);
-    fprintf('Command: %s\n', cmd_str);
-end
+    if triage
+        cmd_args{end+1} = '--triage';
+    end
 
-[status, output] = system(cmd_str);
+    if ~use_cache
+        cmd_args{end+1} = '--no-cache';
+    elseif ~isempty(cache_dir)
+        cmd_args(end+1:end+2) = {'--cache-dir', cache_dir};
+    end
 
-if status ~= 0
-    % Cleanup temp file if it exists
-    if isfile(temp_output) && cleanup_temp
-        delete(temp_output);
+    if workers ~= 1
+        cmd_args(end+1:end+2) = {'--workers', sprintf('%d', workers)};
     end
 
-    error('reg:ingest_pdf_python:ExtractionFailed', ...
-        'Python extraction failed with status %d.\n\nOutput:\n%s\n\nCommand:\n%s', ...
-        status, output, cmd_str);
-end
+    % Join command
+    if ispc
+        % Windows: use double quotes
+        cmd_str = strjoin(cellfun(@(x) sprintf('"%s"', x), cmd_args, 'UniformOutput', false), ' ');
+    else
+        % Unix: use single quotes for paths with spaces
+        cmd_str = strjoin(cmd_args, ' ');
+    end
+
+    % Execute Python script
+
+    if verbose
+        fprintf('Extracting PDF: %s\n', fname);
+        fprintf('Command: %s\n', cmd_str);
+    end
+
+    [status, output] = system(cmd_str);
+
+    if status ~= 0
+        % Cleanup temp file if it exists
+        if isfile(temp_output) && cleanup_temp
+            delete(temp_output);
+        end
 
-if verbose && ~isempty(output)
-    fprintf('%s\n', output);
+        error('reg:ingest_pdf_python:ExtractionFailed', ...
+            'Python extraction failed with status %d.\n\nOutput:\n%s\n\nCommand:\n%s', ...
+            status, output, cmd_str);
+    end
+
+    if verbose && ~isempty(output)
+        fprintf('%s\n', output);
+    end
 end
 
 %% Read extracted content
@@ -192,6 +257,9 @@ try
         metadata.total_formulas = data.metadata.total_formulas;
         metadata.pages = data.pages;
         metadata.formulas = data.formulas;
+        if isfield(data.metadata, 'cache')
+            metadata.cache = data.metadata.cache;
+        end
 
     else
         % Read plain text
@@ -233,6 +301,48 @@ end
 
 %% Helper Functions
 
+function extract_via_server(server, timeout, pdfPath, temp_output, format_type, ...
+    include_formulas, backend, tables, triage, use_cache, verbose, cleanup_temp)
+% Send one extract request to a persistent extraction server
+
+parts = split(string(server), ":");
+if numel(parts) ~= 2 || isnan(str2double(parts(2)))
+    error('reg:ingest_pdf_python:InvalidServer', ...
+        'Server must be given as ''host:port'', got: %s', server);
+end
+
+request = struct('id', 1, 'op', 'extract', 'input', pdfPath, 'output', temp_output, ...
+    'format', format_type, 'include_formulas', include_formulas, ...
+    'backend', backend, 'tables', tables, 'triage', triage, 'cache', use_cache);
+% Workers and CacheDir are fixed when the server is started
+
+if verbose
+    fprintf('Extracting PDF via server %s: %s\n', server, pdfPath);
+end
+
+try
+    client = tcpclient(char(parts(1)), str2double(parts(2)), 'Timeout', timeout);
+    writeline(client, jsonencode(request));
+    response = jsondecode(char(readline(client)));
+    clear client
+catch ME
+    error('reg:ingest_pdf_python:ServerUnavailable', ...
+        'Could not reach extraction server %s: %s', server, ME.message);
+end
+
+if isempty(response) || ~response.ok
+    if isfile(temp_output) && cleanup_temp
+        delete(temp_output);
+    end
+    message = '';
+    if isfield(response, 'error')
+        message = response.error;
+    end
+    error('reg:ingest_pdf_python:ExtractionFailed', ...
+        'Extraction server failed for %s:\n%s', pdfPath, message);
+end
+end
+
 function python_exe = find_python_executable()
 % Find Python executable on system
 
@@ -288,28 +398,3 @@ for i = 1:numel(common_paths)
     end
 end
 end
-
-function missing = check_python_packages(python_exe)
-% Check if required Python packages are installed
-
-required_packages = {'pdfplumber', 'fitz', 'PIL'};  % fitz=pymupdf, PIL=pillow
-missing = {};
-
-for i = 1:numel(required_packages)
-    pkg = required_packages{i};
-    cmd = sprintf('%s -c "import %s"', python_exe, pkg);
-
-    [status, ~] = system(cmd);
-
-    if status ~= 0
-        % Map import names to package names
-        if strcmp(pkg, 'fitz')
-            missing{end+1} = 'pymupdf';
-        elseif strcmp(pkg, 'PIL')
-            missing{end+1} = 'pillow';
-        else
-            missing{end+1} = pkg;
-        end
-    end
-end
-end
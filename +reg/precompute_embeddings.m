@@ -1,5 +1,25 @@
-function E = precompute_embeddings(textStr, C)
+function E = precompute_embeddings(textStr, C, varargin)
 %PRECOMPUTE_EMBEDDINGS Compute base sentence embeddings using config backend.
+%   E = PRECOMPUTE_EMBEDDINGS(textStr, C, 'Representative', rep) embeds only
+%   the texts unique(rep) points at and gives row i the embedding of
+%   row rep(i). Use it with the cluster map from python/near_duplicates.py:
+%       M = readtable('clusters.csv', 'TextType', 'string');
+%       [~, rep] = ismember(M.representative, M.id);
+p = inputParser;
+addParameter(p, 'Representative', [], @(x) isempty(x) || (isnumeric(x) && isvector(x)));
+parse(p, varargin{:});
+rep = p.Results.Representative;
+if ~isempty(rep)
+    textStr = string(textStr);
+    if numel(rep) ~= numel(textStr)
+        error('reg:precompute_embeddings:RepresentativeSize', ...
+            'Representative must have one entry per text (%d), got %d', numel(textStr), numel(rep));
+    end
+    [reps, ~, slot] = unique(rep(:));
+    E = reg.precompute_embeddings(textStr(reps), C);
+    E = E(slot, :);
+    return;
+end
 try
     % TODO: load knob definitions into C.knobs
     % if ~isfield(C,'knobs'), C.knobs = reg.load_knobs(); end
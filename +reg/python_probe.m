@@ -0,0 +1,74 @@
+function info = python_probe(python_exe, varargin)
+%PYTHON_PROBE Describe a Python setup for PDF extraction (cached per session).
+%   info = PYTHON_PROBE(python_exe)
+%   runs "extract_regulatory_pdf.py --probe" with the given interpreter and
+%   returns its JSON report as a struct. The probe looks packages up
+%   without importing them, so it costs one short interpreter start. The
+%   result is cached per interpreter for the rest of the MATLAB session,
+%   so reg.check_python_setup and reg.ingest_pdf_python probe only once.
+%
+%   NAME-VALUE ARGUMENTS:
+%       'Refresh' - Probe again even if a cached result exists, e.g. after
+%                   pip install (default: false)
+%
+%   OUTPUTS:
+%       info - Struct with fields:
+%           extractor_version - Extractor version string
+%           python   - version, implementation, executable, platform
+%           packages - Installed version per package ([] if missing):
+%                      pdfplumber, pymupdf, pillow, numpy
+%           backends - Logical per backend: pdfplumber, pymupdf
+%           features - Logical: tables, corpus, index, geometry
+%           missing  - Cell array of missing required packages (pip names)
+%           ok       - true if all required packages are installed
+%
+%   EXAMPLE:
+%       info = reg.python_probe('python3');
+%       if ~info.ok
+%           fprintf('pip install %s\n', strjoin(info.missing, ' '));
+%       end
+%
+%   SEE ALSO: reg.check_python_setup, reg.ingest_pdf_python
+
+p = inputParser;
+addRequired(p, 'python_exe', @(x) ischar(x) || isstring(x));
+addParameter(p, 'Refresh', false, @islogical);
+parse(p, python_exe, varargin{:});
+python_exe = char(python_exe);
+
+persistent cache
+if isempty(cache)
+    cache = containers.Map('KeyType', 'char', 'ValueType', 'any');
+end
+
+if ~p.Results.Refresh && isKey(cache, python_exe)
+    info = cache(python_exe);
+    return;
+end
+
+script_path = fullfile(fileparts(mfilename('fullpath')), '..', 'python', 'extract_regulatory_pdf.py');
+if ~isfile(script_path)
+    error('reg:python_probe:ScriptNotFound', ...
+        'Python extraction script not found: %s', script_path);
+end
+
+if ispc
+    cmd = sprintf('"%s" "%s" --probe', python_exe, script_path);
+else
+    cmd = sprintf('%s %s --probe', python_exe, script_path);
+end
+[status, output] = system(cmd);
+
+% system() also captures stderr; the report is the JSON object in the output
+first = strfind(output, '{');
+last = strfind(output, '}');
+if status ~= 0 || isempty(first) || isempty(last)
+    error('reg:python_probe:ProbeFailed', ...
+        'Python probe failed with status %d.\n\nOutput:\n%s\n\nCommand:\n%s', ...
+        status, output, cmd);
+end
+info = jsondecode(output(first(1):last(end)));
+info.missing = cellstr(string(info.missing));
+
+cache(python_exe) = info;
+end
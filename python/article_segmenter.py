@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Streaming Article/Annex segmentation of extracted regulation text.
+
+reg.fetch_crr_eba_parsed gets one text per article (with parsed article
+numbers) by crawling the EBA Single Rulebook. This module gets the same
+granularity offline from extractor pages. It reads page text line by line
+as pages stream in and recognizes EUR-Lex heading lines:
+
+    PART ONE / TITLE I / CHAPTER 1 / Section 1 / Sub-section 1
+    Article 4 / Article 92a
+    ANNEX / ANNEX I
+
+A heading must be a line of its own. If the next line continues a sentence
+(starts in lower case), it is a wrapped cross-reference and not a heading.
+Pages arrive in reading order (left column before right) and lines are
+carried across page boundaries, so articles that cross columns and pages
+come out whole. Only the current article is held in memory.
+
+Each record carries the article (or annex) number, its heading (e.g.
+"Definitions"), the enclosing part/title/chapter/section, the page span,
+the text and a hash of the whitespace-normalized text. Text before the
+first heading (citations, recitals) becomes one ``preamble`` record.
+Structural heading lines are kept as labels, not as article text.
+Comparing ``text_hash`` between two versions shows which articles to
+re-chunk, re-diff or re-embed.
+
+Usage:
+    with ArticleWriter('CRR.articles.ndjson') as writer:
+        for article in segment_pages('CRR', extractor.iter_pages()):
+            writer.write(article)
+
+or, from the command line, ``--articles`` next to any output format, and
+
+    python article_segmenter.py split CRR.json                # -> CRR.articles.ndjson
+    python article_segmenter.py compare CRR_2024.articles.ndjson CRR_2025.articles.ndjson
+"""
+
+import re
+import csv
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+ARTICLE_FIELDS = ('article_id', 'doc_id', 'kind', 'number', 'heading',
+                  'part', 'title', 'chapter', 'section', 'subsection',
+                  'page_start', 'page_end', 'text', 'text_hash')
+
+# Structural levels, outermost first; a heading resets the levels below it
+LEVELS = ('part', 'title', 'chapter', 'section', 'subsection')
+
+_ORDINALS = ('ONE|TWO|THREE|FOUR|FIVE|SIX|SEVEN|EIGHT|NINE|TEN|ELEVEN|TWELVE|'
+             'THIRTEEN|FOURTEEN|FIFTEEN|SIXTEEN|SEVENTEEN|EIGHTEEN|NINETEEN|TWENTY')
+
+_STRUCTURE = (
+    ('part', re.compile(rf'^PART\s+(?:{_ORDINALS})(?:\s+[A-Z])?$')),
+    ('title', re.compile(r'^TITLE\s+[IVXLC]+[a-z]?$')),
+    ('chapter', re.compile(r'^CHAPTER\s+(?:\d+[a-z]?|[IVXLC]+)$')),
+    ('section', re.compile(r'^Section\s+\d+[a-z]?$')),
+    ('subsection', re.compile(r'^Sub-section\s+\d+[a-z]?$')),
+)
+_ARTICLE = re.compile(r'^Article\s+(\d+[a-z]*)$')
+_ANNEX = re.compile(r'^ANNEX(?:\s+([IVXLC]+[a-z]?|\d+))?$')
+
+# Heading and label lines are short and do not end like a sentence
+MAX_HEADING_CHARS = 120
+MAX_LABEL_LINES = 2
+_SENTENCE_END = ('.', ';', ':', ',')
+
+
+def text_hash(text: str) -> str:
+    """Hash of the whitespace-normalized text (line wrapping does not change it)."""
+    return hashlib.blake2b(" ".join(text.split()).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def classify_line(line: str) -> Optional[Tuple[str, str]]:
+    """
+    Classify one stripped line as a heading.
+
+    Returns:
+        (level, number) for a structural heading (level in ``LEVELS``),
+        ('article', number) or ('annex', number), or None for text.
+    """
+    match = _ARTICLE.match(line)
+    if match:
+        return 'article', match.group(1)
+    match = _ANNEX.match(line)
+    if match:
+        return 'annex', match.group(1) or ''
+    for level, pattern in _STRUCTURE:
+        if pattern.match(line):
+            return level, line.split(None, 1)[1]
+    return None
+
+
+def _is_heading_text(line: str) -> bool:
+    """Whether a line can be an article heading or structural label."""
+    return (0 < len(line) <= MAX_HEADING_CHARS and not line.endswith(_SENTENCE_END)
+            and not line[0].isdigit() and line[0] != '(')
+
+
+class ArticleSegmenter:
+    """
+    Push-based article segmentation for callers that receive pages one at a time.
+
+    Call ``add_page`` for each page in order, then ``finish`` once; both
+    return the records that became complete.
+    """
+
+    def __init__(self, doc_id: str):
+        self.doc_id = doc_id
+        self.count = 0
+        self._ids: Dict[str, int] = {}
+        self._structure: Dict[str, str] = {level: '' for level in LEVELS}
+        self._label: Optional[str] = None       # structural level still collecting its name
+        self._label_lines = 0
+        self._pending: Optional[Tuple[str, str, str, int]] = None   # heading awaiting its next line
+        self._record: Optional[Dict[str, Any]] = None
+        self._lines: List[str] = []
+        self._expect_heading = False
+
+    def add_page(self, page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Consume one page's lines and return the records it completed."""
+        done: List[Dict[str, Any]] = []
+        page_number = page['page_number']
+        for raw in page['text'].split('\n'):
+            self._add_line(raw, page_number, done)
+        return done
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Return the last record (and a heading left pending at the very end)."""
+        done: List[Dict[str, Any]] = []
+        if self._pending is not None:
+            self._commit_pending(done)
+        self._close(done)
+        return done
+
+    def _add_line(self, raw: str, page_number: int, done: List[Dict[str, Any]]):
+        line = raw.strip()
+        if not line:
+            if self._record is not None and self._pending is None:
+                self._lines.append('')
+            return
+
+        if self._pending is not None:
+            if line[0].islower():
+                # "... referred to in\nArticle 92\nof Regulation ..." is a cross-reference
+                self._append(self._pending[2], self._pending[3])
+                self._pending = None
+            else:
+                self._commit_pending(done)
+
+        kind = classify_line(line)
+        if kind is not None:
+            self._pending = (kind[0], kind[1], line, page_number)
+            return
+
+        if self._label is not None:
+            if self._label_lines < MAX_LABEL_LINES and _is_heading_text(line):
+                self._structure[self._label] += ' ' + line
+                self._label_lines += 1
+                return
+            self._label = None
+
+        if self._expect_heading:
+            self._expect_heading = False
+            if _is_heading_text(line):
+                self._record['heading'] = line
+        self._append(line, page_number)
+
+    def _append(self, line: str, page_number: int):
+        if self._record is None:
+            self._open('preamble', '', page_number)
+        self._lines.append(line)
+        self._record['page_end'] = page_number
+
+    def _commit_pending(self, done: List[Dict[str, Any]]):
+        kind, number, line, page_number = self._pending
+        self._pending = None
+        if kind in ('article', 'annex'):
+            self._close(done)
+            if kind == 'annex':
+                # Annexes follow the enacting terms and sit outside their structure
+                self._structure = {level: '' for level in LEVELS}
+            self._open(kind, number, page_number)
+            self._lines.append(line)
+            self._expect_heading = True
+            self._label = None
+        else:
+            depth = LEVELS.index(kind)
+            for level in LEVELS[depth:]:
+                self._structure[level] = ''
+            self._structure[kind] = line
+            self._label, self._label_lines = kind, 0
+
+    def _open(self, kind: str, number: str, page_number: int):
+        key = {'preamble': 'PRE', 'article': 'ART', 'annex': 'ANX'}[kind]
+        article_id = f"{key}_{self.doc_id}" + (f"_{number}" if number else '')
+        # Amending acts quote the articles they insert; keep ids unique
+        seen = self._ids.get(article_id, 0) + 1
+        self._ids[article_id] = seen
+        if seen > 1:
+            article_id += f"_{seen}"
+        self._record = {'article_id': article_id, 'doc_id': self.doc_id, 'kind': kind,
+                        'number': number, 'heading': '', **self._structure,
+                        'page_start': page_number, 'page_end': page_number}
+        self._lines = []
+        self._expect_heading = False
+
+    def _close(self, done: List[Dict[str, Any]]):
+        if self._record is None:
+            return
+        text = "\n".join(self._lines).strip('\n')
+        if text:
+            self._record['text'] = text
+            self._record['text_hash'] = text_hash(text)
+            done.append(self._record)
+            self.count += 1
+        self._record = None
+        self._lines = []
+
+
+def segment_pages(doc_id: str, pages: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield article records while pages stream in.
+
+    Args:
+        doc_id: Document id used in record ids (e.g. "CRR" gives "ART_CRR_4").
+        pages: Page dictionaries with ``page_number`` and ``text``, in order.
+
+    Yields:
+        Dictionaries with the fields in ``ARTICLE_FIELDS``.
+    """
+    segmenter = ArticleSegmenter(doc_id)
+    for page in pages:
+        yield from segmenter.add_page(page)
+    yield from segmenter.finish()
+
+
+def articles_path(output_path: str) -> Path:
+    """Return the article file path for an output file (CRR.json -> CRR.articles.ndjson)."""
+    return Path(output_path).with_suffix('.articles.ndjson')
+
+
+class ArticleWriter:
+    """Write article records as JSON lines (text keeps its line breaks)."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.count = 0
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def __enter__(self) -> 'ArticleWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record: Dict[str, Any]):
+        """Append one record."""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self):
+        """Flush and close the file."""
+        self._file.close()
+
+
+def read_articles(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the records of an article file."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_pages(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the pages of an extractor JSON or NDJSON output."""
+    if path.endswith('.ndjson'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get('type') == 'page':
+                    yield record
+    else:
+        with open(path, encoding='utf-8') as f:
+            yield from json.load(f)['pages']
+
+
+def compare_articles(old: Iterable[Dict[str, Any]],
+                     new: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Compare two versions' records by kind and number.
+
+    Returns:
+        One row per article in new order (removed ones last) with
+        ``kind``, ``number``, ``status`` (ADDED/REMOVED/CHANGED/SAME) and
+        both versions' ids.
+    """
+    def keyed(records):
+        table = {}
+        for record in records:
+            table.setdefault((record['kind'], record['number']), record)
+        return table
+
+    old_records, new_records = keyed(old), keyed(new)
+    rows = []
+    for key, record in new_records.items():
+        previous = old_records.get(key)
+        status = ('ADDED' if previous is None else
+                  'SAME' if previous['text_hash'] == record['text_hash'] else 'CHANGED')
+        rows.append({'kind': key[0], 'number': key[1], 'status': status,
+                     'old_id': previous['article_id'] if previous else '',
+                     'new_id': record['article_id']})
+    for key, record in old_records.items():
+        if key not in new_records:
+            rows.append({'kind': key[0], 'number': key[1], 'status': 'REMOVED',
+                         'old_id': record['article_id'], 'new_id': ''})
+    return rows
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Split extractor output into articles, or compare two versions by article')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    split = commands.add_parser('split', help='Write <output>.articles.ndjson per extractor output')
+    split.add_argument('outputs', nargs='+', help='Extractor JSON/NDJSON outputs')
+    split.add_argument('--doc-id', help='Document id for record ids (default: file name stem)')
+
+    compare = commands.add_parser('compare', help='List added, removed and changed articles as CSV')
+    compare.add_argument('old', help='Article file of the old version')
+    compare.add_argument('new', help='Article file of the new version')
+    compare.add_argument('--out', help='CSV path (default: stdout)')
+
+    args = parser.parse_args()
+
+    if args.command == 'split':
+        if args.doc_id and len(args.outputs) > 1:
+            parser.error("--doc-id takes a single output")
+        for path in args.outputs:
+            target = articles_path(path)
+            with ArticleWriter(str(target)) as writer:
+                for record in segment_pages(args.doc_id or Path(path).stem, read_pages(path)):
+                    writer.write(record)
+            print(f"Saved {writer.count} articles to: {target}")
+        return
+
+    rows = compare_articles(read_articles(args.old), read_articles(args.new))
+    out = open(args.out, 'w', encoding='utf-8', newline='') if args.out else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=('kind', 'number', 'status', 'old_id', 'new_id'))
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if args.out:
+            out.close()
+    changed = sum(1 for row in rows if row['status'] != 'SAME')
+    print(f"{changed} of {len(rows)} articles added, removed or changed", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+"""
+Resumable batch orchestrator for extract_regulatory_pdf.py --output-dir.
+
+Every file is extracted in a fresh child process. A PDF that hangs the
+parser past ``timeout`` seconds, or (where ``resource`` is available) grows
+beyond ``memory_mb`` of address space, is killed without stopping the rest
+of the batch. Failed files are retried up to ``retries`` more times and
+then quarantined.
+
+Progress is appended to a manifest (``<output-dir>/batch_manifest.jsonl``)
+as each file finishes, so a restarted run skips files that completed
+before with the same input, settings and extractor version, and whose
+output still exists. Quarantined files are skipped as well until
+``retry_quarantined`` is set or the input changes. One JSON object per
+line; the last record for an input wins:
+
+    {"input": "data/CRR.pdf", "output": "extracted/CRR.json", "status": "done",
+     "key": "3f0c...", "attempts": 1, "seconds": 41.2, "pages": 620, "bytes": 5210344}
+    {"input": "data/bad.pdf", "output": "extracted/bad.json", "status": "quarantined",
+     "key": "9a1e...", "attempts": 2, "error": "timed out after 300 s", "bytes": 88120}
+
+Throughput (files/min, pages/s) and an ETA based on the input bytes still
+to process are logged after every file.
+
+Usage:
+    reports = run_batch(jobs, 'extracted/batch_manifest.jsonl', workers=8, timeout=300)
+
+where each job is ``(input_file, output_file, process_kwargs)`` and
+``process_kwargs`` are the keyword arguments of ``_process_file``.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import hashlib
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import extract_regulatory_pdf as erp
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Manifest file name inside the output directory
+MANIFEST_NAME = 'batch_manifest.jsonl'
+
+# Retries after the first failed attempt before a file is quarantined
+DEFAULT_RETRIES = 1
+
+# Seconds to wait for a job process to exit after it reports or is killed
+KILL_JOIN_TIMEOUT = 10
+
+# _process_file arguments that do not change the output
+_RUNTIME_ARGS = ('verbose', 'workers', 'cache_dir', 'cache_max_bytes', 'timings')
+
+Job = Tuple[str, str, Dict[str, Any]]
+
+
+def batch_manifest_path(output_dir: str) -> Path:
+    """Return the batch manifest path for an output directory."""
+    return Path(output_dir) / MANIFEST_NAME
+
+
+def job_key(input_file: str, process_kwargs: Dict[str, Any]) -> str:
+    """
+    Digest of everything a completed output depends on.
+
+    Covers the input's size and modification time, the output settings
+    (format, options, chunking, previous result) and the extractor version.
+    """
+    stat = os.stat(input_file)
+    settings = {name: value for name, value in process_kwargs.items()
+                if name not in _RUNTIME_ARGS}
+    payload = json.dumps({'version': erp.EXTRACTOR_VERSION, 'size': stat.st_size,
+                          'mtime_ns': stat.st_mtime_ns, 'settings': settings},
+                         sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def load_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+    """Return the latest manifest record per input (missing file: empty)."""
+    records: Dict[str, Dict[str, Any]] = {}
+    if not Path(path).exists():
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # line cut short by a crash
+            records[record['input']] = record
+    return records
+
+
+def _run_job(connection, input_file: str, output_file: str, process_kwargs: Dict[str, Any],
+             memory_mb: Optional[int]):
+    """Child process entry point: extract one file and send back its report."""
+    if hasattr(os, 'setsid'):
+        os.setsid()  # own process group, so a timeout also stops page workers
+    if memory_mb and resource is not None:
+        limit = memory_mb * 1024 ** 2
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        report = erp._process_file(input_file, output_file, **process_kwargs)
+        connection.send({'ok': True, 'report': report})
+    except MemoryError:
+        connection.send({'ok': False, 'error': f"exceeded memory limit of {memory_mb} MB"})
+    except Exception as e:
+        connection.send({'ok': False, 'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def _kill(process: multiprocessing.Process):
+    """Kill a job process and everything it started."""
+    try:
+        if not hasattr(os, 'killpg'):
+            raise ProcessLookupError
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        # No such group yet (the child has not reached setsid) or not ours
+        try:
+            process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+    process.join(KILL_JOIN_TIMEOUT)
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as '1h02m', '3m05s' or '42s'."""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class BatchRunner:
+    """Run extraction jobs in isolated processes, recording progress in a manifest."""
+
+    def __init__(self, manifest_path: str, workers: int = 1, timeout: Optional[float] = None,
+                 memory_mb: Optional[int] = None, retries: int = DEFAULT_RETRIES,
+                 retry_quarantined: bool = False, verbose: bool = True):
+        if memory_mb and resource is None:
+            print("WARNING: per-file memory limits are not supported on this platform",
+                  file=sys.stderr)
+        self.manifest_path = Path(manifest_path)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.retries = max(0, retries)
+        self.retry_quarantined = retry_quarantined
+        self.verbose = verbose
+
+    def log(self, message: str):
+        """Print message if verbose."""
+        if self.verbose:
+            print(f"[INFO] {message}", file=sys.stderr)
+
+    def run(self, jobs: List[Job]) -> List[Dict[str, Any]]:
+        """
+        Run jobs not already completed, in input order, ``workers`` at a time.
+
+        Returns:
+            ``_process_file`` reports of completed files in input order,
+            including files skipped because a previous run completed them
+            (marked ``skipped``, with ``cache_hit`` and ``timings`` None).
+            Quarantined files have no report.
+        """
+        previous = load_manifest(str(self.manifest_path))
+        reports: Dict[int, Dict[str, Any]] = {}
+        pending = deque()
+        skipped_done = skipped_quarantined = 0
+
+        for index, (input_file, output_file, process_kwargs) in enumerate(jobs):
+            key = job_key(input_file, process_kwargs)
+            record = previous.get(input_file)
+            if record is not None and record.get('key') == key:
+                if record['status'] == 'done' and Path(output_file).exists():
+                    reports[index] = {'input': input_file, 'output': output_file,
+                                      'cache_hit': None, 'timings': None, 'skipped': True}
+                    skipped_done += 1
+                    continue
+                if record['status'] == 'quarantined' and not self.retry_quarantined:
+                    print(f"ERROR: Skipping quarantined file {input_file}: {record.get('error')}",
+                          file=sys.stderr)
+                    skipped_quarantined += 1
+                    continue
+            pending.append((index, key, 1))
+
+        if skipped_done:
+            self.log(f"Skipping {skipped_done} files completed in a previous run "
+                     f"({self.manifest_path})")
+        if skipped_quarantined:
+            self.log(f"Skipping {skipped_quarantined} quarantined files "
+                     f"(--retry-quarantined to try them again)")
+
+        sizes = {index: os.path.getsize(jobs[index][0]) for index, _, _ in pending}
+        total_bytes = sum(sizes.values())
+        progress = {'files': len(pending), 'done': 0, 'failed': 0, 'pages': 0, 'bytes': 0}
+        started = time.perf_counter()
+        running: Dict[Any, Tuple[int, str, int, multiprocessing.Process, float]] = {}
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path, 'a', encoding='utf-8') as manifest:
+
+            def finish(index: int, key: str, attempt: int, seconds: float,
+                       report: Optional[Dict[str, Any]], error: Optional[str]):
+                input_file, output_file, _ = jobs[index]
+                if error is not None and attempt <= self.retries:
+                    print(f"ERROR processing {input_file} (attempt {attempt}, retrying): {error}",
+                          file=sys.stderr)
+                    pending.append((index, key, attempt + 1))
+                    return
+
+                record = {'input': input_file, 'output': output_file,
+                          'status': 'done' if error is None else 'quarantined', 'key': key,
+                          'attempts': attempt, 'seconds': round(seconds, 3),
+                          'bytes': sizes[index]}
+                if error is None:
+                    reports[index] = report
+                    record.update(pages=report.get('pages'), cache_hit=report['cache_hit'])
+                    progress['done'] += 1
+                    progress['pages'] += report.get('pages') or 0
+                    print(f"✓ Processed: {input_file} → {output_file}")
+                else:
+                    record['error'] = error
+                    progress['failed'] += 1
+                    attempts = f"{attempt} attempt" + ("s" if attempt > 1 else "")
+                    print(f"ERROR processing {input_file} (quarantined after {attempts}): {error}",
+                          file=sys.stderr)
+                manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+                manifest.flush()
+                os.fsync(manifest.fileno())
+                progress['bytes'] += sizes[index]
+                self._log_progress(progress, total_bytes, time.perf_counter() - started)
+
+            try:
+                while pending or running:
+                    while pending and len(running) < self.workers:
+                        index, key, attempt = pending.popleft()
+                        input_file, output_file, process_kwargs = jobs[index]
+                        receiver, sender = multiprocessing.Pipe(duplex=False)
+                        process = multiprocessing.Process(
+                            target=_run_job,
+                            args=(sender, input_file, output_file, process_kwargs, self.memory_mb))
+                        process.start()
+                        sender.close()
+                        running[receiver] = (index, key, attempt, process, time.perf_counter())
+
+                    wait_for = None
+                    if self.timeout:
+                        now = time.perf_counter()
+                        wait_for = max(0.0, min(start + self.timeout - now
+                                                for _, _, _, _, start in running.values()))
+                    ready = wait(list(running), timeout=wait_for)
+
+                    for receiver in ready:
+                        index, key, attempt, process, start = running.pop(receiver)
+                        try:
+                            message = receiver.recv()
+                        except EOFError:
+                            message = None
+                        receiver.close()
+                        # A report does not mean the child exits (e.g. a hung
+                        # non-daemon thread); do not let it stall the batch
+                        process.join(KILL_JOIN_TIMEOUT)
+                        if process.is_alive():
+                            _kill(process)
+                        if message is None:
+                            error = f"worker exited with code {process.exitcode}"
+                            if process.exitcode == -signal.SIGKILL and self.memory_mb:
+                                error += f" (memory limit {self.memory_mb} MB?)"
+                            finish(index, key, attempt, time.perf_counter() - start, None, error)
+                        elif message['ok']:
+                            finish(index, key, attempt, time.perf_counter() - start,
+                                   message['report'], None)
+                        else:
+                            finish(index, key, attempt, time.perf_counter() - start,
+                                   None, message['error'])
+
+                    if self.timeout:
+                        now = time.perf_counter()
+                        for receiver in [receiver for receiver, (*_, start) in running.items()
+                                         if now - start >= self.timeout]:
+                            index, key, attempt, process, start = running.pop(receiver)
+                            _kill(process)
+                            receiver.close()
+                            finish(index, key, attempt, now - start, None,
+                                   f"timed out after {self.timeout:g} s")
+            finally:
+                # Interrupted (or a bug): do not leave orphaned extractions behind
+                for receiver, (_, _, _, process, _) in running.items():
+                    _kill(process)
+                    receiver.close()
+
+        if progress['files']:
+            self.log(f"Batch: {progress['done']} processed, {progress['failed']} quarantined, "
+                     f"{skipped_done} skipped in "
+                     f"{_format_duration(time.perf_counter() - started)}")
+        return [reports[index] for index in sorted(reports)]
+
+    def _log_progress(self, progress: Dict[str, Any], total_bytes: int, elapsed: float):
+        """Log files finished, throughput and ETA (by input bytes) so far."""
+        finished = progress['done'] + progress['failed']
+        message = f"{finished}/{progress['files']} files"
+        if progress['failed']:
+            message += f" ({progress['failed']} quarantined)"
+        if elapsed > 0:
+            message += (f", {finished * 60 / elapsed:.1f} files/min, "
+                        f"{progress['pages'] / elapsed:.1f} pages/s")
+            if progress['bytes'] and finished < progress['files']:
+                remaining = (total_bytes - progress['bytes']) * elapsed / progress['bytes']
+                message += f", ETA {_format_duration(remaining)}"
+        self.log(message)
+
+
+def run_batch(jobs: List[Job], manifest_path: str, workers: int = 1,
+              timeout: Optional[float] = None, memory_mb: Optional[int] = None,
+              retries: int = DEFAULT_RETRIES, retry_quarantined: bool = False,
+              verbose: bool = True) -> List[Dict[str, Any]]:
+    """Run jobs with a ``BatchRunner`` and return the completed files' reports."""
+    runner = BatchRunner(manifest_path, workers, timeout, memory_mb, retries,
+                         retry_quarantined, verbose)
+    return runner.run(jobs)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark the formula detector against the original per-span heuristic.
+
+Generates formula-dense PDFs locally (IRB risk-weight and CVA style
+expressions with Greek letters, operators and sub/superscripts set in
+smaller type, plus plain equations set slightly below the body size) at
+several body font sizes, then times both detectors over the same PyMuPDF
+span dictionaries and checks recall: every span the original heuristic
+flags must lie inside an expression reported by the current detector.
+
+Usage:
+    python bench_formulas.py [--pages 200] [--repeat 3] [--body-sizes 8 10 12] [--json results.json]
+
+Requirements:
+    - pymupdf
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any
+
+try:
+    import pymupdf as fitz  # PyMuPDF >= 1.24.3 (the 'fitz' name prints a deprecation warning)
+except ImportError:
+    import fitz
+
+from extract_regulatory_pdf import RegulatoryPDFExtractor
+
+
+# (base text, script text) pieces; script pieces are set at 60% size
+FORMULA_LINES = [
+    [("K = LGD × N(", None), ("(1 - R)", "-0.5"), (" × G(PD) + ", None), ("√R", None), (") - PD × LGD", None)],
+    [("R = 0.12 × (1 - e", "-50×PD"), (") / (1 - e", "-50"), (")", None)],
+    [("b = (0.11852 - 0.05478 × ln(PD))", "2")],
+    [("CVA = (1 - R) × ∑ ", None), ("i", None), (" EE", "i"), (" × Δ PD", "i")],
+    [("σ", "2"), (" = ∫ (x - μ)", "2"), (" f(x) dx ≤ α × β", None)],
+    [("RWA = 12.5 × K × EAD", None)],
+]
+
+# Equations without math symbols, set at 85% of the body size
+PLAIN_EQUATIONS = ["EL = PD * LGD * EAD", "EAD = E * CCF + 0.25 * (1 - CCF)"]
+
+# Body font sizes the generated fixtures are set in
+BODY_SIZES = (8, 10, 12)
+
+PROSE = ("Institutions shall calculate the risk-weighted exposure amounts for "
+         "credit risk in accordance with the formulas set out below. ")
+
+
+def generate_formula_pdf(path: str, pages: int, body_size: float = 10):
+    """Write a formula-dense PDF with multi-span expressions set around ``body_size``."""
+    font = fitz.Font('cjk')  # covers Greek, operators and script digits
+    script_size = 0.6 * body_size
+    leading = 1.8 * body_size
+    doc = fitz.open()
+    for page_index in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_font(fontname='F0', fontbuffer=font.buffer)
+        page.insert_textbox(fitz.Rect(60, 50, 535, 50 + 7 * body_size), PROSE * 3,
+                            fontsize=body_size, fontname='F0')
+        y = 60 + 9 * body_size
+        for row in range(18):
+            if y > 842 - 6 * leading:
+                break
+            x = 80.0
+            for base, script in FORMULA_LINES[(page_index + row) % len(FORMULA_LINES)]:
+                page.insert_text((x, y), base, fontsize=body_size, fontname='F0')
+                x += font.text_length(base, fontsize=body_size)
+                if script:
+                    page.insert_text((x, y - 0.3 * body_size), script, fontsize=script_size,
+                                     fontname='F0')
+                    x += font.text_length(script, fontsize=script_size)
+            y += leading
+            if row % 6 == 5:
+                equation = PLAIN_EQUATIONS[(page_index + row) % len(PLAIN_EQUATIONS)]
+                page.insert_text((80, y), equation, fontsize=0.85 * body_size, fontname='F0')
+                y += leading
+                page.insert_textbox(fitz.Rect(60, y, 535, y + 3 * body_size), PROSE,
+                                    fontsize=body_size, fontname='F0')
+                y += 3.6 * body_size
+        page.insert_text((290, 820), str(page_index + 1), fontsize=8, fontname='F0')
+    doc.save(path)
+    doc.close()
+
+
+def legacy_formula_spans(blocks: List[Dict[str, Any]], page_num: int) -> List[Dict[str, Any]]:
+    """The original per-span heuristic, kept verbatim as the recall baseline."""
+    formulas = []
+    for block in blocks:
+        if block.get("type") == 0:
+            for line in block.get("lines", []):
+                for span in line.get("spans", []):
+                    text = span.get("text", "").strip()
+                    size = span.get("size", 0)
+                    math_symbols = ['∑', '∫', '∂', '√', '∞', '≈', '≤', '≥', '±', '×', '÷',
+                                    '∈', '∉', '⊂', '⊆', '∪', '∩', 'α', 'β', 'γ', 'δ', 'ε',
+                                    'θ', 'λ', 'μ', 'π', 'σ', 'τ', 'φ', 'ψ', 'ω', 'Δ', 'Σ', 'Π']
+                    has_math_symbols = any(sym in text for sym in math_symbols)
+                    has_subscripts = any(c in text for c in ['₀', '₁', '₂', '₃', '₄', '₅', '₆', '₇', '₈', '₉'])
+                    has_superscripts = any(c in text for c in ['⁰', '¹', '²', '³', '⁴', '⁵', '⁶', '⁷', '⁸', '⁹'])
+                    has_equation_pattern = '=' in text and len(text) < 200
+                    if has_math_symbols or has_subscripts or has_superscripts or (has_equation_pattern and size > 9):
+                        formulas.append({'page': page_num, 'text': text, 'font': span.get("font", ""),
+                                         'size': size, 'bbox': span.get('bbox', [])})
+    return formulas
+
+
+def _contains(outer, inner, tolerance: float = 0.5) -> bool:
+    return (outer[0] - tolerance <= inner[0] and outer[1] - tolerance <= inner[1]
+            and inner[2] <= outer[2] + tolerance and inner[3] <= outer[3] + tolerance)
+
+
+def run_benchmark(pdf_path: str, repeat: int) -> Dict[str, Any]:
+    """Time both detectors over the same span dictionaries and compare recall."""
+    doc = fitz.open(pdf_path)
+    pages = [page.get_text("dict")["blocks"] for page in doc]
+    doc.close()
+
+    extractor = RegulatoryPDFExtractor(pdf_path, verbose=False)
+    extractor.estimate_body_font_size()
+
+    def best_of(detect) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for page_num, blocks in enumerate(pages, start=1):
+                detect(blocks, page_num)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    legacy_seconds = best_of(legacy_formula_spans)
+    current_seconds = best_of(extractor._formula_candidates)
+
+    legacy = [legacy_formula_spans(blocks, n) for n, blocks in enumerate(pages, start=1)]
+    current = [extractor._formula_candidates(blocks, n) for n, blocks in enumerate(pages, start=1)]
+
+    legacy_total = sum(len(spans) for spans in legacy)
+    covered = sum(
+        1
+        for spans, expressions in zip(legacy, current)
+        for span in spans
+        if any(_contains(expr['bbox'], span['bbox']) for expr in expressions)
+    )
+
+    return {
+        'pages': len(pages),
+        'body_font_size': extractor.body_font_size,
+        'legacy_seconds': round(legacy_seconds, 4),
+        'current_seconds': round(current_seconds, 4),
+        'speedup': round(legacy_seconds / current_seconds, 2) if current_seconds else None,
+        'legacy_spans': legacy_total,
+        'current_expressions': sum(len(expressions) for expressions in current),
+        'recall_vs_legacy': round(covered / legacy_total, 4) if legacy_total else 1.0,
+    }
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Benchmark the formula detector')
+    parser.add_argument('--pages', type=int, default=200, help='Pages in the generated fixture')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is kept)')
+    parser.add_argument('--body-sizes', type=float, nargs='+', default=list(BODY_SIZES),
+                        help='Body font sizes of the generated fixtures (default: 8 10 12)')
+    parser.add_argument('--pdf', help='Use this PDF instead of generating a fixture')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.pdf:
+            runs = [run_benchmark(args.pdf, args.repeat)]
+        else:
+            runs = []
+            for body_size in args.body_sizes:
+                pdf_path = str(Path(tmp) / f'formula_dense_{body_size:g}pt.pdf')
+                generate_formula_pdf(pdf_path, args.pages, body_size)
+                runs.append(run_benchmark(pdf_path, args.repeat))
+
+    for results in runs:
+        for name, value in results.items():
+            print(f"{name:>20}: {value}")
+        print()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(runs if len(runs) > 1 else runs[0], f, indent=2)
+
+    if any(results['recall_vs_legacy'] < 1.0 for results in runs):
+        print("ERROR: formula detector lost recall against the original heuristic", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
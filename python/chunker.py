@@ -0,0 +1,241 @@
+"""
+Streaming token-window chunker compatible with reg.chunk_text.
+
+Produces the same windows as ``reg.chunk_text(docsT, chunkTokens, overlap)``
+(whitespace tokens, windows of ``chunk_tokens`` that advance by
+``chunk_tokens - overlap``, the last window ending at the final token, ids
+``CH_<doc_id>_<start>`` with 1-based token positions), but tokenizes each
+page once, slices window text out of one normalized string instead of
+joining tokens per window, and emits chunks while pages are still being
+extracted. Each chunk also records the pages its first and last token came
+from.
+
+Usage:
+    with ChunkWriter('CRR.chunks.csv') as writer:
+        for chunk in chunk_pages('DOC_1', extractor.iter_pages(), 300, 80):
+            writer.write(chunk)
+
+or, from the command line, ``--chunks`` next to any output format.
+
+In MATLAB, ``readtable('CRR.chunks.csv', 'TextType', 'string')`` gives the
+``chunk_id, doc_id, text, start_idx, end_idx`` columns of reg.chunk_text
+plus ``page_start`` and ``page_end``.
+"""
+
+import re
+import csv
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Defaults from knobs.json "Chunk"
+DEFAULT_CHUNK_TOKENS = 300
+DEFAULT_OVERLAP = 80
+
+CHUNK_FIELDS = ('chunk_id', 'doc_id', 'text', 'start_idx', 'end_idx', 'page_start', 'page_end')
+
+# MATLAB's \s: space, \f, \n, \r, \t, \v
+_TOKEN = re.compile(r'[^ \f\n\r\t\v]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into tokens exactly like reg.chunk_text's regexprep/split."""
+    return _TOKEN.findall(text)
+
+
+def token_offsets(text: str) -> List[int]:
+    """Character offset at which each token of ``tokenize(text)`` starts."""
+    return [match.start() for match in _TOKEN.finditer(text)]
+
+
+def window_bounds(total_tokens: int, chunk_tokens: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    Return the 1-based inclusive (start, end) windows reg.chunk_text builds.
+
+    Args:
+        total_tokens: Number of tokens in the document.
+        chunk_tokens: Window size in tokens.
+        overlap: Tokens shared by consecutive windows (< chunk_tokens).
+    """
+    _check_window(chunk_tokens, overlap)
+    if total_tokens == 0:
+        return []
+    stride = chunk_tokens - overlap
+    count = 1 if total_tokens <= chunk_tokens else -(-(total_tokens - chunk_tokens) // stride) + 1
+    return [(start, min(total_tokens, start + chunk_tokens - 1))
+            for start in range(1, 1 + count * stride, stride)]
+
+
+def _check_window(chunk_tokens: int, overlap: int):
+    if chunk_tokens < 1:
+        raise ValueError(f"Chunk size must be positive (got {chunk_tokens})")
+    if not 0 <= overlap < chunk_tokens:
+        raise ValueError(f"Overlap ({overlap}) must be less than chunk size ({chunk_tokens})")
+
+
+class _TokenBuffer:
+    """Tokens not yet fully emitted, as one normalized string plus offsets."""
+
+    def __init__(self):
+        self.first = 1          # 1-based document position of the first buffered token
+        self.text = ""
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.pages: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def extend(self, tokens: List[str], page_number: int):
+        if not tokens:
+            return
+        base = len(self.text) + 1 if self.text else 0
+        lengths = [len(token) for token in tokens]
+        if np is not None:
+            ends = np.cumsum(np.asarray(lengths) + 1) - 1
+            starts = (ends - lengths + base).tolist()
+            ends = (ends + base).tolist()
+        else:
+            starts, ends, position = [], [], base
+            for length in lengths:
+                starts.append(position)
+                ends.append(position + length)
+                position += length + 1
+        self.text = (self.text + " " if self.text else "") + " ".join(tokens)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+        self.pages.extend([page_number] * len(tokens))
+
+    def window(self, start: int, end: int) -> Tuple[str, int, int]:
+        """Text and page span of document tokens start..end (1-based, inclusive)."""
+        a, b = start - self.first, end - self.first
+        return self.text[self.starts[a]:self.ends[b]], self.pages[a], self.pages[b]
+
+    def drop_before(self, position: int):
+        """Forget tokens before document position ``position``."""
+        count = position - self.first
+        if count <= 0:
+            return
+        if count >= len(self.starts):
+            self.__init__()
+            self.first = position
+            return
+        shift = self.starts[count]
+        self.text = self.text[shift:]
+        self.starts = [offset - shift for offset in self.starts[count:]]
+        self.ends = [offset - shift for offset in self.ends[count:]]
+        self.pages = self.pages[count:]
+        self.first = position
+
+
+class StreamingChunker:
+    """
+    Push-based form of ``chunk_pages`` for callers that receive pages one at a time.
+
+    Call ``add_page`` for each page in order, then ``finish`` once; both
+    return the chunks that became complete.
+    """
+
+    def __init__(self, doc_id: str, chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                 overlap: int = DEFAULT_OVERLAP):
+        _check_window(chunk_tokens, overlap)
+        self.doc_id = doc_id
+        self.chunk_tokens = chunk_tokens
+        self.stride = chunk_tokens - overlap
+        self.total = 0
+        self._buffer = _TokenBuffer()
+        self._start = 1
+        self._last_end = 0
+
+    def _emit(self, end: int) -> Dict[str, Any]:
+        text, page_start, page_end = self._buffer.window(self._start, end)
+        self._last_end = end
+        return {'chunk_id': f"CH_{self.doc_id}_{self._start}", 'doc_id': self.doc_id,
+                'text': text, 'start_idx': self._start, 'end_idx': end,
+                'page_start': page_start, 'page_end': page_end}
+
+    def add_page(self, page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Tokenize one page and return the full windows it completes."""
+        tokens = tokenize(page['text'])
+        self._buffer.extend(tokens, page['page_number'])
+        self.total += len(tokens)
+
+        # Full windows are the same whether or not more tokens follow
+        chunks = []
+        while self._start + self.chunk_tokens - 1 <= self.total:
+            chunks.append(self._emit(self._start + self.chunk_tokens - 1))
+            self._start += self.stride
+        self._buffer.drop_before(self._start)
+        return chunks
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Return the final, shorter window unless a full window already ended on the last token."""
+        if self.total and self._last_end < self.total:
+            return [self._emit(self.total)]
+        return []
+
+
+def chunk_pages(doc_id: str, pages: Iterable[Dict[str, Any]],
+                chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+                overlap: int = DEFAULT_OVERLAP) -> Iterator[Dict[str, Any]]:
+    """
+    Yield reg.chunk_text-compatible chunks while pages stream in.
+
+    Tokenizing the pages in order gives the same tokens as tokenizing the
+    document's ``full_text`` (pages are joined by blank lines), so chunk ids
+    and text match reg.chunk_text on that text.
+
+    Args:
+        doc_id: Document id used in chunk ids (e.g. "DOC_1").
+        pages: Page dictionaries with ``page_number`` and ``text``.
+        chunk_tokens: Window size in tokens (reg.chunk_text ``chunkTokens``).
+        overlap: Tokens shared by consecutive windows.
+
+    Yields:
+        Dictionaries with the fields in ``CHUNK_FIELDS``.
+    """
+    chunker = StreamingChunker(doc_id, chunk_tokens, overlap)
+    for page in pages:
+        yield from chunker.add_page(page)
+    yield from chunker.finish()
+
+
+def chunks_path(output_path: str) -> Path:
+    """Return the chunk file path for an output file (CRR.json -> CRR.chunks.csv)."""
+    return Path(output_path).with_suffix('.chunks.csv')
+
+
+class ChunkWriter:
+    """Write chunks to CSV (readtable-friendly) or, for .ndjson paths, JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.count = 0
+        self._file = open(self.path, 'w', encoding='utf-8', newline='')
+        self._ndjson = self.path.suffix == '.ndjson'
+        if not self._ndjson:
+            self._csv = csv.DictWriter(self._file, fieldnames=CHUNK_FIELDS)
+            self._csv.writeheader()
+
+    def __enter__(self) -> 'ChunkWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, chunk: Dict[str, Any]):
+        """Append one chunk."""
+        if self._ndjson:
+            self._file.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        else:
+            self._csv.writerow(chunk)
+        self.count += 1
+
+    def close(self):
+        """Flush and close the file."""
+        self._file.close()
@@ -0,0 +1,413 @@
+"""
+Columnar corpus store for extraction results.
+
+Instead of one pretty-printed JSON file per PDF (with every page's text
+stored twice, in ``full_text`` and ``pages[].text``), documents, pages,
+tables and formula spans are kept in NumPy structured arrays with all
+strings in a UTF-8 heap. Each page's text is stored once; ``full_text`` is
+rebuilt on demand. Arrays are memory-mapped, so one document or page can be
+fetched by id without loading the rest of the corpus.
+
+Layout (append-only; each batch writes new shards):
+
+    store/
+      store.json                 shard list, document count, filename index
+      shard-00000/
+        documents.npy            one row per document (page range, metadata)
+        pages.npy                one row per page (text, table and formula ranges)
+        tables.npy               one row per table (cells as JSON)
+        formulas.npy             one row per formula (text, font id, size, bbox)
+        heap.bin                 UTF-8 string heap addressed by (offset, length)
+        fonts.json               font names indexed by font id
+
+Usage:
+    with CorpusWriter('corpus/') as writer:
+        writer.add(RegulatoryPDFExtractor('CRR.pdf').extract_all())
+
+    store = CorpusStore('corpus/')
+    doc_id = store.find('CRR.pdf')
+    page = store.page(doc_id, 12)
+    for document in store.iter_documents():
+        ...
+"""
+
+import os
+import sys
+import json
+import mmap
+import bisect
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy not installed. Run: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+STORE_FORMAT = 'regclassifier-corpus'
+STORE_VERSION = 1
+
+# Documents per shard before the writer starts a new one
+DEFAULT_SHARD_DOCS = 256
+
+# Page layout codes stored in pages.npy
+LAYOUTS = ('single_column', 'two_column')
+_UNKNOWN_LAYOUT = 255
+
+DOCUMENT_DTYPE = np.dtype([
+    ('doc_id', '<i8'),
+    ('filename_offset', '<i8'), ('filename_length', '<i4'),
+    ('page_start', '<i8'), ('page_count', '<i4'),
+    ('metadata_offset', '<i8'), ('metadata_length', '<i4'),
+])
+
+PAGE_DTYPE = np.dtype([
+    ('doc_id', '<i8'), ('page_number', '<i4'),
+    ('text_offset', '<i8'), ('text_length', '<i4'),
+    ('layout', 'u1'), ('width', '<f8'), ('height', '<f8'),
+    ('metadata_offset', '<i8'), ('metadata_length', '<i4'),
+    ('table_start', '<i8'), ('table_count', '<i4'),
+    ('formula_start', '<i8'), ('formula_count', '<i4'),
+])
+
+TABLE_DTYPE = np.dtype([
+    ('page_row', '<i8'),
+    ('cells_offset', '<i8'), ('cells_length', '<i4'),
+])
+
+FORMULA_DTYPE = np.dtype([
+    ('page_row', '<i8'),
+    ('text_offset', '<i8'), ('text_length', '<i4'),
+    ('font_id', '<i4'), ('size', '<f4'), ('spans', '<i4'),
+    ('x0', '<f4'), ('y0', '<f4'), ('x1', '<f4'), ('y1', '<f4'),
+])
+
+_TABLES = {
+    'documents': DOCUMENT_DTYPE,
+    'pages': PAGE_DTYPE,
+    'tables': TABLE_DTYPE,
+    'formulas': FORMULA_DTYPE,
+}
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _read_manifest(path: Path) -> Dict[str, Any]:
+    manifest_file = path / 'store.json'
+    if not manifest_file.exists():
+        return {'format': STORE_FORMAT, 'version': STORE_VERSION,
+                'documents': 0, 'pages': 0, 'shards': [], 'names': {}}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != STORE_FORMAT:
+        raise ValueError(f"Not a corpus store: {path}")
+    if manifest.get('version') != STORE_VERSION:
+        raise ValueError(f"Unsupported corpus store version {manifest.get('version')} in {path}")
+    return manifest
+
+
+class CorpusWriter:
+    """Append extraction results to a sharded corpus store."""
+
+    def __init__(self, path: str, shard_docs: int = DEFAULT_SHARD_DOCS):
+        self.path = Path(path)
+        self.shard_docs = shard_docs
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest = _read_manifest(self.path)
+        self._pending_names: Dict[str, int] = {}
+        self._reset_shard()
+
+    def __enter__(self) -> 'CorpusWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard_shard()
+
+    def _reset_shard(self):
+        self._rows: Dict[str, List[tuple]] = {name: [] for name in _TABLES}
+        self._fonts: Dict[str, int] = {}
+        self._heap_dir: Optional[Path] = None
+        self._heap = None
+        self._heap_size = 0
+
+    def _heap_put(self, text: str) -> Tuple[int, int]:
+        """Append a string to the shard heap and return (offset, length)."""
+        if self._heap is None:
+            self._heap_dir = Path(tempfile.mkdtemp(prefix='.shard-', dir=self.path))
+            self._heap = open(self._heap_dir / 'heap.bin', 'wb')
+        data = text.encode('utf-8')
+        offset = self._heap_size
+        self._heap.write(data)
+        self._heap_size += len(data)
+        return offset, len(data)
+
+    def add(self, result: Dict[str, Any]) -> int:
+        """
+        Append one ``extract_all`` result.
+
+        Args:
+            result: Extraction result dictionary (JSON output format).
+
+        Returns:
+            The document id assigned in the store.
+        """
+        doc_id = self.manifest['documents'] + len(self._rows['documents'])
+        page_start = len(self._rows['pages'])
+        metadata = {key: value for key, value in result.get('metadata', {}).items()
+                    if key != 'cache'}
+
+        for page in result['pages']:
+            page_row = len(self._rows['pages'])
+            page_metadata = page.get('metadata', {})
+            layout = page_metadata.get('layout')
+
+            table_start = len(self._rows['tables'])
+            for table in page.get('tables', []):
+                self._rows['tables'].append((page_row, *self._heap_put(_compact_json(table))))
+
+            formula_start = len(self._rows['formulas'])
+            for formula in page.get('formulas', []):
+                font_id = self._fonts.setdefault(formula.get('font', ''), len(self._fonts))
+                bbox = formula.get('bbox') or [np.nan] * 4
+                self._rows['formulas'].append((page_row, *self._heap_put(formula['text']),
+                                               font_id, formula.get('size', 0.0),
+                                               formula.get('spans', 1), *bbox))
+
+            extra = {key: value for key, value in page_metadata.items()
+                     if key not in ('layout', 'width', 'height')}
+            self._rows['pages'].append((
+                doc_id, page['page_number'],
+                *self._heap_put(page['text']),
+                LAYOUTS.index(layout) if layout in LAYOUTS else _UNKNOWN_LAYOUT,
+                page_metadata.get('width', np.nan), page_metadata.get('height', np.nan),
+                *self._heap_put(_compact_json(extra)),
+                table_start, len(self._rows['tables']) - table_start,
+                formula_start, len(self._rows['formulas']) - formula_start,
+            ))
+
+        self._rows['documents'].append((
+            doc_id, *self._heap_put(result['filename']),
+            page_start, len(result['pages']),
+            *self._heap_put(_compact_json(metadata)),
+        ))
+        self._pending_names[result['filename']] = doc_id
+
+        if len(self._rows['documents']) >= self.shard_docs:
+            self.flush()
+        return doc_id
+
+    def flush(self):
+        """Write buffered documents as a new shard and update store.json."""
+        if not self._rows['documents']:
+            return
+
+        self._heap.close()
+        shard_dir = self._heap_dir
+        for name, dtype in _TABLES.items():
+            np.save(shard_dir / f"{name}.npy", np.array(self._rows[name], dtype=dtype))
+        with open(shard_dir / 'fonts.json', 'w', encoding='utf-8') as f:
+            json.dump(sorted(self._fonts, key=self._fonts.get), f, ensure_ascii=False)
+
+        name = f"shard-{len(self.manifest['shards']):05d}"
+        os.replace(shard_dir, self.path / name)
+
+        documents = len(self._rows['documents'])
+        pages = len(self._rows['pages'])
+        self.manifest['shards'].append({'name': name, 'first_doc': self.manifest['documents'],
+                                        'documents': documents, 'pages': pages})
+        self.manifest['documents'] += documents
+        self.manifest['pages'] += pages
+        self.manifest['names'].update(self._pending_names)
+        self._pending_names = {}
+
+        # Publish the shard atomically: readers only see shards listed here
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path / 'store.json')
+
+        self._reset_shard()
+
+    def _discard_shard(self):
+        if self._heap is not None:
+            self._heap.close()
+            shutil.rmtree(self._heap_dir, ignore_errors=True)
+        self._pending_names = {}
+        self._reset_shard()
+
+    def close(self):
+        """Flush the last partial shard."""
+        self.flush()
+
+
+class _Shard:
+    """Memory-mapped arrays and heap of one shard."""
+
+    def __init__(self, path: Path):
+        for name in _TABLES:
+            setattr(self, name, np.load(path / f"{name}.npy", mmap_mode='r'))
+        with open(path / 'fonts.json', 'r', encoding='utf-8') as f:
+            self.fonts = json.load(f)
+
+        with open(path / 'heap.bin', 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.heap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def string(self, offset, length) -> str:
+        offset = int(offset)
+        return self.heap[offset:offset + int(length)].decode('utf-8')
+
+    def close(self):
+        if isinstance(self.heap, mmap.mmap):
+            self.heap.close()
+
+
+class CorpusStore:
+    """Random-access reader for a corpus store written by ``CorpusWriter``."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.manifest = _read_manifest(self.path)
+        self._first_docs = [shard['first_doc'] for shard in self.manifest['shards']]
+        self._shards: Dict[int, _Shard] = {}
+
+    def __len__(self) -> int:
+        return self.manifest['documents']
+
+    def __enter__(self) -> 'CorpusStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Release memory maps."""
+        for shard in self._shards.values():
+            shard.close()
+        self._shards.clear()
+
+    def _shard(self, index: int) -> _Shard:
+        shard = self._shards.get(index)
+        if shard is None:
+            shard = _Shard(self.path / self.manifest['shards'][index]['name'])
+            self._shards[index] = shard
+        return shard
+
+    def _locate(self, doc_id: int) -> Tuple[_Shard, int]:
+        """Return (shard, document row) for a document id."""
+        if not 0 <= doc_id < len(self):
+            raise KeyError(f"No document with id {doc_id}")
+        index = bisect.bisect_right(self._first_docs, doc_id) - 1
+        return self._shard(index), doc_id - self._first_docs[index]
+
+    def find(self, filename: str) -> Optional[int]:
+        """Return the id of the latest document stored under ``filename``."""
+        return self.manifest['names'].get(filename)
+
+    def document(self, doc_id: int) -> Dict[str, Any]:
+        """Document header: filename, page count and document metadata."""
+        shard, row = self._locate(doc_id)
+        record = shard.documents[row]
+        return {
+            'doc_id': int(record['doc_id']),
+            'filename': shard.string(record['filename_offset'], record['filename_length']),
+            'total_pages': int(record['page_count']),
+            'metadata': json.loads(shard.string(record['metadata_offset'],
+                                                record['metadata_length'])),
+        }
+
+    def page(self, doc_id: int, page_number: int) -> Dict[str, Any]:
+        """Return one page dictionary (same shape as extract_all pages)."""
+        shard, row = self._locate(doc_id)
+        record = shard.documents[row]
+        if not 1 <= page_number <= record['page_count']:
+            raise KeyError(f"Document {doc_id} has no page {page_number}")
+        return self._page(shard, int(record['page_start']) + page_number - 1)
+
+    def _page(self, shard: _Shard, page_row: int) -> Dict[str, Any]:
+        record = shard.pages[page_row]
+        page_number = int(record['page_number'])
+
+        tables = [json.loads(shard.string(table['cells_offset'], table['cells_length']))
+                  for table in shard.tables[record['table_start']:
+                                            record['table_start'] + record['table_count']]]
+
+        formulas = []
+        for formula in shard.formulas[record['formula_start']:
+                                      record['formula_start'] + record['formula_count']]:
+            bbox = [float(formula[field]) for field in ('x0', 'y0', 'x1', 'y1')]
+            formulas.append({
+                'page': page_number,
+                'text': shard.string(formula['text_offset'], formula['text_length']),
+                'font': shard.fonts[formula['font_id']],
+                'size': float(formula['size']),
+                'bbox': [] if np.isnan(bbox[0]) else bbox,
+                'spans': int(formula['spans']),
+            })
+
+        metadata: Dict[str, Any] = {}
+        if record['layout'] != _UNKNOWN_LAYOUT:
+            metadata['layout'] = LAYOUTS[record['layout']]
+        if not np.isnan(record['width']):
+            metadata['width'] = float(record['width'])
+            metadata['height'] = float(record['height'])
+        metadata.update(json.loads(shard.string(record['metadata_offset'],
+                                                record['metadata_length'])))
+
+        return {
+            'page_number': page_number,
+            'text': shard.string(record['text_offset'], record['text_length']),
+            'tables': tables,
+            'formulas': formulas,
+            'metadata': metadata,
+        }
+
+    def pages(self, doc_id: int) -> Iterator[Dict[str, Any]]:
+        """Yield a document's pages in order."""
+        shard, row = self._locate(doc_id)
+        record = shard.documents[row]
+        start = int(record['page_start'])
+        for page_row in range(start, start + int(record['page_count'])):
+            yield self._page(shard, page_row)
+
+    def text(self, doc_id: int) -> str:
+        """Return the document's ``full_text`` (rebuilt from its pages)."""
+        shard, row = self._locate(doc_id)
+        record = shard.documents[row]
+        start = int(record['page_start'])
+        texts = (shard.string(page['text_offset'], page['text_length'])
+                 for page in shard.pages[start:start + int(record['page_count'])])
+        return "\n\n".join(text for text in texts if text.strip())
+
+    def result(self, doc_id: int) -> Dict[str, Any]:
+        """Rebuild the full extract_all result dictionary for a document."""
+        header = self.document(doc_id)
+        pages = list(self.pages(doc_id))
+        return {
+            'filename': header['filename'],
+            'total_pages': header['total_pages'],
+            'full_text': "\n\n".join(page['text'] for page in pages if page['text'].strip()),
+            'pages': pages,
+            'formulas': [formula for page in pages for formula in page['formulas']],
+            'metadata': header['metadata'],
+        }
+
+    def iter_documents(self) -> Iterator[Dict[str, Any]]:
+        """Scan document headers in id order."""
+        for doc_id in range(len(self)):
+            yield self.document(doc_id)
+
+    def iter_pages(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Scan every page in the corpus as (doc_id, page) pairs."""
+        for index in range(len(self.manifest['shards'])):
+            shard = self._shard(index)
+            for page_row in range(len(shard.pages)):
+                yield int(shard.pages[page_row]['doc_id']), self._page(shard, page_row)
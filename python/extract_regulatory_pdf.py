@@ -10,121 +10,664 @@ This script extracts text from PDF files with proper handling of:
 
 Usage:
     python extract_regulatory_pdf.py input.pdf output.txt [--format json|text]
+    python extract_regulatory_pdf.py input.pdf -o output.json --format json --workers 8
+    python extract_regulatory_pdf.py *.pdf --output-dir extracted/ --file-timeout 600 --retries 1
+    python extract_regulatory_pdf.py input.pdf -o output.json --backend pymupdf --tables never
+    python extract_regulatory_pdf.py input.pdf -o output.json --tables auto --triage
+    python extract_regulatory_pdf.py input.pdf -o output.json --strip-boilerplate
+    python extract_regulatory_pdf.py input.pdf -o output.json --geometry --chunks
+    python extract_regulatory_pdf.py CRR.pdf -o CRR.ndjson --format ndjson --articles --strip-boilerplate
+    python extract_regulatory_pdf.py input.pdf -o output.json --max-memory 1024
+    python extract_regulatory_pdf.py new.pdf -o new.json --format json --incremental old.json
+    python extract_regulatory_pdf.py input.pdf -o output.json --cache-dir ~/.cache/regpdf
+    python extract_regulatory_pdf.py input.pdf -o output.ndjson --format ndjson
+    python extract_regulatory_pdf.py *.pdf --output-dir corpus/ --format corpus
+    python extract_regulatory_pdf.py input.pdf -o output.json --chunks --chunk-tokens 300 --chunk-overlap 80
+    python extract_regulatory_pdf.py *.pdf --output-dir extracted/ --chunks --index search_index/
+    python extract_regulatory_pdf.py input.pdf -o output.json --stats-json stats.json --profile run
+    python extract_regulatory_pdf.py --serve --workers 8 [--socket PATH | --port N]
+    python extract_regulatory_pdf.py --probe
+
+Library use (pdfplumber and PyMuPDF are imported on first use):
+    from extract_regulatory_pdf import extract
+    result = extract('CRR.pdf', backend='pymupdf', tables='never')
 
 Requirements:
     - pdfplumber (column detection, table extraction)
-    - pymupdf (formula extraction, advanced text)
+    - pymupdf (formula extraction, advanced text, single-pass backend)
     - pillow (image handling)
+    - numpy (only for --format corpus, --index and --geometry)
 
 Install:
     pip install pdfplumber pymupdf pillow
 """
 
+import gc
+import os
+import re
 import sys
+import copy
 import json
+import math
+import time
+import hashlib
 import argparse
+import platform
+import tempfile
+import importlib
+import contextlib
+import importlib.util
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable, Callable
 
-try:
-    import pdfplumber
-except ImportError:
-    print("ERROR: pdfplumber not installed. Run: pip install pdfplumber", file=sys.stderr)
-    sys.exit(1)
+from extraction_cache import ExtractionCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from extraction_timing import StageTimer, merge_summaries, current_rss_mb, peak_rss_mb, profiled
 
-try:
-    import fitz  # PyMuPDF
-except ImportError:
-    print("ERROR: PyMuPDF not installed. Run: pip install pymupdf", file=sys.stderr)
-    sys.exit(1)
+
+
+class _LazyModule:
+    """
+    Stand-in for a heavy dependency that is imported on first attribute access.
+
+    Runs that never touch a backend (``--probe``, ``--help``, ``--serve``
+    before the first request, pymupdf runs without tables) do not pay for
+    importing it. The first of ``names`` that imports is used.
+    """
+
+    def __init__(self, names: Tuple[str, ...], package: str):
+        self._names = names
+        self._package = package
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            for name in self._names:
+                try:
+                    self._module = importlib.import_module(name)
+                    break
+                except ImportError:
+                    continue
+            else:
+                raise ImportError(f"{self._package} not installed. Run: pip install {self._package}")
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+
+pdfplumber = _LazyModule(('pdfplumber',), 'pdfplumber')
+# 'pymupdf' first: importing it as 'fitz' prints a deprecation warning in PyMuPDF >= 1.24.3
+fitz = _LazyModule(('pymupdf', 'fitz'), 'pymupdf')
+
+# Distributions reported by --probe, with the modules that provide them
+PROBE_PACKAGES = {'pdfplumber': ('pdfplumber',), 'pymupdf': ('pymupdf', 'fitz'),
+                  'pillow': ('PIL',), 'numpy': ('numpy',)}
+REQUIRED_PACKAGES = ('pdfplumber', 'pymupdf', 'pillow')
+
+# Bump whenever extraction output changes so cached results are invalidated
+EXTRACTOR_VERSION = '1.6'
+
+
+# Default output file suffix per --format
+OUTPUT_SUFFIXES = {'text': '.txt', 'json': '.json', 'ndjson': '.ndjson'}
+
+# Characters that mark a span as mathematical: operators, Greek letters
+# and Unicode sub/superscript digits
+MATH_SYMBOLS = '∑∫∂√∞≈≤≥±×÷∈∉⊂⊆∪∩αβγδεθλμπστφψωΔΣΠ'
+SUBSCRIPT_DIGITS = '₀₁₂₃₄₅₆₇₈₉'
+SUPERSCRIPT_DIGITS = '⁰¹²³⁴⁵⁶⁷⁸⁹'
+_MATH_CHARS = re.compile('[' + re.escape(MATH_SYMBOLS + SUBSCRIPT_DIGITS + SUPERSCRIPT_DIGITS) + ']')
+
+# Body font size assumed when the document's own cannot be measured
+DEFAULT_BODY_FONT_SIZE = 10.0
+
+# Equation-like spans ("x = y + z") must be larger than this share of the
+# body font size, which filters out footnotes and small print. The cutoff
+# never exceeds EQUATION_MAX_MIN_SIZE (the original fixed threshold), so
+# documents with large body text keep every equation it found
+EQUATION_MIN_SIZE_RATIO = 0.9
+EQUATION_MAX_MIN_SIZE = 9.0
+
+# Spans smaller than this share of the body size, and at most
+# MAX_SCRIPT_CHARS long, are sub/superscripts of a preceding formula
+SCRIPT_SIZE_RATIO = 0.85
+MAX_SCRIPT_CHARS = 3
+
+# Non-formula spans of at most this many characters between two candidate
+# spans on a line (operands such as "(1 - R)") are kept in the expression
+MAX_BRIDGE_CHARS = 24
+
+# Pages sampled to estimate the body font size
+FONT_SAMPLE_PAGES = 16
+
+# Table extraction modes: 'auto' runs pdfplumber's table finder only on
+# pages whose ruling lines/rectangles could form a table grid. 'always' is the
+# default because it keeps the text and layout of pre-triage releases, which
+# chunk ids and embeddings downstream were built from
+TABLE_MODES = ('auto', 'always', 'never')
+
+# Half-width of the central band (as a share of page width) whose glyph
+# density separates a column gutter from full-width text
+GUTTER_HALF_WIDTH = 0.01
+GUTTER_MAX_GLYPH_RATIO = 0.01
+
+# A page without glyphs counts as scanned when images cover this share
+SCANNED_MIN_IMAGE_COVERAGE = 0.5
+
+# Font names that indicate mathematical typesetting
+_MATH_FONT = re.compile(r'math|cmmi|cmsy|cmex|symbol|stix|mt\s*extra', re.IGNORECASE)
+
+# Layout engines. 'pdfplumber' crops each page into halves to detect columns
+# and rescans the document with PyMuPDF for formulas; 'pymupdf' reads each
+# page's span dictionary once and derives layout, text and formulas from it.
+BACKENDS = ('pdfplumber', 'pymupdf')
+
+# Stand-in for StageTimer.stage() when no timer is configured
+_NO_TIMING = contextlib.nullcontext()
+
+# Minimum characters each side must hold for a page to count as two-column
+COLUMN_MIN_CHARS = 100
+
+# Maximum share of characters on lines crossing the page centre for the
+# pymupdf backend to still treat a page as two-column
+COLUMN_MAX_SPANNING_RATIO = 0.1
+
+# Running headers, footers and page numbers: lines in the top/bottom
+# BOILERPLATE_MARGIN of the page whose text (digits masked) recurs at the
+# same height, in BOILERPLATE_Y_BUCKETS bands, on at least
+# BOILERPLATE_MIN_SHARE of the sampled pages (and BOILERPLATE_MIN_PAGES)
+BOILERPLATE_SAMPLE_PAGES = 64
+BOILERPLATE_MARGIN = 0.08
+BOILERPLATE_Y_BUCKETS = 100
+BOILERPLATE_MIN_SHARE = 0.3
+BOILERPLATE_MIN_PAGES = 3
+
+# Boilerplate is only removed from the first/last lines of each column
+BOILERPLATE_EDGE_LINES = 3
+
+# Low-memory mode (--max-memory): reopen the PDF once resident memory passes
+# this share of the cap, at most every LOW_MEMORY_MIN_PAGES pages, or every
+# LOW_MEMORY_REOPEN_PAGES pages where memory cannot be measured. The cap is a
+# soft target: the interpreter and parser libraries alone take around 100 MB,
+# and nothing stops a single large page from exceeding it
+LOW_MEMORY_SOFT_LIMIT = 0.8
+LOW_MEMORY_MIN_PAGES = 8
+LOW_MEMORY_REOPEN_PAGES = 100
+
+_DIGIT_RUN = re.compile(r'\d+')
 
 
 class RegulatoryPDFExtractor:
     """Extract text from multi-column regulatory PDFs."""
 
-    def __init__(self, pdf_path: str, verbose: bool = True):
+    def __init__(self, pdf_path: str, verbose: bool = True,
+                 backend: str = 'pdfplumber', tables: str = 'always', triage: bool = False,
+                 cache: Optional[ExtractionCache] = None,
+                 body_font_size: Optional[float] = None,
+                 timer: Optional[StageTimer] = None,
+                 strip_boilerplate: bool = False,
+                 boilerplate_patterns: Optional[List[Dict[str, Any]]] = None,
+                 max_memory_mb: Optional[int] = None,
+                 geometry: bool = False):
         self.pdf_path = Path(pdf_path)
         self.verbose = verbose
+        self.backend = backend
+        self.tables = tables
+        self.triage = triage
+        self.cache = cache
+        self.body_font_size = body_font_size
+        # As given: estimate_body_font_size() fills in body_font_size itself
+        self._body_font_size_option = body_font_size
+        self.timer = timer
+        self.strip_boilerplate = strip_boilerplate
+        self.boilerplate_patterns = boilerplate_patterns
+        self.max_memory_mb = max_memory_mb
+        self.geometry = None
+        if geometry:
+            from page_geometry import GeometryBuilder
+            self.geometry = GeometryBuilder()
+        self.parser_resets = 0
+        self._memory_warned = False
+        self._rss_start: Optional[float] = None
+        self._rss_peak: Optional[float] = None
+        self.last_cache_hit: Optional[bool] = None
+
+        if tables not in TABLE_MODES:
+            raise ValueError(f"Unknown table mode: {tables} (choose from {', '.join(TABLE_MODES)})")
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (choose from {', '.join(BACKENDS)})")
 
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
+    def _worker_options(self) -> Dict[str, Any]:
+        """Constructor options needed to rebuild this extractor in a worker."""
+        return {'backend': self.backend, 'tables': self.tables, 'triage': self.triage,
+                'body_font_size': self.body_font_size,
+                'timer': StageTimer() if self.timer is not None else None,
+                'strip_boilerplate': self.strip_boilerplate,
+                'boilerplate_patterns': self.boilerplate_patterns,
+                'geometry': self.geometry is not None}
+
+    def _stage(self, name: str, page_num: Optional[int] = None):
+        """Time a pipeline stage when a timer is configured (no-op otherwise)."""
+        if self.timer is None:
+            return _NO_TIMING
+        return self.timer.stage(name, page_num)
+
+    def _finish_page(self, page_data: Dict[str, Any],
+                     words: Optional[List[Tuple[Any, ...]]] = None) -> Dict[str, Any]:
+        """
+        Strip boilerplate if enabled, record word geometry when collecting it,
+        and attach the page's stage timings when timing.
+        """
+        if self.boilerplate_patterns:
+            with self._stage('boilerplate', page_data['page_number']):
+                self._remove_boilerplate(page_data)
+        if self.geometry is not None:
+            with self._stage('geometry', page_data['page_number']):
+                self.geometry.add_page(page_data, words or [])
+        if self.timer is not None:
+            page_data['metadata']['timings'] = self.timer.take_page(page_data['page_number'])
+        return page_data
+
     def log(self, message: str):
         """Print message if verbose."""
         if self.verbose:
             print(f"[INFO] {message}", file=sys.stderr)
 
-    def extract_with_column_detection(self) -> List[Dict[str, Any]]:
+    def estimate_body_font_size(self, doc=None) -> float:
+        """
+        Estimate the document's body font size from its font statistics.
+
+        The size carrying the most characters over an evenly spaced sample
+        of pages is taken as body text. The result is stored on the
+        extractor so workers and later pages reuse it.
+
+        Args:
+            doc: Open PyMuPDF document to sample (opened here if omitted).
+
+        Returns:
+            Body font size in points.
+        """
+        if self.body_font_size is not None:
+            return self.body_font_size
+
+        own_doc = doc is None
+        if own_doc:
+            doc = fitz.open(self.pdf_path)
+        try:
+            total = doc.page_count
+            step = max(1, total // FONT_SAMPLE_PAGES)
+            sizes: Counter = Counter()
+            with self._stage('fonts'):
+                for index in range(0, total, step):
+                    for block in doc[index].get_text("dict")["blocks"]:
+                        for line in block.get("lines", ()):
+                            for span in line.get("spans", ()):
+                                sizes[round(span.get("size", 0), 1)] += len(span.get("text", "").strip())
+        finally:
+            if own_doc:
+                doc.close()
+
+        sizes.pop(0.0, None)
+        self.body_font_size = sizes.most_common(1)[0][0] if sizes else DEFAULT_BODY_FONT_SIZE
+        self.log(f"Body font size: {self.body_font_size}pt")
+        return self.body_font_size
+
+    def detect_boilerplate(self, doc=None) -> List[Dict[str, Any]]:
+        """
+        Find running headers, footers and page numbers.
+
+        Text rows in the top and bottom page margins of an evenly spaced
+        sample of pages are hashed (whitespace removed, digit runs masked
+        so "L 176/12" and "L 176/13" agree) and bucketed by vertical
+        position; a hash that recurs in the same or an adjacent bucket on
+        enough sampled pages is boilerplate. For two-column pages the left
+        and right halves of a row are also hashed, split word by word at
+        the page centre as the column crop splits them (a centred header
+        straddles it). The result is stored on the extractor so workers
+        reuse it.
+
+        Args:
+            doc: Open PyMuPDF document to sample (opened here if omitted).
+
+        Returns:
+            Patterns with the line ``hash``, an example ``text``, its
+            relative height ``y``, ``position`` (top/bottom) and the number
+            of sampled ``pages`` it was found on.
+        """
+        if self.boilerplate_patterns is not None:
+            return self.boilerplate_patterns
+
+        own_doc = doc is None
+        if own_doc:
+            doc = fitz.open(self.pdf_path)
+        seen: Dict[Tuple[str, int], set] = {}
+        examples: Dict[str, Tuple[str, float]] = {}
+        try:
+            total = doc.page_count
+            sampled = range(0, total, max(1, total // BOILERPLATE_SAMPLE_PAGES))
+            with self._stage('boilerplate'):
+                for index in sampled:
+                    page = doc[index]
+                    width, height = page.rect.width, page.rect.height
+                    margin = [(word[:4], word[4]) for word in page.get_text("words")
+                              if word[3] <= height * BOILERPLATE_MARGIN
+                              or word[1] >= height * (1 - BOILERPLATE_MARGIN)]
+
+                    for row in _group_rows(margin):
+                        y = sum((bbox[1] + bbox[3]) / 2 for bbox, _ in row) / len(row) / height
+                        bucket = int(y * BOILERPLATE_Y_BUCKETS)
+                        halves = ([item for item in row if (item[0][0] + item[0][2]) / 2 < width / 2],
+                                  [item for item in row if (item[0][0] + item[0][2]) / 2 >= width / 2])
+                        for pieces in (row, *halves):
+                            if not pieces:
+                                continue
+                            text = " ".join(text.strip() for _, text in pieces)
+                            line_hash = _boilerplate_hash(text)
+                            seen.setdefault((line_hash, bucket), set()).add(index)
+                            examples.setdefault(line_hash, (text, y))
+        finally:
+            if own_doc:
+                doc.close()
+
+        needed = max(BOILERPLATE_MIN_PAGES, math.ceil(BOILERPLATE_MIN_SHARE * len(sampled)))
+        patterns: Dict[str, Dict[str, Any]] = {}
+        for line_hash, bucket in seen:
+            pages = set().union(*(seen.get((line_hash, near), ())
+                                  for near in (bucket - 1, bucket, bucket + 1)))
+            if len(pages) >= needed and len(pages) > patterns.get(line_hash, {}).get('pages', 0):
+                text, y = examples[line_hash]
+                patterns[line_hash] = {'hash': line_hash, 'text': text, 'y': round(y, 3),
+                                       'position': 'top' if y < 0.5 else 'bottom',
+                                       'pages': len(pages)}
+
+        self.boilerplate_patterns = sorted(patterns.values(), key=lambda pattern: pattern['y'])
+        self.log(f"Boilerplate: {len(self.boilerplate_patterns)} repeated header/footer lines "
+                 f"in {len(sampled)} sampled pages")
+        return self.boilerplate_patterns
+
+    def _remove_boilerplate(self, page_data: Dict[str, Any]):
+        """Drop boilerplate lines at the edges of each column of a page's text."""
+        hashes = {pattern['hash'] for pattern in self.boilerplate_patterns}
+        removed = []
+        columns = []
+        for column in page_data['text'].split("\n\n"):
+            lines = column.split("\n")
+            edges = set(range(min(BOILERPLATE_EDGE_LINES, len(lines))))
+            edges.update(range(max(0, len(lines) - BOILERPLATE_EDGE_LINES), len(lines)))
+            kept = []
+            for index, line in enumerate(lines):
+                if index in edges and line.strip() and _boilerplate_hash(line) in hashes:
+                    removed.append(line)
+                else:
+                    kept.append(line)
+            columns.append("\n".join(kept).strip("\n") if len(kept) < len(lines) else column)
+
+        if removed:
+            original = len(page_data['text'])
+            page_data['text'] = "\n\n".join(column for column in columns if column)
+            page_data['metadata']['boilerplate'] = {
+                'removed_lines': removed,
+                'chars_saved': original - len(page_data['text'])
+            }
+
+    def page_count(self) -> int:
+        """Return the number of pages in the PDF."""
+        with fitz.open(self.pdf_path) as doc:
+            return doc.page_count
+
+    def extract_page_range(self, start_page: int = 1, end_page: Optional[int] = None,
+                           include_formulas: bool = True) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Extract pages and formulas for a page range with the configured backend.
+
+        Args:
+            start_page: First page to extract (1-based, inclusive).
+            end_page: Last page to extract (inclusive, default: last page).
+            include_formulas: Whether to collect formula candidates.
+
+        Returns:
+            Tuple of (pages, formulas) in page order.
+        """
+        pages = list(self.iter_pages(start_page, end_page, include_formulas))
+        formulas = [formula for page in pages for formula in page['formulas']]
+
+        if formulas:
+            self.log(f"Found {len(formulas)} potential formulas")
+
+        return pages, formulas
+
+    def iter_pages(self, start_page: int = 1, end_page: Optional[int] = None,
+                   include_formulas: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yield page dictionaries one at a time as they are extracted.
+
+        Each page carries its own formula candidates, so nothing beyond the
+        current page is held in memory and callers can start consuming
+        page 1 while later pages are still being parsed.
+
+        Args:
+            start_page: First page to extract (1-based, inclusive).
+            end_page: Last page to extract (inclusive, default: last page).
+            include_formulas: Whether to collect formula candidates.
+
+        Yields:
+            Page dictionaries in page order.
+        """
+        if self.backend == 'pymupdf':
+            return self._iter_pymupdf_pages(start_page, end_page, include_formulas)
+        return self._iter_pdfplumber_pages(start_page, end_page, include_formulas)
+
+    def _iter_pdfplumber_pages(self, start_page: int, end_page: Optional[int],
+                               include_formulas: bool) -> Iterator[Dict[str, Any]]:
+        """Yield pages using pdfplumber layout plus a PyMuPDF formula scan."""
+        page_num = start_page
+        while True:
+            with pdfplumber.open(self.pdf_path) as pdf:
+                doc = fitz.open(self.pdf_path) if include_formulas else None
+                try:
+                    total = len(pdf.pages)
+                    last = total if end_page is None else min(end_page, total)
+                    if page_num == start_page:
+                        self.log(f"Opened PDF: {self.pdf_path.name}")
+                        self.log(f"Total pages: {total}")
+                        if doc is not None:
+                            self.estimate_body_font_size(doc)
+                        if self.strip_boilerplate:
+                            self.detect_boilerplate(doc)
+
+                    opened_at = page_num
+                    while page_num <= last:
+                        page = pdf.pages[page_num - 1]
+                        self.log(f"Processing page {page_num}/{total}...")
+                        page_data = self._extract_page_layout(page, page_num)
+                        if doc is not None and self._wants_formulas(page_data):
+                            with self._stage('formulas', page_num):
+                                page_data['formulas'] = self._scan_page_formulas(doc[page_num - 1], page_num)
+                        words = self._pdfplumber_words(page) if self.geometry is not None else None
+                        # Drop pdfplumber's cached layout objects for this page
+                        page.close()
+                        page_num += 1
+                        yield self._finish_page(page_data, words)
+                        if self._should_release(page_num - opened_at):
+                            break
+                    else:
+                        return
+                finally:
+                    if doc is not None:
+                        doc.close()
+            self._release_parser_state()
+
+    def extract_with_column_detection(self, start_page: int = 1,
+                                      end_page: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Extract text using pdfplumber with column detection.
 
+        Args:
+            start_page: First page to extract (1-based, inclusive).
+            end_page: Last page to extract (inclusive, default: last page).
+
         Returns:
             List of page dictionaries with extracted content.
         """
         pages_data = []
 
         with pdfplumber.open(self.pdf_path) as pdf:
+            total = len(pdf.pages)
+            last = total if end_page is None else min(end_page, total)
             self.log(f"Opened PDF: {self.pdf_path.name}")
-            self.log(f"Total pages: {len(pdf.pages)}")
-
-            for page_num, page in enumerate(pdf.pages, start=1):
-                self.log(f"Processing page {page_num}/{len(pdf.pages)}...")
-
-                page_data = {
-                    'page_number': page_num,
-                    'text': '',
-                    'tables': [],
-                    'formulas': [],
-                    'metadata': {}
-                }
-
-                # Detect if page has columns
-                width = page.width
-                height = page.height
-
-                # Try to detect two-column layout
-                # Strategy: Split page vertically and check text density
-                left_bbox = (0, 0, width / 2, height)
-                right_bbox = (width / 2, 0, width, height)
-
-                left_crop = page.crop(left_bbox)
-                right_crop = page.crop(right_bbox)
-
-                left_text = left_crop.extract_text() or ""
-                right_text = right_crop.extract_text() or ""
-
-                # If both columns have substantial text, it's two-column
-                if len(left_text.strip()) > 100 and len(right_text.strip()) > 100:
-                    # Two-column layout: read left column first, then right
-                    page_data['text'] = f"{left_text}\n\n{right_text}"
-                    page_data['metadata']['layout'] = 'two_column'
-                    self.log(f"  Detected two-column layout on page {page_num}")
-                else:
-                    # Single column or complex layout: use default extraction
-                    page_data['text'] = page.extract_text() or ""
-                    page_data['metadata']['layout'] = 'single_column'
-
-                # Extract tables
-                tables = page.extract_tables()
-                if tables:
-                    self.log(f"  Found {len(tables)} tables on page {page_num}")
-                    page_data['tables'] = tables
+            self.log(f"Total pages: {total}")
+            if self.strip_boilerplate:
+                self.detect_boilerplate()
+
+            for page_num in range(start_page, last + 1):
+                page = pdf.pages[page_num - 1]
+                self.log(f"Processing page {page_num}/{total}...")
+                page_data = self._extract_page_layout(page, page_num)
+                words = self._pdfplumber_words(page) if self.geometry is not None else None
+                page.close()
+                pages_data.append(self._finish_page(page_data, words))
 
-                # Store page dimensions
-                page_data['metadata']['width'] = width
-                page_data['metadata']['height'] = height
+        return pages_data
 
-                pages_data.append(page_data)
+    def _extract_page_layout(self, page, page_num: int) -> Dict[str, Any]:
+        """Extract text, layout and tables from a single pdfplumber page."""
+        page_data = {
+            'page_number': page_num,
+            'text': '',
+            'tables': [],
+            'formulas': [],
+            'metadata': {}
+        }
 
-        return pages_data
+        # Detect if page has columns
+        width = page.width
+        height = page.height
+
+        routes = None
+        if self.triage or self.tables == 'auto':
+            # pdfplumber parses the page's objects lazily, on first use here
+            with self._stage('triage', page_num):
+                page_data['metadata']['triage'] = self._triage_pdfplumber_page(page)
+            routes = page_data['metadata']['triage']['routes']
+
+        with self._stage('columns', page_num):
+            if self.triage and not routes['columns']:
+                # Triage found no column gutter (or no text): one extraction suffices
+                page_data['text'] = (page.extract_text() or "") if routes['text'] else ""
+                page_data['metadata']['layout'] = 'single_column'
+            else:
+                self._split_columns(page, page_data)
 
-    def extract_formulas_with_pymupdf(self) -> List[Dict[str, Any]]:
+        # Extract tables
+        if self.tables == 'always' or (self.tables == 'auto' and routes['tables']):
+            with self._stage('tables', page_num):
+                tables = page.extract_tables()
+            if tables:
+                self.log(f"  Found {len(tables)} tables on page {page_num}")
+                page_data['tables'] = tables
+
+        # Store page dimensions
+        page_data['metadata']['width'] = width
+        page_data['metadata']['height'] = height
+
+        return page_data
+
+    def _split_columns(self, page, page_data: Dict[str, Any]):
+        """Fill text and layout by cropping a pdfplumber page into halves."""
+        page_num = page_data['page_number']
+        width = page.width
+        height = page.height
+
+        # Try to detect two-column layout
+        # Strategy: Split page vertically and check text density
+        left_bbox = (0, 0, width / 2, height)
+        right_bbox = (width / 2, 0, width, height)
+
+        left_crop = page.crop(left_bbox)
+        right_crop = page.crop(right_bbox)
+
+        left_text = left_crop.extract_text() or ""
+        right_text = right_crop.extract_text() or ""
+
+        # If both columns have substantial text, it's two-column
+        if (len(left_text.strip()) > COLUMN_MIN_CHARS
+                and len(right_text.strip()) > COLUMN_MIN_CHARS):
+            # Two-column layout: read left column first, then right
+            page_data['text'] = f"{left_text}\n\n{right_text}"
+            page_data['metadata']['layout'] = 'two_column'
+            self.log(f"  Detected two-column layout on page {page_num}")
+        else:
+            # Single column or complex layout: use default extraction
+            page_data['text'] = page.extract_text() or ""
+            page_data['metadata']['layout'] = 'single_column'
+
+    def _pdfplumber_words(self, page) -> List[Tuple[Any, ...]]:
+        """Words of a pdfplumber page as (x0, y0, x1, y1, text, font, size) for the geometry store."""
+        with self._stage('geometry', page.page_number):
+            return [(word['x0'], word['top'], word['x1'], word['bottom'], word['text'],
+                     word.get('fontname', ''), word.get('size', 0.0))
+                    for word in page.extract_words(extra_attrs=['fontname', 'size'])]
+
+    def _triage_pdfplumber_page(self, page) -> Dict[str, Any]:
+        """Collect cheap routing signals from a pdfplumber page's objects."""
+        width = page.width
+        mid = width / 2
+        band = GUTTER_HALF_WIDTH * width
+
+        chars = page.chars
+        left = right = central = 0
+        fonts = set()
+        for char in chars:
+            if char['x1'] <= mid:
+                left += 1
+            elif char['x0'] >= mid:
+                right += 1
+            if char['x1'] > mid - band and char['x0'] < mid + band:
+                central += 1
+            fonts.add(char.get('fontname', ''))
+        text = "".join(char['text'] for char in chars)
+
+        horizontal = vertical = 0
+        for line in page.lines:
+            if abs(line['top'] - line['bottom']) < 1:
+                horizontal += 1
+            elif abs(line['x0'] - line['x1']) < 1:
+                vertical += 1
+        # Rectangles and curves contribute both edge orientations
+        horizontal += 2 * (len(page.rects) + len(page.curves))
+        vertical += 2 * (len(page.rects) + len(page.curves))
+
+        image_area = sum(max(0, image['x1'] - image['x0']) * max(0, image['bottom'] - image['top'])
+                         for image in page.images)
+
+        return triage_page(
+            glyphs=len(text.strip()),
+            left_glyphs=left,
+            right_glyphs=right,
+            column_gutter=bool(chars) and central <= GUTTER_MAX_GLYPH_RATIO * len(chars),
+            image_coverage=image_area / (width * page.height) if width and page.height else 0.0,
+            rulings=(horizontal, vertical),
+            has_math=_MATH_CHARS.search(text) is not None or '=' in text,
+            math_font=any(_MATH_FONT.search(font) for font in fonts),
+        )
+
+    def extract_formulas_with_pymupdf(self, start_page: int = 1,
+                                      end_page: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Extract mathematical formulas using PyMuPDF.
 
         PyMuPDF can identify text blocks that are likely formulas
         based on font, size, and positioning.
 
+        Args:
+            start_page: First page to scan (1-based, inclusive).
+            end_page: Last page to scan (inclusive, default: last page).
+
         Returns:
             List of formula dictionaries.
         """
@@ -132,43 +675,11 @@ class RegulatoryPDFExtractor:
 
         doc = fitz.open(self.pdf_path)
         self.log(f"Scanning for formulas with PyMuPDF...")
+        self.estimate_body_font_size(doc)
 
-        for page_num, page in enumerate(doc, start=1):
-            # Get text with formatting information
-            blocks = page.get_text("dict")["blocks"]
-
-            for block_num, block in enumerate(blocks):
-                if block.get("type") == 0:  # Text block
-                    for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            text = span.get("text", "").strip()
-                            font = span.get("font", "")
-                            size = span.get("size", 0)
-
-                            # Heuristic: Detect formulas
-                            # - Contains math symbols
-                            # - Uses serif/math fonts
-                            # - Different size than body text
-                            math_symbols = ['∑', '∫', '∂', '√', '∞', '≈', '≤', '≥', '±', '×', '÷',
-                                          '∈', '∉', '⊂', '⊆', '∪', '∩', 'α', 'β', 'γ', 'δ', 'ε',
-                                          'θ', 'λ', 'μ', 'π', 'σ', 'τ', 'φ', 'ψ', 'ω', 'Δ', 'Σ', 'Π']
-
-                            has_math_symbols = any(sym in text for sym in math_symbols)
-                            has_subscripts = any(c in text for c in ['₀', '₁', '₂', '₃', '₄', '₅', '₆', '₇', '₈', '₉'])
-                            has_superscripts = any(c in text for c in ['⁰', '¹', '²', '³', '⁴', '⁵', '⁶', '⁷', '⁸', '⁹'])
-
-                            # Check for formula-like patterns (e.g., "x = y + z")
-                            has_equation_pattern = '=' in text and len(text) < 200
-
-                            if has_math_symbols or has_subscripts or has_superscripts or (has_equation_pattern and size > 9):
-                                formula = {
-                                    'page': page_num,
-                                    'text': text,
-                                    'font': font,
-                                    'size': size,
-                                    'bbox': span.get('bbox', [])
-                                }
-                                formulas.append(formula)
+        last = doc.page_count if end_page is None else min(end_page, doc.page_count)
+        for page_num in range(start_page, last + 1):
+            formulas.extend(self._scan_page_formulas(doc[page_num - 1], page_num))
 
         doc.close()
 
@@ -177,54 +688,716 @@ class RegulatoryPDFExtractor:
 
         return formulas
 
-    def extract_all(self, include_formulas: bool = True) -> Dict[str, Any]:
+    def _scan_page_formulas(self, page, page_num: int) -> List[Dict[str, Any]]:
+        """Return formula candidates from the text spans of one PyMuPDF page."""
+        # Get text with formatting information
+        blocks = page.get_text("dict")["blocks"]
+        return self._formula_candidates(blocks, page_num)
+
+    def _formula_candidates(self, blocks: List[Dict[str, Any]], page_num: int) -> List[Dict[str, Any]]:
+        """
+        Return formula expressions from PyMuPDF text blocks.
+
+        A span is a formula candidate if it contains a math symbol or a
+        sub/superscript digit, or if it looks like an equation and is not
+        set in small print (below 90% of the body size, and never stricter
+        than the original ``size > 9``). Candidate spans on a line are
+        merged into one expression together with the small script spans
+        that follow them and short operand spans between them.
+        """
+        body_size = self.body_font_size or DEFAULT_BODY_FONT_SIZE
+        min_equation_size = min(EQUATION_MAX_MIN_SIZE, EQUATION_MIN_SIZE_RATIO * body_size)
+        max_script_size = SCRIPT_SIZE_RATIO * body_size
+
+        formulas = []
+        for block in blocks:
+            if block.get("type") != 0:  # Text blocks only
+                continue
+            for line in block.get("lines", ()):
+                group = None
+                bridge: List[Dict[str, Any]] = []
+                for span in line.get("spans", ()):
+                    raw = span.get("text", "")
+                    text = raw.strip()
+                    size = span.get("size", 0)
+
+                    if not text:
+                        # Whitespace neither starts nor ends an expression
+                        if group is not None:
+                            bridge.append(span)
+                        continue
+
+                    is_formula = (_MATH_CHARS.search(text) is not None
+                                  or ('=' in text and len(text) < 200 and size > min_equation_size))
+                    is_script = (group is not None and size < max_script_size
+                                 and len(text) <= MAX_SCRIPT_CHARS)
+
+                    if is_formula or is_script:
+                        if group is None:
+                            group = {
+                                'page': page_num,
+                                'text': raw,
+                                'font': span.get("font", ""),
+                                'size': size,
+                                'bbox': list(span.get('bbox', ())),
+                                'spans': 1
+                            }
+                        else:
+                            # Short operands between candidates belong to the expression
+                            for between in bridge:
+                                _extend_formula(group, between.get("text", ""),
+                                                between.get("size", 0), between.get('bbox', ()))
+                            _extend_formula(group, raw, size, span.get('bbox', ()))
+                        bridge = []
+                    elif group is not None and len(text) <= MAX_BRIDGE_CHARS:
+                        bridge.append(span)
+                    elif group is not None:
+                        formulas.append(_finish_formula(group))
+                        group = None
+                        bridge = []
+
+                if group is not None:
+                    formulas.append(_finish_formula(group))
+
+        return formulas
+
+    def extract_with_pymupdf_layout(self, start_page: int = 1, end_page: Optional[int] = None,
+                                    include_formulas: bool = True) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Extract pages in a single PyMuPDF pass.
+
+        Each page's span dictionary is read once; column layout is classified
+        from the x-extent of its text lines, reading-order text is assembled
+        from the same lines, and formula candidates come from the same spans.
+        pdfplumber is only opened when tables are requested.
+
+        Args:
+            start_page: First page to extract (1-based, inclusive).
+            end_page: Last page to extract (inclusive, default: last page).
+            include_formulas: Whether to collect formula candidates.
+
+        Returns:
+            Tuple of (pages, formulas) in page order.
+        """
+        pages = list(self._iter_pymupdf_pages(start_page, end_page, include_formulas))
+        formulas = [formula for page in pages for formula in page['formulas']]
+        return pages, formulas
+
+    def _iter_pymupdf_pages(self, start_page: int, end_page: Optional[int],
+                            include_formulas: bool) -> Iterator[Dict[str, Any]]:
+        """Yield pages from a single PyMuPDF pass (pdfplumber only for tables)."""
+        page_num = start_page
+        plumber = None
+
+        def plumber_page(number: int):
+            # pdfplumber is only imported and opened once a page needs tables
+            nonlocal plumber
+            if plumber is None:
+                plumber = pdfplumber.open(self.pdf_path)
+            return plumber.pages[number - 1]
+
+        while True:
+            doc = fitz.open(self.pdf_path)
+            try:
+                total = doc.page_count
+                last = total if end_page is None else min(end_page, total)
+                if page_num == start_page:
+                    self.log(f"Opened PDF: {self.pdf_path.name}")
+                    self.log(f"Total pages: {total}")
+                    if include_formulas:
+                        self.estimate_body_font_size(doc)
+                    if self.strip_boilerplate:
+                        self.detect_boilerplate(doc)
+
+                opened_at = page_num
+                while page_num <= last:
+                    self.log(f"Processing page {page_num}/{total}...")
+                    page_data, words = self._extract_pymupdf_page(
+                        doc[page_num - 1], page_num,
+                        plumber_page if self.tables != 'never' else None, include_formulas)
+                    page_num += 1
+                    yield self._finish_page(page_data, words)
+                    if self._should_release(page_num - opened_at):
+                        break
+                else:
+                    return
+            finally:
+                doc.close()
+                if plumber is not None:
+                    plumber.close()
+                    plumber = None
+            self._release_parser_state()
+
+    def _extract_pymupdf_page(self, page, page_num: int,
+                              plumber_page: Optional[Callable[[int], Any]],
+                              include_formulas: bool) -> Tuple[Dict[str, Any], Optional[List[Tuple[Any, ...]]]]:
+        """
+        Extract one PyMuPDF page (tables from ``plumber_page(page_num)``, if given).
+
+        Returns:
+            Tuple of (page dictionary, words for the geometry store or None
+            when geometry is not collected).
+        """
+        with self._stage('parse', page_num):
+            blocks = page.get_text("dict")["blocks"]
+
+        with self._stage('columns', page_num):
+            page_data = self._layout_from_blocks(blocks, page_num,
+                                                 page.rect.width, page.rect.height)
+        if self.triage or self.tables == 'auto':
+            with self._stage('triage', page_num):
+                page_data['metadata']['triage'] = self._triage_pymupdf_page(
+                    page, blocks, page_data['metadata']['layout'] == 'two_column')
+
+        if plumber_page is not None and (self.tables == 'always'
+                                         or page_data['metadata']['triage']['routes']['tables']):
+            with self._stage('tables', page_num):
+                table_page = plumber_page(page_num)
+                tables = table_page.extract_tables()
+                table_page.close()
+            if tables:
+                self.log(f"  Found {len(tables)} tables on page {page_num}")
+                page_data['tables'] = tables
+
+        if include_formulas and self._wants_formulas(page_data):
+            with self._stage('formulas', page_num):
+                page_data['formulas'] = self._formula_candidates(blocks, page_num)
+
+        words = None
+        if self.geometry is not None:
+            with self._stage('geometry', page_num):
+                words = _pymupdf_words(page, blocks)
+
+        return page_data, words
+
+    def _should_release(self, pages_since_open: int) -> bool:
+        """
+        Whether low-memory mode should reopen the PDF before the next page.
+
+        Parsers cache objects for every page they have read, so handles are
+        reopened once resident memory passes LOW_MEMORY_SOFT_LIMIT of the
+        cap (or, where it cannot be measured, every LOW_MEMORY_REOPEN_PAGES
+        pages), but never more often than every LOW_MEMORY_MIN_PAGES pages.
+        Each call also samples RSS for the document's ``metadata.memory``.
+        """
+        if self.max_memory_mb is None:
+            return False
+        rss = self._sample_rss()
+        if pages_since_open < LOW_MEMORY_MIN_PAGES:
+            return False
+        if rss is None:
+            return pages_since_open >= LOW_MEMORY_REOPEN_PAGES
+        return rss > self.max_memory_mb * LOW_MEMORY_SOFT_LIMIT
+
+    def _start_memory_tracking(self):
+        """Reset low-memory counters and take the RSS baseline for this document."""
+        self.parser_resets = 0
+        self._memory_warned = False
+        self._rss_start = self._rss_peak = current_rss_mb()
+
+    def _sample_rss(self) -> Optional[float]:
+        """Read current RSS and keep the highest value seen for this document."""
+        rss = current_rss_mb()
+        if rss is not None and (self._rss_peak is None or rss > self._rss_peak):
+            self._rss_peak = rss
+        return rss
+
+    def _release_parser_state(self):
+        """Free parser caches after the PDF handles were closed."""
+        gc.collect()
+        fitz.TOOLS.store_shrink(100)
+        self.parser_resets += 1
+        rss = self._sample_rss()
+        self.log(f"Reopened PDF to release parser state (RSS {rss} MB)")
+        if rss is not None and rss > self.max_memory_mb and not self._memory_warned:
+            self._memory_warned = True
+            print(f"WARNING: {self.pdf_path.name}: resident memory ({rss} MB) stays above "
+                  f"--max-memory {self.max_memory_mb} MB after releasing parser state",
+                  file=sys.stderr)
+
+    def _triage_pymupdf_page(self, page, blocks: List[Dict[str, Any]],
+                             two_column: bool) -> Dict[str, Any]:
+        """Collect cheap routing signals from a PyMuPDF page's span dictionary."""
+        width, height = page.rect.width, page.rect.height
+        mid = width / 2
+
+        glyphs = left = right = 0
+        image_area = 0.0
+        has_math = math_font = False
+        for block in blocks:
+            if block.get("type") == 1:  # Image block
+                x0, y0, x1, y1 = block["bbox"]
+                image_area += max(0, x1 - x0) * max(0, y1 - y0)
+                continue
+            for line in block.get("lines", ()):
+                for span in line.get("spans", ()):
+                    text = span.get("text", "").strip()
+                    if not text:
+                        continue
+                    glyphs += len(text)
+                    if span["bbox"][2] <= mid:
+                        left += len(text)
+                    elif span["bbox"][0] >= mid:
+                        right += len(text)
+                    if not has_math and ('=' in text or _MATH_CHARS.search(text)):
+                        has_math = True
+                    if not math_font and _MATH_FONT.search(span.get("font", "")):
+                        math_font = True
+
+        # Vector drawings are only needed to decide on table extraction
+        horizontal = vertical = 0
+        if self.tables == 'auto':
+            for path in page.get_cdrawings():
+                for item in path.get("items", ()):
+                    if item[0] == 'l':
+                        p1, p2 = item[1], item[2]
+                        if abs(p1[1] - p2[1]) < 1:
+                            horizontal += 1
+                        elif abs(p1[0] - p2[0]) < 1:
+                            vertical += 1
+                    else:
+                        # Rectangles, quads and curves carry both orientations
+                        horizontal += 2
+                        vertical += 2
+
+        return triage_page(
+            glyphs=glyphs,
+            left_glyphs=left,
+            right_glyphs=right,
+            column_gutter=two_column,
+            image_coverage=image_area / (width * height) if width and height else 0.0,
+            rulings=(horizontal, vertical),
+            has_math=has_math,
+            math_font=math_font,
+        )
+
+    def _wants_formulas(self, page_data: Dict[str, Any]) -> bool:
+        """Whether triage routes this page to the formula detector."""
+        return not self.triage or page_data['metadata']['triage']['routes']['formulas']
+
+    def _layout_from_blocks(self, blocks: List[Dict[str, Any]], page_num: int,
+                            width: float, height: float) -> Dict[str, Any]:
+        """Build a page dictionary from PyMuPDF text blocks."""
+        page_data = {
+            'page_number': page_num,
+            'text': '',
+            'tables': [],
+            'formulas': [],
+            'metadata': {}
+        }
+
+        # Collect text lines with their boxes
+        lines = []
+        for block in blocks:
+            if block.get("type") != 0:
+                continue
+            for line in block.get("lines", []):
+                text = "".join(span.get("text", "") for span in line.get("spans", []))
+                if text.strip():
+                    lines.append((line["bbox"], text))
+
+        # Classify columns from the x-distribution of the lines: a two-column
+        # page has substantial text wholly on each side of the centre and
+        # little text crossing it.
+        mid = width / 2
+        left, right = [], []
+        left_chars = right_chars = spanning_chars = 0
+        for bbox, text in lines:
+            n = len(text.strip())
+            if bbox[2] <= mid:
+                left.append((bbox, text))
+                left_chars += n
+            elif bbox[0] >= mid:
+                right.append((bbox, text))
+                right_chars += n
+            else:
+                spanning_chars += n
+                # Assign crossing lines (titles, headers) by their centre
+                if (bbox[0] + bbox[2]) / 2 < mid:
+                    left.append((bbox, text))
+                else:
+                    right.append((bbox, text))
+
+        total_chars = left_chars + right_chars + spanning_chars
+        if (left_chars > COLUMN_MIN_CHARS and right_chars > COLUMN_MIN_CHARS
+                and spanning_chars <= COLUMN_MAX_SPANNING_RATIO * total_chars):
+            page_data['text'] = f"{_join_lines(left)}\n\n{_join_lines(right)}"
+            page_data['metadata']['layout'] = 'two_column'
+            self.log(f"  Detected two-column layout on page {page_num}")
+        else:
+            page_data['text'] = _join_lines(lines)
+            page_data['metadata']['layout'] = 'single_column'
+
+        page_data['metadata']['width'] = width
+        page_data['metadata']['height'] = height
+
+        return page_data
+
+    def extract_pages_parallel(self, workers: int,
+                               include_formulas: bool = True) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Extract pages and formulas across a process pool.
+
+        The document is split into contiguous page ranges. Each worker opens
+        its own pdfplumber/PyMuPDF handles, and results are merged back in
+        page order so the output is identical to a serial run.
+
+        Args:
+            workers: Number of worker processes.
+            include_formulas: Whether to scan for formulas.
+
+        Returns:
+            Tuple of (pages, formulas) in page order.
+        """
+        pages = list(self.iter_pages_parallel(workers, include_formulas))
+        formulas = [formula for page in pages for formula in page['formulas']]
+
+        if formulas:
+            self.log(f"Found {len(formulas)} potential formulas")
+
+        return pages, formulas
+
+    def iter_pages_parallel(self, workers: int,
+                            include_formulas: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Yield pages in page order while a process pool extracts page ranges.
+
+        Only completed ranges that are waiting for an earlier range are held
+        in memory.
+
+        Args:
+            workers: Number of worker processes.
+            include_formulas: Whether to scan for formulas.
+
+        Yields:
+            Page dictionaries in page order.
+        """
+        total = self.page_count()
+        ranges = _page_ranges(total, workers)
+        # Measure once so every worker uses the same document statistics
+        if include_formulas:
+            self.estimate_body_font_size()
+        if self.strip_boilerplate:
+            self.detect_boilerplate()
+        self.log(f"Extracting {total} pages with {workers} workers "
+                 f"({len(ranges)} page ranges)...")
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_extract_page_range, str(self.pdf_path), start, end,
+                            include_formulas, self._worker_options())
+                for start, end in ranges
+            ]
+            for (start, end), future in zip(ranges, futures):
+                range_pages, _, geometry = future.result()
+                self.log(f"Processed pages {start}-{end}/{total}")
+                if geometry is not None:
+                    self.geometry.merge(geometry)
+                if self.timer is not None:
+                    for page_data in range_pages:
+                        self.timer.absorb_page(page_data)
+                yield from range_pages
+
+    def extract_all(self, include_formulas: bool = True, workers: int = 1) -> Dict[str, Any]:
         """
         Extract all content from PDF.
 
+        When a cache is configured, results are looked up by content hash
+        and extractor options first; ``metadata['cache']`` then records
+        whether this call hit and the cache's running hit/miss counters.
+        With a timer, the cache is bypassed so the timings describe a real
+        extraction, and ``metadata['timings']`` holds the stage summary.
+        The cache is also bypassed when collecting word geometry, which is
+        not stored in it.
+
         Args:
             include_formulas: Whether to extract formulas (slower).
+            workers: Number of worker processes for page-parallel
+                extraction (1 = serial).
 
         Returns:
             Dictionary with all extracted content.
         """
-        # Extract text with column detection
-        pages = self.extract_with_column_detection()
+        if self.timer is not None:
+            started = time.perf_counter()
+            result = self._extract_uncached(include_formulas, workers)
+            result['metadata']['timings'] = {'seconds': round(time.perf_counter() - started, 4),
+                                             **self.timer.summary()}
+            return result
+
+        if self.cache is None or self.geometry is not None:
+            return self._extract_uncached(include_formulas, workers)
+
+        key = self.cache.key(str(self.pdf_path), self._cache_options(include_formulas))
+        result = self.cache.get(key)
+        self.last_cache_hit = result is not None
+
+        if result is not None:
+            self.log(f"Cache hit for {self.pdf_path.name} ({key[:12]})")
+            # The stored filename is that of the first file with this content
+            result['filename'] = self.pdf_path.name
+        else:
+            result = self._extract_uncached(include_formulas, workers)
+            self.cache.put(key, result)
 
-        # Extract formulas if requested
-        formulas = []
-        if include_formulas:
-            formulas = self.extract_formulas_with_pymupdf()
+        result['metadata']['cache'] = dict(hit=self.last_cache_hit, key=key, **self.cache.stats())
+        return result
 
-            # Associate formulas with pages
-            for page_data in pages:
-                page_num = page_data['page_number']
-                page_formulas = [f for f in formulas if f['page'] == page_num]
-                page_data['formulas'] = page_formulas
+    def _cache_options(self, include_formulas: bool) -> Dict[str, Any]:
+        """Options that affect extraction output, used in the cache key."""
+        options = {
+            'version': EXTRACTOR_VERSION,
+            'backend': self.backend,
+            'formulas': include_formulas,
+            'tables': self.tables,
+            'triage': self.triage,
+        }
+        if self.strip_boilerplate:
+            options['boilerplate'] = True
+        if self._body_font_size_option is not None:
+            options['body_font_size'] = self._body_font_size_option
+        return options
+
+    def _extract_uncached(self, include_formulas: bool, workers: int) -> Dict[str, Any]:
+        """Run the extraction pipeline without consulting the cache."""
+        if workers > 1:
+            pages, formulas = self.extract_pages_parallel(workers, include_formulas)
+        else:
+            # Extract text with column detection (and formulas if requested)
+            pages, formulas = self.extract_page_range(include_formulas=include_formulas)
+
+        return self._assemble_result(pages, formulas)
+
+    def _assemble_result(self, pages: List[Dict[str, Any]],
+                         formulas: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Build the extract_all result dictionary from page dictionaries."""
+        if formulas is None:
+            formulas = [formula for page in pages for formula in page['formulas']]
 
         # Combine all text
         full_text = "\n\n".join(page['text'] for page in pages if page['text'].strip())
 
+        stats = DocumentStats()
+        for page_data in pages:
+            stats.add(page_data)
+
         result = {
             'filename': self.pdf_path.name,
             'total_pages': len(pages),
             'full_text': full_text,
             'pages': pages,
             'formulas': formulas,
-            'metadata': {
-                'two_column_pages': sum(1 for p in pages if p['metadata'].get('layout') == 'two_column'),
-                'single_column_pages': sum(1 for p in pages if p['metadata'].get('layout') == 'single_column'),
-                'total_tables': sum(len(p['tables']) for p in pages),
-                'total_formulas': len(formulas)
-            }
+            'metadata': stats.metadata()
         }
 
+        self._add_boilerplate_metadata(result['metadata'], stats)
         return result
 
-    def save_as_text(self, output_path: str, include_metadata: bool = True):
-        """Save extracted content as plain text."""
-        result = self.extract_all()
+    def extract_spilled(self, include_formulas: bool = True) -> Dict[str, Any]:
+        """
+        Extract all pages serially, keeping finished pages on disk (low-memory mode).
+
+        Pages are appended to a ``PageSpill`` as they complete and parser
+        state is released as resident memory approaches ``max_memory_mb``,
+        so memory use does not grow with page count. The cap is a soft
+        target, not a limit: RSS is only checked between pages. The cache
+        is not consulted.
 
-        with open(output_path, 'w', encoding='utf-8') as f:
+        Args:
+            include_formulas: Whether to extract formulas.
+
+        Returns:
+            ``extract_all``-style dictionary whose ``pages`` is the
+            ``PageSpill`` (iterate it; it is not a list) and which has no
+            ``full_text`` or ``formulas``. ``metadata['memory']`` records
+            the cap, this document's starting and peak RSS and how often
+            the PDF was reopened.
+        """
+        started = time.perf_counter()
+        spill = PageSpill()
+        stats = DocumentStats()
+        self._start_memory_tracking()
+        for page_data in self.iter_pages(include_formulas=include_formulas):
+            spill.append(page_data)
+            stats.add(page_data)
+
+        metadata = stats.metadata()
+        self._add_boilerplate_metadata(metadata, stats)
+        metadata['memory'] = self._memory_metadata(len(spill))
+        if self.timer is not None:
+            metadata['timings'] = {'seconds': round(time.perf_counter() - started, 4),
+                                   **self.timer.summary()}
+        return {
+            'filename': self.pdf_path.name,
+            'total_pages': stats.pages,
+            'pages': spill,
+            'metadata': metadata
+        }
+
+    def _memory_metadata(self, spilled_pages: int) -> Dict[str, Any]:
+        """
+        Low-memory mode's ``metadata['memory']`` entry.
+
+        ``start_rss_mb`` and ``peak_rss_mb`` are this process's RSS when the
+        document started and the highest value sampled between its pages;
+        ``rss_delta_mb`` is their difference, i.e. what this document added
+        on top of memory already in use (earlier documents, the interpreter).
+        """
+        self._sample_rss()
+        peak, start = self._rss_peak, self._rss_start
+        delta = round(peak - start, 1) if peak is not None and start is not None else None
+        self.log(f"Peak RSS: {peak} MB, +{delta} MB for this document "
+                 f"(soft cap {self.max_memory_mb} MB, PDF reopened {self.parser_resets} times)")
+        return {
+            'max_memory_mb': self.max_memory_mb,
+            'start_rss_mb': start,
+            'peak_rss_mb': peak,
+            'rss_delta_mb': delta,
+            'parser_resets': self.parser_resets,
+            'spilled_pages': spilled_pages
+        }
+
+    def _add_boilerplate_metadata(self, metadata: Dict[str, Any], stats: 'DocumentStats'):
+        """Record detected patterns and characters saved when stripping boilerplate."""
+        if not self.strip_boilerplate:
+            return
+        metadata['boilerplate'] = {
+            'patterns': self.boilerplate_patterns or [],
+            'pages': stats.boilerplate_pages,
+            'removed_lines': stats.boilerplate_lines,
+            'chars_saved': stats.boilerplate_chars
+        }
+        self.log(f"Boilerplate: removed {stats.boilerplate_lines} lines from "
+                 f"{stats.boilerplate_pages} pages, saved {stats.boilerplate_chars} characters")
+
+    def page_fingerprints(self) -> List[Dict[str, Any]]:
+        """
+        Fingerprint every page by its content stream and its text layer.
+
+        Returns:
+            List of ``{'page', 'content', 'text'}`` dictionaries in page order.
+        """
+        fingerprints = []
+        with fitz.open(self.pdf_path) as doc:
+            for page_num, page in enumerate(doc, start=1):
+                fingerprints.append({
+                    'page': page_num,
+                    'content': _digest(page.read_contents()),
+                    'text': _digest(page.get_text("text").encode('utf-8'))
+                })
+        return fingerprints
+
+    def build_manifest(self, include_formulas: bool = True,
+                       fingerprints: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Return the page manifest used by later incremental extractions."""
+        return {
+            'filename': self.pdf_path.name,
+            'options': self._cache_options(include_formulas),
+            'pages': fingerprints if fingerprints is not None else self.page_fingerprints()
+        }
+
+    def extract_incremental(self, previous: Dict[str, Any], previous_manifest: Dict[str, Any],
+                            include_formulas: bool = True,
+                            workers: int = 1) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Re-extract only pages that changed since a previous extraction.
+
+        Pages are matched by fingerprint rather than position, so pages that
+        merely moved (e.g. after an inserted article) are reused and
+        renumbered. New or changed pages are extracted and spliced into the
+        previous result. If the extractor options differ from the previous
+        run, every page is re-extracted.
+
+        Args:
+            previous: Previous ``extract_all`` result (JSON output).
+            previous_manifest: Manifest written alongside it.
+            include_formulas: Whether to extract formulas.
+            workers: Worker processes for re-extracting changed page runs.
+
+        Returns:
+            Tuple of (result, manifest). ``result['metadata']['incremental']``
+            lists the changed page numbers and the previous page numbers that
+            no longer appear.
+        """
+        fingerprints = self.page_fingerprints()
+        manifest = self.build_manifest(include_formulas, fingerprints)
+
+        old_pages = {page['page_number']: page for page in previous.get('pages', [])}
+        reusable: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        if previous_manifest.get('options') == manifest['options']:
+            for fingerprint in previous_manifest.get('pages', []):
+                old_page = old_pages.get(fingerprint['page'])
+                if old_page is not None:
+                    key = (fingerprint['content'], fingerprint['text'])
+                    reusable.setdefault(key, []).append(old_page)
+        else:
+            self.log("Extractor options changed since previous extraction; re-extracting all pages")
+
+        pages: List[Optional[Dict[str, Any]]] = [None] * len(fingerprints)
+        changed = []
+        matched = set()
+        for fingerprint in fingerprints:
+            candidates = reusable.get((fingerprint['content'], fingerprint['text']))
+            if not candidates:
+                changed.append(fingerprint['page'])
+                continue
+            old_page = candidates.pop(0) if len(candidates) > 1 else candidates[0]
+            matched.add(old_page['page_number'])
+            pages[fingerprint['page'] - 1] = _renumber_page(old_page, fingerprint['page'])
+
+        self.log(f"Incremental: {len(changed)} of {len(fingerprints)} pages new or changed")
+
+        runs = _page_runs(changed)
+        if include_formulas and runs:
+            self.estimate_body_font_size()
+        if self.strip_boilerplate and runs:
+            self.detect_boilerplate()
+        if workers > 1 and len(runs) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_extract_page_range, str(self.pdf_path), start, end,
+                                include_formulas, self._worker_options())
+                    for start, end in runs
+                ]
+                fresh = [page for future in futures for page in future.result()[0]]
+            if self.timer is not None:
+                for page_data in fresh:
+                    self.timer.absorb_page(page_data)
+        else:
+            fresh = [page for start, end in runs
+                     for page in self.iter_pages(start, end, include_formulas)]
+        for page_data in fresh:
+            pages[page_data['page_number'] - 1] = page_data
+
+        result = self._assemble_result(pages)
+        result['metadata']['incremental'] = {
+            'previous_file': previous.get('filename'),
+            'changed_pages': changed,
+            'reused_pages': len(fingerprints) - len(changed),
+            'removed_previous_pages': sorted(set(old_pages) - matched)
+        }
+        return result, manifest
+
+    def save_as_text(self, output_path: str, include_metadata: bool = True,
+                     include_formulas: bool = True, workers: int = 1) -> Dict[str, Any]:
+        """
+        Save extracted content as plain text.
+
+        In low-memory mode the result comes from ``extract_spilled`` and
+        the text is streamed from the spill file. With a timer, the
+        returned ``metadata['timings']`` includes the serialization stage.
+        """
+        started = time.perf_counter()
+        if self.max_memory_mb is not None:
+            result = self.extract_spilled(include_formulas=include_formulas)
+        else:
+            result = self.extract_all(include_formulas=include_formulas, workers=workers)
+
+        with open(output_path, 'w', encoding='utf-8') as f, self._stage('serialization'):
             if include_metadata:
                 f.write(f"=== {result['filename']} ===\n")
                 f.write(f"Pages: {result['total_pages']}\n")
@@ -233,18 +1406,742 @@ class RegulatoryPDFExtractor:
                 f.write(f"Formulas: {result['metadata']['total_formulas']}\n")
                 f.write("=" * 60 + "\n\n")
 
-            f.write(result['full_text'])
+            if 'full_text' in result:
+                f.write(result['full_text'])
+            else:
+                separator = ""
+                for page_data in result['pages']:
+                    if page_data['text'].strip():
+                        f.write(separator + page_data['text'])
+                        separator = "\n\n"
 
+        self._add_serialization_timing(result, started)
         self.log(f"Saved text to: {output_path}")
+        return result
 
-    def save_as_json(self, output_path: str):
-        """Save extracted content as JSON."""
-        result = self.extract_all()
+    def save_as_json(self, output_path: str, include_formulas: bool = True,
+                     workers: int = 1) -> Dict[str, Any]:
+        """
+        Save extracted content as JSON.
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        In low-memory mode the result comes from ``extract_spilled`` and is
+        written page by page from the spill file; the JSON is the same as
+        ``json.dump(extract_all())`` apart from ``metadata.memory``.
+
+        With a timer, the ``metadata.timings`` written to the file is taken
+        before the file is written and so excludes the serialization stage;
+        the returned result's ``metadata['timings']`` (and so ``--stats-json``
+        and batch reports) includes it.
+        """
+        started = time.perf_counter()
+        if self.max_memory_mb is not None:
+            result = self.extract_spilled(include_formulas=include_formulas)
+            with open(output_path, 'w', encoding='utf-8') as f, self._stage('serialization'):
+                _dump_spilled_json(result, f)
+        else:
+            result = self.extract_all(include_formulas=include_formulas, workers=workers)
+            with open(output_path, 'w', encoding='utf-8') as f, self._stage('serialization'):
+                json.dump(result, f, indent=2, ensure_ascii=False)
+
+        self._add_serialization_timing(result, started)
+        self.log(f"Saved JSON to: {output_path}")
+        return result
+
+    def _add_serialization_timing(self, result: Dict[str, Any], started: float):
+        """Refresh a saved result's stage summary so it covers serialization too."""
+        if self.timer is not None:
+            result['metadata']['timings'] = {'seconds': round(time.perf_counter() - started, 4),
+                                             **self.timer.summary()}
+
+    def write_manifest(self, output_path: str, include_formulas: bool = True,
+                       manifest: Optional[Dict[str, Any]] = None):
+        """Write the page manifest that belongs to an output file."""
+        path = manifest_path(output_path)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest or self.build_manifest(include_formulas), f, ensure_ascii=False)
+        self.log(f"Saved manifest to: {path}")
+
+    def save_incremental(self, output_path: str, previous_path: str,
+                         include_formulas: bool = True, workers: int = 1) -> Dict[str, Any]:
+        """
+        Save a JSON result that reuses unchanged pages from a previous result.
+
+        The previous result's manifest must exist (written with
+        ``--manifest``); a new manifest is written next to the output.
+        """
+        previous_manifest_path = manifest_path(previous_path)
+        if not previous_manifest_path.exists():
+            raise FileNotFoundError(f"Manifest not found: {previous_manifest_path} "
+                                    f"(extract the previous version with --manifest)")
 
+        with open(previous_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        with open(previous_manifest_path, 'r', encoding='utf-8') as f:
+            previous_manifest = json.load(f)
+
+        result, manifest = self.extract_incremental(previous, previous_manifest,
+                                                    include_formulas, workers)
+
+        with open(output_path, 'w', encoding='utf-8') as f, self._stage('serialization'):
+            json.dump(result, f, indent=2, ensure_ascii=False)
         self.log(f"Saved JSON to: {output_path}")
+        self.write_manifest(output_path, manifest=manifest)
+
+        return result
+
+    def save_as_ndjson(self, output_path: str, include_formulas: bool = True, workers: int = 1,
+                       on_page: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Stream extracted content as newline-delimited JSON.
+
+        One compact ``{"type": "page", ...}`` record is written and flushed
+        per page as soon as it is extracted, followed by a final
+        ``{"type": "summary", ...}`` record with the document totals. No
+        ``full_text`` is built and memory use does not grow with page count.
+        The extraction cache is not consulted in this mode. ``on_page`` is
+        called with each page after it is written (e.g. to chunk it). In
+        low-memory mode pages are extracted serially and the summary
+        records ``metadata.memory``.
+        """
+        if self.max_memory_mb is not None:
+            self._start_memory_tracking()
+            pages = self.iter_pages(include_formulas=include_formulas)
+        elif workers > 1:
+            pages = self.iter_pages_parallel(workers, include_formulas)
+        else:
+            pages = self.iter_pages(include_formulas=include_formulas)
+
+        stats = DocumentStats()
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for page_data in pages:
+                with self._stage('serialization'):
+                    f.write(_ndjson_record('page', page_data))
+                    f.flush()
+                stats.add(page_data)
+                if on_page is not None:
+                    on_page(page_data)
+
+            metadata = stats.metadata()
+            self._add_boilerplate_metadata(metadata, stats)
+            if self.max_memory_mb is not None:
+                metadata['memory'] = self._memory_metadata(0)
+            if self.timer is not None:
+                metadata['timings'] = self.timer.summary()
+            f.write(_ndjson_record('summary', {
+                'filename': self.pdf_path.name,
+                'total_pages': stats.pages,
+                'metadata': metadata
+            }))
+
+        self.log(f"Saved NDJSON to: {output_path}")
+
+
+class DocumentStats:
+    """Running document totals built one page at a time."""
+
+    def __init__(self):
+        self.pages = 0
+        self.layouts = {'two_column': 0, 'single_column': 0}
+        self.tables = 0
+        self.formulas = 0
+        self.routes = {'columns': 0, 'tables': 0, 'formulas': 0}
+        self.kinds: Counter = Counter()
+        self.triaged = False
+        self.boilerplate_pages = 0
+        self.boilerplate_lines = 0
+        self.boilerplate_chars = 0
+
+    def add(self, page_data: Dict[str, Any]):
+        """Count one page dictionary."""
+        self.pages += 1
+        self.tables += len(page_data['tables'])
+        self.formulas += len(page_data['formulas'])
+        layout = page_data['metadata'].get('layout')
+        if layout in self.layouts:
+            self.layouts[layout] += 1
+
+        boilerplate = page_data['metadata'].get('boilerplate')
+        if boilerplate is not None:
+            self.boilerplate_pages += 1
+            self.boilerplate_lines += len(boilerplate['removed_lines'])
+            self.boilerplate_chars += boilerplate['chars_saved']
+
+        triage = page_data['metadata'].get('triage')
+        if triage is not None:
+            self.triaged = True
+            self.kinds[triage['kind']] += 1
+            for stage, routed in triage['routes'].items():
+                if routed and stage in self.routes:
+                    self.routes[stage] += 1
+
+    def metadata(self) -> Dict[str, Any]:
+        """Return the document-level ``metadata`` dictionary."""
+        metadata = {
+            'two_column_pages': self.layouts['two_column'],
+            'single_column_pages': self.layouts['single_column'],
+            'total_tables': self.tables,
+            'total_formulas': self.formulas
+        }
+        if self.triaged:
+            metadata['triage'] = {
+                'page_kinds': dict(self.kinds),
+                'routed_pages': dict(self.routes)
+            }
+        return metadata
+
+
+class PageSpill:
+    """
+    Finished page dictionaries kept in an anonymous temporary file.
+
+    Pages are appended as JSON lines and read back in order by iterating;
+    the file is removed when the spill is closed or garbage collected.
+    Iterate only after the last ``append``.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, page_data: Dict[str, Any]):
+        """Write one page to the spill file."""
+        self._file.write(json.dumps(page_data, ensure_ascii=False) + "\n")
+        self._count += 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield json.loads(line)
+
+    def close(self):
+        """Delete the spill file."""
+        self._file.close()
+
+
+def _dump_json_items(items: Iterable[Any], f, indent: str):
+    """Write a list like json.dump(indent=2) would, one item at a time."""
+    separator = "[\n"
+    for item in items:
+        f.write(separator + indent + "  " +
+                json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  " + indent))
+        separator = ",\n"
+    f.write("[]" if separator == "[\n" else "\n" + indent + "]")
+
+
+def _dump_spilled_json(result: Dict[str, Any], f):
+    """Write an ``extract_spilled`` result as the JSON ``save_as_json`` writes."""
+    pages = result['pages']
+    f.write('{\n  "filename": ' + json.dumps(result['filename'], ensure_ascii=False))
+    f.write(',\n  "total_pages": ' + json.dumps(result['total_pages']))
+
+    # full_text: the non-blank page texts joined by blank lines, escaped piecewise
+    f.write(',\n  "full_text": "')
+    separator = ""
+    for page_data in pages:
+        if page_data['text'].strip():
+            f.write(separator + json.dumps(page_data['text'], ensure_ascii=False)[1:-1])
+            separator = "\\n\\n"
+    f.write('"')
+
+    f.write(',\n  "pages": ')
+    _dump_json_items(pages, f, "  ")
+    f.write(',\n  "formulas": ')
+    _dump_json_items((formula for page_data in pages for formula in page_data['formulas']),
+                     f, "  ")
+    f.write(',\n  "metadata": ' +
+            json.dumps(result['metadata'], indent=2, ensure_ascii=False).replace("\n", "\n  "))
+    f.write("\n}")
+
+
+def triage_page(glyphs: int, left_glyphs: int, right_glyphs: int, column_gutter: bool,
+                image_coverage: float, rulings: Tuple[int, int], has_math: bool,
+                math_font: bool) -> Dict[str, Any]:
+    """
+    Decide which expensive stages a page needs from cheap signals.
+
+    Args:
+        glyphs: Number of non-whitespace characters on the page.
+        left_glyphs: Characters wholly left of the page centre.
+        right_glyphs: Characters wholly right of the page centre.
+        column_gutter: Whether the centre of the page is (nearly) free of text.
+        image_coverage: Share of the page area covered by images.
+        rulings: (horizontal, vertical) ruling edge counts from lines/rects.
+        has_math: Whether the text contains math symbols, scripts or '='.
+        math_font: Whether any span uses a math font.
+
+    Returns:
+        Dictionary with the page ``kind``, the signals, and ``routes``
+        flags for the text, columns, tables and formulas stages.
+    """
+    if glyphs == 0:
+        kind = 'scanned' if image_coverage >= SCANNED_MIN_IMAGE_COVERAGE else 'blank'
+    else:
+        kind = 'text'
+
+    two_column = (kind == 'text' and column_gutter
+                  and left_glyphs > COLUMN_MIN_CHARS and right_glyphs > COLUMN_MIN_CHARS)
+
+    return {
+        'kind': kind,
+        'glyphs': glyphs,
+        'image_coverage': round(image_coverage, 3),
+        'rulings': list(rulings),
+        'math_font': math_font,
+        'routes': {
+            'text': kind == 'text',
+            'columns': two_column,
+            # pdfplumber's default (lines) strategy needs a grid of ruling edges
+            'tables': rulings[0] >= 2 and rulings[1] >= 2,
+            'formulas': has_math or math_font
+        }
+    }
+
+
+def _page_ranges(total_pages: int, workers: int, ranges_per_worker: int = 4) -> List[Tuple[int, int]]:
+    """
+    Split pages 1..total_pages into contiguous inclusive ranges.
+
+    Several ranges per worker keep the pool busy when some pages (tables,
+    formula-dense annexes) are much slower than others.
+    """
+    if total_pages <= 0:
+        return []
+    n_ranges = min(total_pages, max(1, workers * ranges_per_worker))
+    size = -(-total_pages // n_ranges)  # ceil division
+    return [(start, min(start + size - 1, total_pages))
+            for start in range(1, total_pages + 1, size)]
+
+
+def _group_rows(lines: List[Tuple[Any, str]],
+                y_tolerance: float = 3.0) -> List[List[Tuple[Any, str]]]:
+    """
+    Group (bbox, text) lines into rows, top-to-bottom and left-to-right.
+
+    Lines whose tops lie within ``y_tolerance`` points share a row.
+    """
+    rows: List[List[Tuple[Any, str]]] = []
+    for bbox, text in sorted(lines, key=lambda item: (item[0][1], item[0][0])):
+        if rows and abs(bbox[1] - rows[-1][0][0][1]) <= y_tolerance:
+            rows[-1].append((bbox, text))
+        else:
+            rows.append([(bbox, text)])
+    return [sorted(row, key=lambda item: item[0][0]) for row in rows]
+
+
+def _join_lines(lines: List[Tuple[Any, str]], y_tolerance: float = 3.0) -> str:
+    """Join (bbox, text) lines into reading-order text, one row per line."""
+    return "\n".join(" ".join(text.strip() for _, text in row)
+                     for row in _group_rows(lines, y_tolerance))
+
+
+def _pymupdf_words(page, blocks: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    """
+    Words of a PyMuPDF page as (x0, y0, x1, y1, text, font, size).
+
+    ``get_text("words")`` gives word boxes but no fonts; each word takes
+    the font and size of the text span containing its centre.
+    """
+    words = page.get_text("words")
+    spans = [(span["bbox"], span.get("font", ""), span.get("size", 0.0))
+             for block in blocks if block.get("type") == 0
+             for line in block.get("lines", []) for span in line.get("spans", [])]
+    if not words or not spans:
+        return [(x0, y0, x1, y1, text, '', 0.0) for x0, y0, x1, y1, text, *_ in words]
+
+    import numpy as np
+
+    boxes = np.array([word[:4] for word in words], dtype=np.float64)
+    span_boxes = np.array([bbox for bbox, _, _ in spans], dtype=np.float64)
+    cx = ((boxes[:, 0] + boxes[:, 2]) / 2)[:, None]
+    cy = ((boxes[:, 1] + boxes[:, 3]) / 2)[:, None]
+    inside = ((span_boxes[:, 0] <= cx) & (cx <= span_boxes[:, 2])
+              & (span_boxes[:, 1] <= cy) & (cy <= span_boxes[:, 3]))
+    found = inside.any(axis=1)
+    match = inside.argmax(axis=1)
+    return [(x0, y0, x1, y1, text,
+             spans[m][1] if ok else '', spans[m][2] if ok else 0.0)
+            for (x0, y0, x1, y1, text, *_), m, ok in zip(words, match.tolist(), found.tolist())]
+
+
+def _boilerplate_hash(line: str) -> str:
+    """Hash of a line with whitespace removed and digit runs masked."""
+    key = _DIGIT_RUN.sub('#', "".join(line.split()).lower())
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _extend_formula(group: Dict[str, Any], raw: str, size: float, bbox):
+    """Append a span to a formula expression being assembled."""
+    group['text'] += raw
+    group['size'] = max(group['size'], size)
+    group['spans'] += 1
+    if bbox:
+        box = group['bbox']
+        if box:
+            group['bbox'] = [min(box[0], bbox[0]), min(box[1], bbox[1]),
+                             max(box[2], bbox[2]), max(box[3], bbox[3])]
+        else:
+            group['bbox'] = list(bbox)
+
+
+def _finish_formula(group: Dict[str, Any]) -> Dict[str, Any]:
+    """Trim the whitespace collected at the edges of an expression."""
+    group['text'] = group['text'].strip()
+    return group
+
+
+def manifest_path(output_path: str) -> Path:
+    """Return the page manifest path for an output file (CRR.json -> CRR.manifest.json)."""
+    return Path(output_path).with_suffix('.manifest.json')
+
+
+def _digest(data: bytes) -> str:
+    """Short content digest used for page fingerprints."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _page_runs(page_numbers: List[int]) -> List[Tuple[int, int]]:
+    """Collapse sorted page numbers into inclusive (start, end) runs."""
+    runs: List[Tuple[int, int]] = []
+    for page_num in page_numbers:
+        if runs and page_num == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page_num)
+        else:
+            runs.append((page_num, page_num))
+    return runs
+
+
+def _renumber_page(page_data: Dict[str, Any], page_num: int) -> Dict[str, Any]:
+    """Copy a previously extracted page under a new page number."""
+    page_copy = copy.deepcopy(page_data)
+    page_copy['page_number'] = page_num
+    for formula in page_copy['formulas']:
+        formula['page'] = page_num
+    return page_copy
+
+
+def extract(pdf_path: str, include_formulas: bool = True, workers: int = 1,
+            cache_dir: Optional[str] = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+            timings: bool = False, verbose: bool = False, **options) -> Dict[str, Any]:
+    """
+    Extract one PDF and return its content as Python objects (library entry point).
+
+    Only the parsers the chosen backend and stages need are imported, on
+    first use.
+
+    Args:
+        pdf_path: PDF file to extract.
+        include_formulas: Whether to extract formula candidates.
+        workers: Worker processes for page-parallel extraction (1 = serial).
+        cache_dir: Extraction cache directory (default: no cache).
+        cache_max_bytes: Cache size budget before LRU eviction.
+        timings: Time each stage into ``metadata['timings']`` (bypasses the cache).
+        verbose: Print progress messages to stderr.
+        **options: ``RegulatoryPDFExtractor`` options (``backend``,
+            ``tables``, ``triage``, ``strip_boilerplate``, ``max_memory_mb``, ...).
+
+    Returns:
+        The ``extract_all`` result (``filename``, ``total_pages``,
+        ``full_text``, ``pages``, ``formulas``, ``metadata``), or with
+        ``max_memory_mb`` the ``extract_spilled`` result.
+
+    Example:
+        from extract_regulatory_pdf import extract
+        result = extract('CRR.pdf', backend='pymupdf', tables='never')
+    """
+    cache = ExtractionCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+    extractor = RegulatoryPDFExtractor(pdf_path, verbose=verbose, cache=cache,
+                                       timer=StageTimer() if timings else None, **options)
+    if extractor.max_memory_mb is not None:
+        return extractor.extract_spilled(include_formulas=include_formulas)
+    return extractor.extract_all(include_formulas=include_formulas, workers=workers)
+
+
+def probe() -> Dict[str, Any]:
+    """
+    Describe the interpreter, installed packages and usable backends (--probe).
+
+    Packages are looked up without importing them, so a probe takes
+    milliseconds; ``missing`` lists required packages by pip name.
+    """
+    packages = {name: _package_version(name, modules) for name, modules in PROBE_PACKAGES.items()}
+    missing = [name for name in REQUIRED_PACKAGES if packages[name] is None]
+    return {
+        'extractor_version': EXTRACTOR_VERSION,
+        'python': {
+            'version': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'executable': sys.executable,
+            'platform': platform.platform()
+        },
+        'packages': packages,
+        'backends': {
+            'pdfplumber': packages['pdfplumber'] is not None and packages['pymupdf'] is not None,
+            'pymupdf': packages['pymupdf'] is not None
+        },
+        'features': {
+            'tables': packages['pdfplumber'] is not None,
+            'corpus': packages['numpy'] is not None,
+            'index': packages['numpy'] is not None,
+            'geometry': packages['numpy'] is not None
+        },
+        'missing': missing,
+        'ok': not missing
+    }
+
+
+def _package_version(distribution: str, modules: Tuple[str, ...]) -> Optional[str]:
+    """Installed version of a distribution ('unknown' if unrecorded), or None if absent."""
+    if not any(importlib.util.find_spec(module) is not None for module in modules):
+        return None
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:  # Python 3.7
+        return 'unknown'
+    try:
+        return version(distribution)
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def _ndjson_record(record_type: str, payload: Dict[str, Any]) -> str:
+    """Serialise one NDJSON line with a leading ``type`` field."""
+    return json.dumps({'type': record_type, **payload}, ensure_ascii=False,
+                      separators=(',', ':')) + "\n"
+
+
+def _extract_page_range(pdf_path: str, start_page: int, end_page: int, include_formulas: bool,
+                        options: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]],
+                                                          Optional[Any]]:
+    """
+    Worker entry point: extract one page range with its own PDF handles.
+
+    Returns (pages, formulas, geometry builder or None).
+    """
+    extractor = RegulatoryPDFExtractor(pdf_path, verbose=False, **options)
+    pages, formulas = extractor.extract_page_range(start_page, end_page, include_formulas)
+    return pages, formulas, extractor.geometry
+
+
+def _process_file(input_file: str, output_file: str, output_format: str,
+                  include_formulas: bool, verbose: bool, workers: int = 1,
+                  options: Optional[Dict[str, Any]] = None,
+                  cache_dir: Optional[str] = None,
+                  cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                  manifest: bool = False,
+                  previous: Optional[str] = None,
+                  timings: bool = False,
+                  chunking: Optional[Dict[str, Any]] = None,
+                  articles: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract one PDF and write it in the requested format.
+
+    With ``previous`` (a prior JSON result), only changed pages are
+    re-extracted; with ``manifest``, a page manifest is written next to
+    the output for later incremental runs; with ``timings``, stages are
+    timed (bypassing the cache); with ``chunking`` (``doc_id``,
+    ``chunk_tokens``, ``overlap``), reg.chunk_text-compatible chunks are
+    written to ``<output>.chunks.csv``; with ``articles`` (a doc id),
+    Article/Annex records are written to ``<output>.articles.ndjson``; with
+    the ``geometry`` option, word boxes are written to
+    ``<output>.geometry.npz``. Chunk and article files are written under
+    temporary names and only renamed into place once extraction succeeds,
+    so a failed file leaves neither behind.
+
+    Returns:
+        Report with ``pages``, ``cache_hit`` (True/False, or None when
+        caching is disabled) and ``timings`` (stage summary, or None).
+    """
+    cache = ExtractionCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+    timer = StageTimer() if timings else None
+    extractor = RegulatoryPDFExtractor(input_file, verbose=verbose, cache=cache, timer=timer,
+                                       **(options or {}))
+    started = time.perf_counter()
+
+    # (temporary path, final path) of side outputs written during extraction
+    pending: List[Tuple[str, Path]] = []
+
+    def pending_path(path: Path) -> str:
+        tmp_path = str(path.with_name(f"{path.name}.{os.getpid()}.tmp"))
+        pending.append((tmp_path, path))
+        return tmp_path
+
+    chunk_writer = chunker = None
+    if chunking is not None:
+        from chunker import StreamingChunker, ChunkWriter, chunks_path
+        chunker = StreamingChunker(chunking['doc_id'], chunking['chunk_tokens'], chunking['overlap'])
+        chunk_writer = ChunkWriter(pending_path(chunks_path(output_file)))
+
+    article_writer = segmenter = None
+    if articles is not None:
+        from article_segmenter import ArticleSegmenter, ArticleWriter, articles_path
+        segmenter = ArticleSegmenter(articles)
+        article_writer = ArticleWriter(pending_path(articles_path(output_file)))
+
+    def chunk_page(page_data: Dict[str, Any]):
+        if chunker is not None:
+            for chunk in chunker.add_page(page_data):
+                chunk_writer.write(chunk)
+        if segmenter is not None:
+            for record in segmenter.add_page(page_data):
+                article_writer.write(record)
+
+    succeeded = False
+    try:
+        result = None
+        if previous is not None:
+            result = extractor.save_incremental(output_file, previous, include_formulas, workers)
+            changed = result['metadata']['incremental']['changed_pages']
+            print(f"  Changed pages ({len(changed)}): {_format_runs(_page_runs(changed)) or 'none'}")
+        else:
+            if manifest:
+                extractor.write_manifest(output_file, include_formulas)
+
+            if output_format == 'json':
+                result = extractor.save_as_json(output_file, include_formulas=include_formulas,
+                                                workers=workers)
+            elif output_format == 'ndjson':
+                streaming = chunker is not None or segmenter is not None
+                extractor.save_as_ndjson(output_file, include_formulas=include_formulas,
+                                         workers=workers,
+                                         on_page=chunk_page if streaming else None)
+            else:
+                result = extractor.save_as_text(output_file, include_formulas=include_formulas,
+                                                workers=workers)
+
+        if result is not None and (chunker is not None or segmenter is not None):
+            for page_data in result['pages']:
+                chunk_page(page_data)
+        if chunker is not None:
+            for chunk in chunker.finish():
+                chunk_writer.write(chunk)
+            extractor.log(f"Saved {chunk_writer.count} chunks to: {chunks_path(output_file)}")
+        if segmenter is not None:
+            for record in segmenter.finish():
+                article_writer.write(record)
+            extractor.log(f"Saved {article_writer.count} articles to: {articles_path(output_file)}")
+        succeeded = True
+    finally:
+        if chunk_writer is not None:
+            chunk_writer.close()
+        if article_writer is not None:
+            article_writer.close()
+        for tmp_path, path in pending:
+            if succeeded:
+                os.replace(tmp_path, path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    if extractor.geometry is not None:
+        from page_geometry import geometry_path
+        path = geometry_path(output_file)
+        extractor.geometry.save(str(path), source=extractor.pdf_path.name)
+        extractor.log(f"Saved geometry for {len(extractor.geometry)} words to: {path}")
+
+    pages = result['total_pages'] if result is not None else extractor.page_count()
+    report: Dict[str, Any] = {'input': input_file, 'output': output_file, 'pages': pages,
+                              'cache_hit': extractor.last_cache_hit, 'timings': None}
+    if timer is not None:
+        report['timings'] = {'seconds': round(time.perf_counter() - started, 4), **timer.summary()}
+    return report
+
+
+def _extract_result(input_file: str, include_formulas: bool, verbose: bool, workers: int,
+                    options: Dict[str, Any], cache_dir: Optional[str], cache_max_bytes: int,
+                    timings: bool) -> Dict[str, Any]:
+    """Extract one PDF and return its result dictionary (file-pool entry point)."""
+    cache = ExtractionCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+    extractor = RegulatoryPDFExtractor(input_file, verbose=verbose, cache=cache,
+                                       timer=StageTimer() if timings else None, **options)
+    return extractor.extract_all(include_formulas=include_formulas, workers=workers)
+
+
+def _extract_to_corpus(inputs: List[str], store_path: str, include_formulas: bool,
+                       verbose: bool, workers: int, options: Dict[str, Any],
+                       cache_dir: Optional[str], cache_max_bytes: int, shard_docs: int,
+                       timings: bool, reports: List[Dict[str, Any]]):
+    """Extract PDFs and append them, in input order, to a columnar corpus store."""
+    from concurrent.futures import ProcessPoolExecutor
+    from corpus_store import CorpusWriter
+
+    missing = [input_file for input_file in inputs if not Path(input_file).exists()]
+    for input_file in missing:
+        print(f"ERROR: File not found: {input_file}", file=sys.stderr)
+    inputs = [input_file for input_file in inputs if input_file not in missing]
+    job = (include_formulas, verbose, 1, options, cache_dir, cache_max_bytes, timings)
+
+    with CorpusWriter(store_path, shard_docs=shard_docs) as writer:
+        if workers > 1 and len(inputs) > 1:
+            # Extract files in parallel; the store is written by this process only
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(inputs)))
+            futures = [pool.submit(_extract_result, input_file, *job) for input_file in inputs]
+        else:
+            pool = None
+            futures = None
+
+        try:
+            for index, input_file in enumerate(inputs):
+                try:
+                    if futures is not None:
+                        result = futures[index].result()
+                    else:
+                        result = _extract_result(input_file, include_formulas, verbose, workers,
+                                                 options, cache_dir, cache_max_bytes, timings)
+                except Exception as e:
+                    print(f"ERROR processing {input_file}: {e}", file=sys.stderr)
+                    continue
+
+                doc_id = writer.add(result)
+                reports.append({'input': input_file, 'output': store_path,
+                                'cache_hit': result['metadata'].get('cache', {}).get('hit'),
+                                'timings': result['metadata'].get('timings')})
+                print(f"✓ Stored: {input_file} → {store_path} (document {doc_id})")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+
+def _index_chunks(index_dir: str, reports: List[Dict[str, Any]], verbose: bool):
+    """Add the chunk files of processed inputs to a search index."""
+    from chunker import chunks_path
+    from search_index import SearchIndex, read_chunks
+
+    index = SearchIndex(index_dir)
+    # One segment per run, however many files were processed
+    added = index.add_documents(chunk for report in reports
+                                for chunk in read_chunks(str(chunks_path(report['output']))))
+    if verbose:
+        print(f"[INFO] Indexed {added} chunks ({len(index)} in {index_dir})", file=sys.stderr)
+
+
+def _write_stats(path: str, reports: List[Dict[str, Any]], seconds: float):
+    """Write the --stats-json summary for a run."""
+    documents = [{'input': report['input'], 'output': report['output'], **report['timings']}
+                 for report in reports if report['timings'] is not None]
+    totals = merge_summaries(documents)
+    totals['seconds'] = round(seconds, 4)
+    totals['pages_per_sec'] = round(totals['pages'] / seconds, 2) if seconds else None
+    totals['peak_rss_mb'] = peak_rss_mb()
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': EXTRACTOR_VERSION, 'totals': totals, 'documents': documents},
+                  f, indent=2)
+
+
+def _format_runs(runs: List[Tuple[int, int]]) -> str:
+    """Format page runs as '3, 7-9, 12'."""
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in runs)
+
+
+def _resolve_workers(workers: int) -> int:
+    """Map the --workers value to a process count (0 = all cores)."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
 
 
 def main():
@@ -262,82 +2159,312 @@ Examples:
 
   # Batch process multiple PDFs
   python extract_regulatory_pdf.py *.pdf --output-dir extracted/
+
+  # Resumable batch: 10-minute limit per file, skip files a previous run finished
+  python extract_regulatory_pdf.py *.pdf --output-dir extracted/ --workers 8 --file-timeout 600
+
+  # Split pages (or, in batch mode, files) across 8 processes
+  python extract_regulatory_pdf.py CRR.pdf CRR.json --format json --workers 8
+
+  # Single-pass PyMuPDF engine without pdfplumber table extraction
+  python extract_regulatory_pdf.py CRR.pdf CRR.json --format json --backend pymupdf --tables never
+
+  # Drop running headers, footers and page numbers before chunking
+  python extract_regulatory_pdf.py CRR.pdf CRR.json --format json --strip-boilerplate --chunks
+
+  # Aim to keep a 3000-page annex volume under 1 GB of resident memory
+  python extract_regulatory_pdf.py annexes.pdf annexes.json --format json --max-memory 1024
+
+  # Re-extract from scratch, bypassing the result cache
+  python extract_regulatory_pdf.py *.pdf --output-dir extracted/ --no-cache
+
+  # Record page fingerprints, then later re-extract only changed pages
+  python extract_regulatory_pdf.py CRR_2024.pdf CRR_2024.json --format json --manifest
+  python extract_regulatory_pdf.py CRR_2025.pdf CRR_2025.json --format json --incremental CRR_2024.json
+
+  # Chunk a batch and add the chunks to a BM25 search index
+  python extract_regulatory_pdf.py *.pdf --output-dir extracted/ --chunks --index search_index/
+  python search_index.py query search_index/ "liquidity coverage ratio" -k 10
+
+  # Write per-stage timings, plus cProfile/tracemalloc snapshots
+  python extract_regulatory_pdf.py CRR.pdf CRR.json --format json --stats-json stats.json --profile crr
+
+  # Report interpreter, package versions and backends as JSON (no PDF libraries imported)
+  python extract_regulatory_pdf.py --probe
+
+  # Keep a warm 8-process server on localhost:8765 (line-delimited JSON requests)
+  python extract_regulatory_pdf.py --serve --workers 8 --port 8765
         """
     )
 
-    parser.add_argument('input', help='Input PDF file(s)', nargs='+')
+    parser.add_argument('input', help='Input PDF file(s)', nargs='*')
     parser.add_argument('--output', '-o', help='Output file (default: input.txt)')
     parser.add_argument('--output-dir', help='Output directory for batch processing')
-    parser.add_argument('--format', choices=['text', 'json'], default='text',
-                        help='Output format (default: text)')
+    parser.add_argument('--format', choices=['text', 'json', 'ndjson', 'corpus'], default='text',
+                        help='Output format (default: text; ndjson streams one record per page; '
+                             'corpus appends to a columnar store at --output/--output-dir)')
+    parser.add_argument('--shard-docs', type=int, default=256,
+                        help='Documents per corpus store shard (default: %(default)s)')
     parser.add_argument('--no-formulas', action='store_true',
                         help='Skip formula extraction (faster)')
     parser.add_argument('--quiet', '-q', action='store_true',
                         help='Suppress progress messages')
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                        help='Worker processes for page/file parallelism '
+                             '(default: 1 = serial, 0 = all cores)')
+    parser.add_argument('--backend', choices=BACKENDS, default='pdfplumber',
+                        help='Layout engine (default: pdfplumber; pymupdf reads each page once)')
+    parser.add_argument('--tables', choices=TABLE_MODES, default='always',
+                        help='Table extraction (default: always; auto = only pages with ruling '
+                             'lines; requires pdfplumber)')
+    parser.add_argument('--triage', action='store_true',
+                        help='Route pages to column splitting and formula detection by cheap '
+                             'signals (faster; text of full-width and formula-free pages can '
+                             'differ from the default full processing)')
+    parser.add_argument('--no-triage', dest='triage', action='store_false',
+                        help='Run column splitting and formula detection on every page (default)')
+    parser.add_argument('--strip-boilerplate', action='store_true',
+                        help='Remove running headers, footers and page numbers repeated at the '
+                             'same position across pages (recorded in metadata.boilerplate)')
+    parser.add_argument('--max-memory', type=int, metavar='MB',
+                        help='Low-memory mode: extract pages serially, reopen the PDF to release '
+                             'parser caches as RSS nears MB and spill finished pages to a '
+                             'temporary file. A soft target, not a hard limit (per-document '
+                             'peak recorded in metadata.memory; use --file-memory-mb to kill)')
+    parser.add_argument('--geometry', action='store_true',
+                        help='Also write every word\'s box, font, size and text offset with a '
+                             'per-page spatial index to <output>.geometry.npz, for highlighting '
+                             'chunks and search hits (requires numpy; bypasses the cache)')
+    parser.add_argument('--cache-dir',
+                        help='Extraction cache directory '
+                             '(default: $REGCLASSIFIER_CACHE_DIR or ~/.cache/regclassifier/pdf_extract)')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2,
+                        help='Cache size budget before LRU eviction (default: %(default)s MB)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always re-extract and do not store results')
+    parser.add_argument('--manifest', action='store_true',
+                        help='Write a page fingerprint manifest (<output>.manifest.json) '
+                             'for later --incremental runs')
+    parser.add_argument('--incremental', metavar='PREVIOUS',
+                        help='Previous JSON result (or, with --output-dir, a directory of them) '
+                             'whose unchanged pages are reused; implies --manifest')
+    parser.add_argument('--chunks', action='store_true',
+                        help='Also write reg.chunk_text-compatible token windows with page '
+                             'provenance to <output>.chunks.csv')
+    parser.add_argument('--chunk-tokens', type=int, default=300,
+                        help='Tokens per chunk (reg.chunk_text chunkTokens, default: %(default)s)')
+    parser.add_argument('--chunk-overlap', type=int, default=80,
+                        help='Tokens shared by consecutive chunks (default: %(default)s)')
+    parser.add_argument('--doc-ids', choices=['index', 'stem'], default='index',
+                        help='Chunk and article doc_id: DOC_<n> in input order like reg.ingest_pdfs '
+                             '(default), or the file name stem')
+    parser.add_argument('--articles', action='store_true',
+                        help='Also write one record per Article/Annex (number, heading, '
+                             'part/title/chapter/section, page span, text, text hash) to '
+                             '<output>.articles.ndjson; record ids use the --doc-ids scheme')
+    parser.add_argument('--index', metavar='DIR',
+                        help='Add the chunks to a BM25/TF-IDF search index in DIR '
+                             '(created if missing; requires --chunks)')
+    parser.add_argument('--file-timeout', type=float, metavar='SECONDS',
+                        help='Batch mode: kill a file\'s extraction after this long '
+                             '(default: no limit)')
+    parser.add_argument('--file-memory-mb', type=int, metavar='MB',
+                        help='Batch mode: address-space limit per file extraction (POSIX only)')
+    parser.add_argument('--retries', type=int, default=1,
+                        help='Batch mode: attempts after the first before a failing file is '
+                             'quarantined (default: %(default)s)')
+    parser.add_argument('--retry-quarantined', action='store_true',
+                        help='Batch mode: try files quarantined by a previous run again')
+    parser.add_argument('--restart', action='store_true',
+                        help='Batch mode: ignore <output-dir>/batch_manifest.jsonl and '
+                             'process every file')
+    parser.add_argument('--stats-json', metavar='PATH',
+                        help='Time each extraction stage per page and write a summary here '
+                             '(bypasses the cache; page timings go to metadata.timings)')
+    parser.add_argument('--profile', metavar='PREFIX',
+                        help='Write cProfile (PREFIX.prof) and tracemalloc (PREFIX.tracemalloc, '
+                             'PREFIX.tracemalloc.txt) snapshots of the main process')
+    parser.add_argument('--probe', action='store_true',
+                        help='Print the interpreter, package versions and available backends '
+                             'as JSON and exit')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run a persistent extraction server (JSON lines on stdin/stdout, '
+                             'or on --socket/--port)')
+    parser.add_argument('--socket', help='Unix socket path for --serve')
+    parser.add_argument('--port', type=int, help='Localhost TCP port for --serve')
 
     args = parser.parse_args()
+    workers = _resolve_workers(args.workers)
+    include_formulas = not args.no_formulas
+    options = {'backend': args.backend, 'tables': args.tables, 'triage': args.triage,
+               'strip_boilerplate': args.strip_boilerplate, 'max_memory_mb': args.max_memory}
+    if args.geometry:
+        options['geometry'] = True
+    cache_dir = None if args.no_cache else str(args.cache_dir or DEFAULT_CACHE_DIR)
+    cache_max_bytes = args.cache_max_mb * 1024 ** 2
+
+    batch_only = [flag for flag, value in (('--file-timeout', args.file_timeout),
+                                            ('--file-memory-mb', args.file_memory_mb),
+                                            ('--retry-quarantined', args.retry_quarantined),
+                                            ('--restart', args.restart)) if value]
+    if batch_only and (not args.output_dir or args.format == 'corpus'):
+        parser.error(f"{', '.join(batch_only)} only apply to --output-dir batches")
+
+    if args.probe:
+        print(json.dumps(probe(), indent=2))
+        return
+
+    # Parsers are imported lazily, so report missing ones before any work starts
+    needed = ['pymupdf'] + (['pdfplumber'] if args.backend == 'pdfplumber' or args.tables != 'never'
+                            else [])
+    missing = [name for name in needed if _package_version(name, PROBE_PACKAGES[name]) is None]
+    if missing:
+        print(f"ERROR: {', '.join(missing)} not installed. Run: pip install {' '.join(missing)}",
+              file=sys.stderr)
+        sys.exit(1)
+
+    if args.serve:
+        if args.input:
+            parser.error("--serve does not take input files")
+        from extraction_server import serve
+        serve(workers, args.socket, args.port, cache_dir, cache_max_bytes, not args.quiet)
+        return
+
+    if not args.input:
+        parser.error("at least one input file is required")
+
+    if args.incremental and args.format != 'json':
+        parser.error("--incremental requires --format json")
+
+    if args.format == 'corpus' and not (args.output or args.output_dir):
+        parser.error("--format corpus requires --output or --output-dir (the store directory)")
+    if args.format == 'corpus' and (args.manifest or args.chunks or args.articles):
+        parser.error("--manifest, --chunks and --articles are not supported with --format corpus")
+    if args.max_memory is not None and (args.incremental or args.format == 'corpus'):
+        parser.error("--max-memory is not supported with --incremental or --format corpus")
+    if args.geometry and (args.incremental or args.format == 'corpus'):
+        parser.error("--geometry is not supported with --incremental or --format corpus")
+    if args.index and not args.chunks:
+        parser.error("--index requires --chunks")
+    if args.chunks and not 0 <= args.chunk_overlap < args.chunk_tokens:
+        parser.error("--chunk-overlap must be non-negative and less than --chunk-tokens")
+
+    def doc_id_for(index: int, input_file: str) -> str:
+        """Document id of the index-th (1-based) input for chunk and article ids."""
+        return Path(input_file).stem if args.doc_ids == 'stem' else f"DOC_{index}"
+
+    def chunking_for(index: int, input_file: str) -> Optional[Dict[str, Any]]:
+        """Chunking options for the index-th (1-based) input, if --chunks is set."""
+        if not args.chunks:
+            return None
+        return {'doc_id': doc_id_for(index, input_file), 'chunk_tokens': args.chunk_tokens,
+                'overlap': args.chunk_overlap}
+
+    def previous_for(input_file: str) -> Optional[str]:
+        """Previous result for an input (a directory holds one per input stem)."""
+        if not args.incremental:
+            return None
+        previous = Path(args.incremental)
+        if previous.is_dir():
+            previous = previous / f"{Path(input_file).stem}.json"
+        return str(previous) if previous.exists() else None
+
+    timings = bool(args.stats_json)
+    started = time.perf_counter()
+    reports: List[Dict[str, Any]] = []
+
+    with profiled(args.profile) if args.profile else contextlib.nullcontext():
+        if args.format == 'corpus':
+            _extract_to_corpus(args.input, args.output_dir or args.output, include_formulas,
+                               not args.quiet, workers, options, cache_dir, cache_max_bytes,
+                               args.shard_docs, timings, reports)
+
+        # Handle batch processing
+        elif args.output_dir:
+            output_dir = Path(args.output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+            from batch_runner import run_batch, batch_manifest_path
+
+            jobs = []
+            for input_file in args.input:
+                input_path = Path(input_file)
+                if not input_path.exists():
+                    print(f"ERROR: File not found: {input_file}", file=sys.stderr)
+                    continue
+
+                # Determine output filename
+                output_file = output_dir / f"{input_path.stem}{OUTPUT_SUFFIXES[args.format]}"
+
+                process_kwargs = {
+                    'output_format': args.format, 'include_formulas': include_formulas,
+                    'verbose': not args.quiet, 'options': options, 'cache_dir': cache_dir,
+                    'cache_max_bytes': cache_max_bytes,
+                    'manifest': args.manifest or bool(args.incremental),
+                    'previous': previous_for(input_file), 'timings': timings,
+                    'chunking': chunking_for(len(jobs) + 1, input_file)}
+                if args.articles:
+                    process_kwargs['articles'] = doc_id_for(len(jobs) + 1, input_file)
+                jobs.append((input_file, str(output_file), process_kwargs))
+
+            # Parallelise across files (each extracted serially), or across
+            # the pages of the only file
+            file_workers = min(workers, len(jobs)) if len(jobs) > 1 else 1
+            for _, _, process_kwargs in jobs:
+                process_kwargs['workers'] = 1 if file_workers > 1 else workers
+            if args.restart:
+                batch_manifest_path(output_dir).unlink(missing_ok=True)
+            reports.extend(run_batch(jobs, str(batch_manifest_path(output_dir)), file_workers,
+                                     args.file_timeout, args.file_memory_mb, args.retries,
+                                     args.retry_quarantined, not args.quiet))
+
+            if cache_dir is not None and not args.quiet:
+                hits = sum(1 for report in reports if report['cache_hit'] is True)
+                misses = sum(1 for report in reports if report['cache_hit'] is False)
+                print(f"[INFO] Cache: {hits} hits, {misses} misses ({cache_dir})",
+                      file=sys.stderr)
 
-    # Handle batch processing
-    if args.output_dir:
-        output_dir = Path(args.output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            # Single file processing
+            if len(args.input) != 1:
+                parser.error("Single file mode requires exactly one input file")
 
-        for input_file in args.input:
-            input_path = Path(input_file)
-            if not input_path.exists():
-                print(f"ERROR: File not found: {input_file}", file=sys.stderr)
-                continue
+            input_file = args.input[0]
 
-            # Determine output filename
-            if args.format == 'json':
-                output_file = output_dir / f"{input_path.stem}.json"
+            # Determine output file
+            if args.output:
+                output_file = args.output
             else:
-                output_file = output_dir / f"{input_path.stem}.txt"
+                input_path = Path(input_file)
+                output_file = f"{input_path.stem}{OUTPUT_SUFFIXES[args.format]}"
 
             try:
-                extractor = RegulatoryPDFExtractor(input_file, verbose=not args.quiet)
-
-                if args.format == 'json':
-                    extractor.save_as_json(str(output_file))
-                else:
-                    extractor.save_as_text(str(output_file))
-
-                print(f"✓ Processed: {input_file} → {output_file}")
+                if args.incremental and previous_for(input_file) is None:
+                    raise FileNotFoundError(f"Previous result not found: {args.incremental}")
+                reports.append(_process_file(input_file, output_file, args.format,
+                                             include_formulas, not args.quiet, workers, options,
+                                             cache_dir, cache_max_bytes,
+                                             args.manifest or bool(args.incremental),
+                                             previous_for(input_file), timings,
+                                             chunking_for(1, input_file),
+                                             doc_id_for(1, input_file) if args.articles else None))
+
+                print(f"✓ Success! Output: {output_file}")
 
             except Exception as e:
-                print(f"ERROR processing {input_file}: {e}", file=sys.stderr)
-                continue
-
-    else:
-        # Single file processing
-        if len(args.input) != 1:
-            parser.error("Single file mode requires exactly one input file")
-
-        input_file = args.input[0]
-
-        # Determine output file
-        if args.output:
-            output_file = args.output
-        else:
-            input_path = Path(input_file)
-            if args.format == 'json':
-                output_file = f"{input_path.stem}.json"
-            else:
-                output_file = f"{input_path.stem}.txt"
-
-        try:
-            extractor = RegulatoryPDFExtractor(input_file, verbose=not args.quiet)
-
-            if args.format == 'json':
-                extractor.save_as_json(output_file)
-            else:
-                extractor.save_as_text(output_file)
-
-            print(f"✓ Success! Output: {output_file}")
-
-        except Exception as e:
-            print(f"ERROR: {e}", file=sys.stderr)
-            sys.exit(1)
+                print(f"ERROR: {e}", file=sys.stderr)
+                sys.exit(1)
+
+    if args.index and reports:
+        _index_chunks(args.index, reports, not args.quiet)
+
+    if args.stats_json:
+        _write_stats(args.stats_json, reports, time.perf_counter() - started)
+        if not args.quiet:
+            print(f"[INFO] Saved stage timings to: {args.stats_json}", file=sys.stderr)
+    if args.profile and not args.quiet:
+        print(f"[INFO] Saved profile to: {args.profile}.prof, {args.profile}.tracemalloc",
+              file=sys.stderr)
 
 
 if __name__ == '__main__':
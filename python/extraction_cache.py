@@ -0,0 +1,140 @@
+"""
+Content-addressed cache for PDF extraction results.
+
+Entries are keyed by the SHA-256 of the PDF bytes plus the extractor options
+that affect the result (backend, formulas, tables, extractor version), so a
+renamed or moved file still hits and any option change misses. Results are
+stored as compact JSON, one file per key, and the cache is trimmed to a size
+budget by evicting the least recently used entries (file mtime is refreshed
+on every hit).
+
+Usage:
+    cache = ExtractionCache('~/.cache/regclassifier/pdf_extract')
+    key = cache.key('CRR.pdf', {'backend': 'pymupdf', 'formulas': True})
+    result = cache.get(key)
+    if result is None:
+        result = extract(...)
+        cache.put(key, result)
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Default cache location (override with --cache-dir or REGCLASSIFIER_CACHE_DIR)
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    'REGCLASSIFIER_CACHE_DIR',
+    Path.home() / '.cache' / 'regclassifier' / 'pdf_extract'
+))
+
+# Default size budget before LRU eviction kicks in
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk LRU cache of extraction results keyed by content hash."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, pdf_path: str, options: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a PDF and a set of extractor options.
+
+        Args:
+            pdf_path: Path to the PDF file.
+            options: JSON-serialisable options that affect the result.
+
+        Returns:
+            Hex digest identifying the (content, options) pair.
+        """
+        digest = hashlib.sha256()
+        digest.update(file_sha256(pdf_path).encode('ascii'))
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for ``key``, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            # Missing or truncated entry: treat as a miss
+            self.misses += 1
+            return None
+
+        # Refresh recency for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result under ``key`` and evict old entries if over budget."""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write atomically so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its budget."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters for this cache instance."""
+        return {'hits': self.hits, 'misses': self.misses}
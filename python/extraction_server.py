@@ -0,0 +1,382 @@
+"""
+Long-lived extraction server for extract_regulatory_pdf.py --serve.
+
+Keeps a warm process pool (pdfplumber/PyMuPDF already imported) and accepts
+line-delimited JSON requests over stdin/stdout, a Unix socket or a localhost
+TCP port, so callers such as reg.ingest_pdf_python can reuse one process for
+a whole ingest run instead of starting an interpreter per PDF.
+
+Protocol (one JSON object per line; responses carry the request ``id`` and
+may arrive out of order when requests run concurrently):
+
+    {"id": 1, "op": "extract", "input": "/data/CRR.pdf", "output": "/tmp/CRR.json",
+     "format": "json", "include_formulas": true, "backend": "pymupdf", "tables": "always",
+     "triage": false, "strip_boilerplate": false}
+    -> {"id": 1, "ok": true, "output": "/tmp/CRR.json", "cache_hit": false, "seconds": 1.92}
+
+    {"id": 2, "op": "extract", "input": "/data/CRR.pdf"}
+    -> {"id": 2, "ok": true, "result": {...extract_all result...}, "cache_hit": true, ...}
+
+    Add ``"timings": true`` to an extract request to time each stage (the
+    cache is bypassed); the stage summary is returned as ``timings``, or in
+    ``result.metadata.timings`` when no output path is given.
+
+    Add ``"geometry": true`` to an extract request with an ``output`` to
+    also write word boxes to ``<output>.geometry.npz``; the path is
+    returned as ``geometry``.
+
+    {"id": 3, "op": "health"}
+    -> {"id": 3, "ok": true, "status": "ok", "workers": 8, "queue_depth": 0, ...}
+
+    If a worker dies (OOM kill, parser crash), the requests it was running
+    fail with an error response, the pool is rebuilt and health reports
+    ``"status": "degraded"`` for a while, with the ``pool_restarts`` count.
+
+    {"id": 4, "op": "shutdown"}
+
+Errors are reported as ``{"id": ..., "ok": false, "error": "..."}``.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import socketserver
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, Callable, Tuple
+
+import extract_regulatory_pdf as erp
+from extraction_cache import ExtractionCache, DEFAULT_MAX_BYTES
+from extraction_timing import StageTimer
+
+# Health reports 'degraded' for this long after the pool had to be rebuilt
+DEGRADED_SECONDS = 300
+
+
+def _warm_up() -> int:
+    """Start a pool process and import the PDF backends before the first request."""
+    # The extractor imports backends lazily; load them here so requests don't pay for it
+    for backend in (erp.pdfplumber, erp.fitz):
+        try:
+            backend._load()
+        except ImportError:
+            pass    # reported by the first request that needs this backend
+    return os.getpid()
+
+
+def _serve_extract(request: Dict[str, Any], cache_dir: Optional[str],
+                   cache_max_bytes: int) -> Dict[str, Any]:
+    """Worker entry point: run one extract request and build its response."""
+    started = time.perf_counter()
+
+    output_format = request.get('format', 'json')
+    if output_format not in erp.OUTPUT_SUFFIXES:
+        raise ValueError(f"Unknown format: {output_format}")
+
+    include_formulas = bool(request.get('include_formulas', True))
+    options = {
+        'backend': request.get('backend', 'pdfplumber'),
+        'tables': request.get('tables', 'always'),
+        'triage': bool(request.get('triage', False)),
+        'strip_boilerplate': bool(request.get('strip_boilerplate', False)),
+    }
+    if not request.get('cache', True):
+        cache_dir = None
+    timings = bool(request.get('timings', False))
+
+    response: Dict[str, Any] = {}
+    output = request.get('output')
+    if request.get('geometry'):
+        if not output:
+            raise ValueError("geometry requires an output path")
+        options['geometry'] = True
+    if output:
+        report = erp._process_file(
+            request['input'], output, output_format, include_formulas, False, 1,
+            options, cache_dir, cache_max_bytes, timings=timings)
+        response['cache_hit'] = report['cache_hit']
+        response['output'] = output
+        if options.get('geometry'):
+            from page_geometry import geometry_path
+            response['geometry'] = str(geometry_path(output))
+        if timings:
+            response['timings'] = report['timings']
+    else:
+        cache = ExtractionCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+        timer = StageTimer() if timings else None
+        extractor = erp.RegulatoryPDFExtractor(request['input'], verbose=False, cache=cache,
+                                               timer=timer, **options)
+        response['result'] = extractor.extract_all(include_formulas=include_formulas)
+        response['cache_hit'] = extractor.last_cache_hit
+
+    response['seconds'] = round(time.perf_counter() - started, 3)
+    return response
+
+
+class ExtractionServer:
+    """Dispatch line-delimited JSON requests onto a warm process pool."""
+
+    def __init__(self, workers: int, cache_dir: Optional[str] = None,
+                 cache_max_bytes: int = DEFAULT_MAX_BYTES, verbose: bool = True):
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.verbose = verbose
+
+        self.started = time.time()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.pool_restarts = 0
+        self.last_restart: Optional[float] = None
+        self.shutdown_requested = threading.Event()
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+
+        self.pool = self._start_pool()
+        self.log(f"Extraction server ready with {workers} workers")
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Create the worker pool and start every worker so requests do not pay for imports."""
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        for future in [pool.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _restart_pool(self, broken: ProcessPoolExecutor):
+        """
+        Replace a pool whose worker died (OOM kill, parser crash).
+
+        Every request in flight on the broken pool fails; only the first
+        caller for a given pool rebuilds it.
+        """
+        with self._pool_lock:
+            if self.pool is not broken:
+                return
+            self.log("A worker process died; restarting the worker pool")
+            # May run on the broken pool's own management thread: do not wait for it
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._start_pool()
+            with self._lock:
+                self.pool_restarts += 1
+                self.last_restart = time.time()
+
+    def _submit(self, request: Dict[str, Any]) -> Tuple[Future, ProcessPoolExecutor]:
+        """Submit an extract request, rebuilding the pool once if it is broken."""
+        pool = self.pool
+        try:
+            return pool.submit(_serve_extract, request, self.cache_dir, self.cache_max_bytes), pool
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            pool = self.pool
+            return pool.submit(_serve_extract, request, self.cache_dir, self.cache_max_bytes), pool
+
+    def log(self, message: str):
+        """Print message if verbose."""
+        if self.verbose:
+            print(f"[INFO] {message}", file=sys.stderr)
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Return server status and queue depth.
+
+        ``status`` is 'degraded' for DEGRADED_SECONDS after the worker pool
+        had to be rebuilt; ``pool_restarts`` counts rebuilds since start.
+        """
+        with self._lock:
+            pending = self.pending
+            degraded = (self.last_restart is not None
+                        and time.time() - self.last_restart < DEGRADED_SECONDS)
+            return {
+                'status': 'degraded' if degraded else 'ok',
+                'pool_restarts': self.pool_restarts,
+                'pid': os.getpid(),
+                'workers': self.workers,
+                'active': min(pending, self.workers),
+                'queue_depth': max(0, pending - self.workers),
+                'completed': self.completed,
+                'failed': self.failed,
+                'uptime': round(time.time() - self.started, 1),
+                'version': erp.EXTRACTOR_VERSION,
+                'cache_dir': self.cache_dir,
+            }
+
+    def handle_line(self, line: str, respond: Callable[[Dict[str, Any]], None]):
+        """
+        Parse one request line and arrange for ``respond`` to be called.
+
+        Extract requests are answered asynchronously from the pool; health
+        and shutdown requests are answered immediately.
+        """
+        line = line.strip()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            respond({'id': None, 'ok': False, 'error': f"Invalid request: {e}"})
+            return
+
+        request_id = request.get('id')
+        op = request.get('op', 'extract')
+
+        if op == 'health':
+            respond({'id': request_id, 'ok': True, **self.health()})
+        elif op == 'shutdown':
+            respond({'id': request_id, 'ok': True, 'status': 'shutting_down'})
+            self.shutdown_requested.set()
+        elif op == 'extract':
+            if not request.get('input'):
+                respond({'id': request_id, 'ok': False, 'error': "Missing 'input'"})
+                return
+            with self._lock:
+                self.pending += 1
+            try:
+                future, pool = self._submit(request)
+            except Exception as e:
+                # Pool could not be rebuilt, or is shutting down
+                with self._lock:
+                    self.pending -= 1
+                    self.failed += 1
+                respond({'id': request_id, 'ok': False, 'error': f"Worker pool unavailable: {e}"})
+                return
+            future.add_done_callback(lambda f: self._finish(request, f, respond, pool))
+        else:
+            respond({'id': request_id, 'ok': False, 'error': f"Unknown op: {op}"})
+
+    def _finish(self, request: Dict[str, Any], future: Future,
+                respond: Callable[[Dict[str, Any]], None], pool: ProcessPoolExecutor):
+        """Pool callback: send the response for a finished extract request."""
+        broken = False
+        try:
+            response = {'id': request.get('id'), 'ok': True, **future.result()}
+            ok = True
+        except BrokenProcessPool:
+            response = {'id': request.get('id'), 'ok': False,
+                        'error': "Worker process died during extraction (out of memory or "
+                                 "parser crash); the worker pool was restarted"}
+            ok = False
+            broken = True
+        except Exception as e:
+            response = {'id': request.get('id'), 'ok': False, 'error': str(e)}
+            ok = False
+
+        with self._lock:
+            self.pending -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+        self.log(f"{'✓' if ok else '✗'} {request.get('input')}")
+        try:
+            respond(response)
+        except OSError:
+            # Client went away before the result was ready
+            pass
+
+        if broken:
+            try:
+                self._restart_pool(pool)
+            except Exception as e:
+                self.log(f"Could not restart the worker pool: {e}")
+
+    def serve_stdio(self, out=None):
+        """Serve requests from stdin, writing responses to ``out`` (default: stdout)."""
+        out = out or sys.stdout
+        write_lock = threading.Lock()
+
+        def respond(response: Dict[str, Any]):
+            with write_lock:
+                out.write(json.dumps(response, ensure_ascii=False) + "\n")
+                out.flush()
+
+        for line in sys.stdin:
+            self.handle_line(line, respond)
+            if self.shutdown_requested.is_set():
+                break
+
+        self.close()
+
+    def serve_socket(self, socket_path: Optional[str] = None, port: Optional[int] = None):
+        """Serve requests on a Unix socket path or a localhost TCP port."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                sent = [0]
+                sent_changed = threading.Condition()
+
+                def respond(response: Dict[str, Any]):
+                    data = (json.dumps(response, ensure_ascii=False) + "\n").encode('utf-8')
+                    with sent_changed:
+                        self.wfile.write(data)
+                        self.wfile.flush()
+                        sent[0] += 1
+                        sent_changed.notify_all()
+
+                # Every non-blank line gets exactly one response; keep the
+                # connection open until all of them have been sent
+                received = 0
+                for raw in self.rfile:
+                    line = raw.decode('utf-8')
+                    if line.strip():
+                        received += 1
+                    server.handle_line(line, respond)
+                    if server.shutdown_requested.is_set():
+                        break
+                with sent_changed:
+                    sent_changed.wait_for(
+                        lambda: sent[0] >= received or server.shutdown_requested.is_set())
+
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            listener = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+            address = socket_path
+        else:
+            listener = socketserver.ThreadingTCPServer(('127.0.0.1', port), Handler)
+            address = f"127.0.0.1:{listener.server_address[1]}"
+        listener.daemon_threads = True
+
+        thread = threading.Thread(target=listener.serve_forever, daemon=True)
+        thread.start()
+        self.log(f"Listening on {address}")
+
+        try:
+            self.shutdown_requested.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.shutdown()
+            listener.server_close()
+            if socket_path and os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.close()
+
+    def close(self):
+        """Wait for in-flight requests and stop the pool."""
+        self.pool.shutdown(wait=True)
+        self.log("Extraction server stopped")
+
+
+def serve(workers: int, socket_path: Optional[str] = None, port: Optional[int] = None,
+          cache_dir: Optional[str] = None, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+          verbose: bool = True):
+    """Run the extraction server until a shutdown request or EOF."""
+    if socket_path or port is not None:
+        ExtractionServer(workers, cache_dir, cache_max_bytes, verbose).serve_socket(socket_path, port)
+        return
+
+    # Reserve the real stdout for responses and point fd 1 (inherited by the
+    # pool workers) at stderr, so stray library output cannot corrupt the
+    # protocol stream.
+    sys.stdout.flush()
+    out = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    os.dup2(2, 1)
+    ExtractionServer(workers, cache_dir, cache_max_bytes, verbose).serve_stdio(out)
@@ -0,0 +1,180 @@
+"""
+Per-stage timing and profiling for PDF extraction.
+
+A ``StageTimer`` passed to ``RegulatoryPDFExtractor(timer=...)`` records
+wall-clock and CPU time for each pipeline stage (parse, triage, columns,
+tables, formulas, serialization), per page and per document. Per-page
+timings are stored in each page's ``metadata['timings']``; ``summary()``
+aggregates them for ``--stats-json``. Extractors without a timer skip all
+of this, so instrumentation costs nothing when it is off.
+
+Callers can plug in their own timers or metrics sinks with hooks:
+
+    timer = StageTimer()
+    timer.add_hook(lambda stage, page, wall, cpu: statsd.timing(f"pdf.{stage}", wall))
+    RegulatoryPDFExtractor('CRR.pdf', timer=timer).extract_all()
+    print(timer.summary())
+
+``profiled(prefix)`` wraps a run in cProfile and tracemalloc and writes
+``<prefix>.prof``, ``<prefix>.tracemalloc`` and ``<prefix>.tracemalloc.txt``.
+"""
+
+import os
+import sys
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Callable, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# hook(stage, page_number or None, wall_seconds, cpu_seconds)
+StageHook = Callable[[str, Optional[int], float, float], None]
+
+# Slowest pages listed in summaries
+SLOWEST_PAGES = 10
+
+# Allocation sites listed in the tracemalloc text report
+TRACEMALLOC_TOP = 50
+
+
+class StageTimer:
+    """Accumulate wall/CPU time per extraction stage and per page."""
+
+    def __init__(self, hooks: Optional[List[StageHook]] = None):
+        self.hooks: List[StageHook] = list(hooks or [])
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.page_seconds: Dict[int, float] = {}
+        self._pending: Dict[int, Dict[str, Dict[str, float]]] = {}
+
+    def __getstate__(self):
+        # Hooks may be closures; worker processes get a timer without them
+        state = self.__dict__.copy()
+        state['hooks'] = []
+        return state
+
+    def add_hook(self, hook: StageHook):
+        """Call ``hook(stage, page, wall, cpu)`` for every recorded stage."""
+        self.hooks.append(hook)
+
+    @contextmanager
+    def stage(self, name: str, page: Optional[int] = None) -> Iterator[None]:
+        """Time the enclosed block as ``name`` (for ``page``, if given)."""
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, page,
+                        time.perf_counter() - wall_started,
+                        time.process_time() - cpu_started)
+
+    def record(self, name: str, page: Optional[int], wall: float, cpu: float):
+        """Add one measurement to the totals and the page's pending timings."""
+        if page is not None:
+            timings = self._pending.setdefault(page, {})
+            entry = timings.setdefault(name, {'wall': 0.0, 'cpu': 0.0})
+            entry['wall'] += wall
+            entry['cpu'] += cpu
+        self._add(name, page, wall, cpu)
+
+    def _add(self, name: str, page: Optional[int], wall: float, cpu: float):
+        totals = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+        totals['wall'] += wall
+        totals['cpu'] += cpu
+        totals['calls'] += 1
+        if page is not None:
+            self.page_seconds[page] = self.page_seconds.get(page, 0.0) + wall
+
+        for hook in self.hooks:
+            hook(name, page, wall, cpu)
+
+    def take_page(self, page: int) -> Dict[str, Dict[str, float]]:
+        """Return (and forget) the stage timings recorded for ``page``."""
+        timings = self._pending.pop(page, {})
+        return {name: {'wall': round(entry['wall'], 6), 'cpu': round(entry['cpu'], 6)}
+                for name, entry in timings.items()}
+
+    def absorb_page(self, page_data: Dict[str, Any]):
+        """Add timings measured in a worker process (from page metadata)."""
+        for name, entry in page_data['metadata'].get('timings', {}).items():
+            self._add(name, page_data['page_number'], entry['wall'], entry['cpu'])
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per stage plus the slowest pages."""
+        slowest = sorted(self.page_seconds.items(), key=lambda item: item[1], reverse=True)
+        return {
+            'pages': len(self.page_seconds),
+            'stages': {name: {'wall': round(totals['wall'], 4), 'cpu': round(totals['cpu'], 4),
+                              'calls': totals['calls']}
+                       for name, totals in self.stages.items()},
+            'slowest_pages': [{'page': page, 'wall': round(seconds, 4)}
+                              for page, seconds in slowest[:SLOWEST_PAGES]],
+        }
+
+
+def merge_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up per-stage totals from several ``StageTimer.summary()`` results."""
+    stages: Dict[str, Dict[str, float]] = {}
+    for summary in summaries:
+        for name, totals in summary['stages'].items():
+            merged = stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            for field in merged:
+                merged[field] += totals[field]
+    return {
+        'pages': sum(summary['pages'] for summary in summaries),
+        'stages': {name: {'wall': round(totals['wall'], 4), 'cpu': round(totals['cpu'], 4),
+                          'calls': totals['calls']}
+                   for name, totals in stages.items()},
+    }
+
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            resident = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(resident * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2, 1)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its children in MB."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 ** 2 if sys.platform == 'darwin' else 1024), 1)
+
+
+@contextmanager
+def profiled(prefix: str) -> Iterator[None]:
+    """
+    Profile the enclosed block with cProfile and tracemalloc.
+
+    Only the current process is profiled; page or file workers are not.
+
+    Args:
+        prefix: Output path prefix for the ``.prof`` and ``.tracemalloc`` files.
+    """
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        profiler.dump_stats(f"{prefix}.prof")
+        snapshot.dump(f"{prefix}.tracemalloc")
+        with open(f"{prefix}.tracemalloc.txt", 'w', encoding='utf-8') as f:
+            for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
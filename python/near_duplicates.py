@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection across an extracted corpus with MinHash and LSH.
+
+Consolidations, corrigenda and guidelines repeat much of the same article
+text, and every copy is chunked and embedded again. This stage groups
+near-duplicate chunks, pages or paragraphs into clusters so only one
+representative per cluster needs an embedding.
+
+Each item's word shingles (``--shingle`` consecutive words, hashed with the
+rolling hash from version_diff) get a MinHash signature of ``--num-perm``
+values. Signatures are split into LSH bands sized for ``--threshold``; items
+sharing a band bucket are compared with their bucket's first item by
+signature agreement (estimated Jaccard similarity), and pairs at or above the
+threshold are merged into clusters. Every step is linear in the number of
+shingles and items. The earliest item of a cluster (in input order) is its
+representative.
+
+Outputs:
+    --clusters PATH   id, source, cluster, representative, is_representative,
+                      similarity (estimated Jaccard with the representative)
+    --collapse PATH   the input records of representatives only
+
+In MATLAB, embed one representative per cluster with:
+
+    M = readtable('clusters.csv', 'TextType', 'string');
+    [~, rep] = ismember(M.representative, M.id);
+    E = reg.precompute_embeddings(chunksT.text, C, 'Representative', rep);
+
+Usage:
+    python near_duplicates.py extracted/*.chunks.csv --clusters clusters.csv
+    python near_duplicates.py extracted/*.json --unit paragraph --threshold 0.9 --clusters paragraphs.csv
+    python near_duplicates.py extracted/*.chunks.csv --clusters clusters.csv --collapse unique.chunks.csv
+"""
+
+import re
+import sys
+import csv
+import json
+import argparse
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy not installed. Run: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+from version_diff import WordIds, span_hashes, split_paragraphs
+
+UNITS = ('chunk', 'page', 'paragraph')
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE = 5
+
+# Fixed seed so signatures (and clusters) are reproducible between runs
+SEED = 20240601
+
+# Weight of missed duplicates against candidate pairs when sizing LSH bands;
+# candidates are verified on full signatures, so recall is favoured
+LSH_FALSE_NEGATIVE_WEIGHT = 0.8
+
+# Shingles hashed per batch when computing signatures (bounds memory)
+_BATCH_SHINGLES = 1 << 16
+
+_WORD = re.compile(r'\w+')
+
+CLUSTER_FIELDS = ('id', 'source', 'cluster', 'representative', 'is_representative', 'similarity')
+
+
+def iter_items(paths: List[str], unit: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Yield ``(id, source, record)`` for every item in the inputs.
+
+    ``chunk`` reads chunk CSV/NDJSON files written by ``--chunks``; ``page``
+    and ``paragraph`` read JSON results (or NDJSON page records). Records
+    carry the item text under ``text``.
+    """
+    for path in paths:
+        source = Path(path).name
+        if unit == 'chunk':
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                if Path(path).suffix == '.ndjson':
+                    rows = (json.loads(line) for line in f if line.strip())
+                else:
+                    rows = csv.DictReader(f)
+                for row in rows:
+                    yield row['chunk_id'], source, row
+            continue
+
+        with open(path, 'r', encoding='utf-8') as f:
+            if Path(path).suffix == '.ndjson':
+                pages = [record for record in map(json.loads, filter(str.strip, f))
+                         if record.get('type') == 'page']
+            else:
+                pages = json.load(f)['pages']
+        stem = Path(path).stem
+        for page in pages:
+            if unit == 'page':
+                item_id = f"{stem}:p{page['page_number']}"
+                yield item_id, source, {'id': item_id, 'source': source,
+                                        'page': page['page_number'], 'text': page['text']}
+                continue
+            for number, (_, text) in enumerate(split_paragraphs(page['text']), start=1):
+                item_id = f"{stem}:p{page['page_number']}:{number}"
+                yield item_id, source, {'id': item_id, 'source': source, 'page': page['page_number'],
+                                        'paragraph': number, 'text': text}
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) for a Jaccard threshold.
+
+    Minimizes the weighted false-positive and false-negative probability
+    mass of the banding S-curve ``1 - (1 - s^rows)^bands`` around the
+    threshold (see LSH_FALSE_NEGATIVE_WEIGHT).
+    """
+    similarity = np.linspace(0.0, 1.0, 201)
+    step = similarity[1]
+    best = None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        if rows < 1:
+            break
+        candidate = 1 - (1 - similarity ** rows) ** bands
+        false_positive = candidate[similarity < threshold].sum() * step
+        false_negative = (1 - candidate[similarity >= threshold]).sum() * step
+        error = ((1 - LSH_FALSE_NEGATIVE_WEIGHT) * false_positive
+                 + LSH_FALSE_NEGATIVE_WEIGHT * false_negative)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """MinHash signatures over word shingles with multiply-shift permutations."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle: int = DEFAULT_SHINGLE):
+        rng = np.random.default_rng(SEED)
+        self.num_perm = num_perm
+        self.shingle = shingle
+        # h(x) = ((a * x + b) mod 2^64) >> 32 with odd a: a universal family for 32-bit x
+        self._a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._word_ids = WordIds()
+
+    def shingles(self, text: str) -> np.ndarray:
+        """32-bit hashes of the item's word shingles (one for items shorter than a shingle)."""
+        words = _WORD.findall(text.lower())
+        if not words:
+            return np.zeros(0, dtype=np.uint64)
+        ids = self._word_ids(words)
+        width = min(self.shingle, len(words))
+        starts = np.arange(len(words) - width + 1)
+        return span_hashes(ids, starts, starts + width) >> np.uint64(32)
+
+    def signatures(self, shingle_sets: List[np.ndarray]) -> np.ndarray:
+        """
+        Signatures for many items, hashed in batches of concatenated shingles.
+
+        Returns:
+            ``(items, num_perm)`` uint32 array; items without shingles get
+            all-ones rows and are never matched.
+        """
+        signatures = np.full((len(shingle_sets), self.num_perm), np.iinfo(np.uint32).max,
+                             dtype=np.uint32)
+        batch: List[int] = []
+        size = 0
+        for item, shingles in enumerate(shingle_sets):
+            if len(shingles):
+                batch.append(item)
+                size += len(shingles)
+            if batch and (size >= _BATCH_SHINGLES or item == len(shingle_sets) - 1):
+                values = np.concatenate([shingle_sets[member] for member in batch])
+                hashed = (values[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+                starts = np.cumsum([0] + [len(shingle_sets[member]) for member in batch[:-1]])
+                signatures[batch] = np.minimum.reduceat(hashed, starts, axis=0)
+                batch, size = [], 0
+        return signatures
+
+
+def candidate_pairs(signatures: np.ndarray, valid: np.ndarray, bands: int,
+                    rows: int) -> np.ndarray:
+    """
+    Pairs ``(leader, member)`` of items that share an LSH band bucket.
+
+    Within a bucket every item is paired with the bucket's first item only,
+    which keeps the pair count linear even for very large buckets.
+    """
+    rng = np.random.default_rng(SEED + 1)
+    mixers = rng.integers(0, 1 << 63, size=rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    items = np.flatnonzero(valid)
+    pairs = []
+    for band in range(bands):
+        block = signatures[items, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = (block * mixers).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        leaders = order[np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))]
+        members = ~starts
+        if members.any():
+            pairs.append(np.stack((items[leaders[members]], items[order[members]]), axis=1))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def cluster_items(signatures: np.ndarray, valid: np.ndarray, threshold: float,
+                  bands: int, rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group items whose estimated Jaccard similarity reaches the threshold.
+
+    Returns:
+        ``(representative, similarity)``: for every item, the index of its
+        cluster's earliest item and the estimated similarity to it.
+    """
+    parent = list(range(len(signatures)))
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    pairs = candidate_pairs(signatures, valid, bands, rows)
+    for start in range(0, len(pairs), _BATCH_SHINGLES):
+        batch = pairs[start:start + _BATCH_SHINGLES]
+        agreement = (signatures[batch[:, 0]] == signatures[batch[:, 1]]).mean(axis=1)
+        for left, right in batch[agreement >= threshold].tolist():
+            left, right = find(left), find(right)
+            if left != right:
+                # The smaller index (earlier input) stays the root
+                parent[max(left, right)] = min(left, right)
+
+    representative = np.array([find(item) for item in range(len(signatures))], dtype=np.int64)
+    similarity = (signatures == signatures[representative]).mean(axis=1)
+    return representative, similarity
+
+
+def find_near_duplicates(paths: List[str], unit: str = 'chunk',
+                         threshold: float = DEFAULT_THRESHOLD,
+                         num_perm: int = DEFAULT_NUM_PERM,
+                         shingle: int = DEFAULT_SHINGLE) -> Dict[str, Any]:
+    """
+    Cluster near-duplicate items across input files.
+
+    Args:
+        paths: Chunk files (``unit='chunk'``) or JSON/NDJSON extraction results.
+        unit: ``chunk``, ``page`` or ``paragraph``.
+        threshold: Jaccard similarity at or above which items are duplicates.
+        num_perm: MinHash signature length.
+        shingle: Words per shingle.
+
+    Returns:
+        Dictionary with ``ids``, ``sources``, ``records``, ``representative``
+        (index per item), ``similarity``, and the ``bands``/``rows`` used.
+    """
+    hasher = MinHasher(num_perm, shingle)
+    ids, sources, records, shingle_sets = [], [], [], []
+    for item_id, source, record in iter_items(paths, unit):
+        ids.append(item_id)
+        sources.append(source)
+        records.append(record)
+        shingle_sets.append(hasher.shingles(record['text']))
+
+    bands, rows = lsh_bands(threshold, num_perm)
+    signatures = hasher.signatures(shingle_sets)
+    valid = np.array([len(shingles) > 0 for shingles in shingle_sets], dtype=bool)
+    representative, similarity = cluster_items(signatures, valid, threshold, bands, rows)
+    return {'ids': ids, 'sources': sources, 'records': records,
+            'representative': representative, 'similarity': similarity,
+            'bands': bands, 'rows': rows}
+
+
+def write_clusters(path: str, found: Dict[str, Any]):
+    """Write the duplicate-cluster map (one row per item, in input order)."""
+    representative = found['representative']
+    cluster_numbers: Dict[int, int] = {}
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CLUSTER_FIELDS)
+        for item, item_id in enumerate(found['ids']):
+            root = int(representative[item])
+            cluster = cluster_numbers.setdefault(root, len(cluster_numbers) + 1)
+            writer.writerow([item_id, found['sources'][item], cluster, found['ids'][root],
+                             int(root == item), round(float(found['similarity'][item]), 4)])
+
+
+def write_collapsed(path: str, found: Dict[str, Any]):
+    """Write the records of cluster representatives only (CSV or, for .ndjson, JSON lines)."""
+    keep = [record for item, record in enumerate(found['records'])
+            if found['representative'][item] == item]
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if Path(path).suffix == '.ndjson':
+            for record in keep:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        fields = list(dict.fromkeys(field for record in keep for field in record))
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(keep)
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Cluster near-duplicate chunks, pages or paragraphs with MinHash/LSH')
+    parser.add_argument('inputs', nargs='+',
+                        help='Chunk files (.chunks.csv/.ndjson) or JSON/NDJSON extraction results')
+    parser.add_argument('--unit', choices=UNITS, default='chunk',
+                        help='Items to compare (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Jaccard similarity for near-duplicates (default: %(default)s)')
+    parser.add_argument('--num-perm', type=int, default=DEFAULT_NUM_PERM,
+                        help='MinHash signature length (default: %(default)s)')
+    parser.add_argument('--shingle', type=int, default=DEFAULT_SHINGLE,
+                        help='Words per shingle (default: %(default)s)')
+    parser.add_argument('--clusters', default='clusters.csv',
+                        help='Duplicate-cluster map to write (default: %(default)s)')
+    parser.add_argument('--collapse', metavar='PATH',
+                        help='Also write the representative records only')
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+    if args.num_perm < 1 or args.shingle < 1:
+        parser.error("--num-perm and --shingle must be positive")
+
+    try:
+        found = find_near_duplicates(args.inputs, args.unit, args.threshold,
+                                     args.num_perm, args.shingle)
+    except (FileNotFoundError, KeyError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    write_clusters(args.clusters, found)
+    if args.collapse:
+        write_collapsed(args.collapse, found)
+
+    items = len(found['ids'])
+    representatives = int((found['representative'] == np.arange(items)).sum())
+    duplicate_chars = sum(len(record['text']) for item, record in enumerate(found['records'])
+                          if found['representative'][item] != item)
+    print(f"{items} {args.unit}s in {representatives} clusters: "
+          f"{items - representatives} near-duplicates ({duplicate_chars} characters) "
+          f"[{found['bands']} bands x {found['rows']} rows]")
+    print(f"Saved cluster map to: {args.clusters}")
+    if args.collapse:
+        print(f"Saved {representatives} representatives to: {args.collapse}")
+
+
+if __name__ == '__main__':
+    main()
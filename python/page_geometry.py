@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Word geometry store with a per-page spatial index.
+
+Text extraction keeps only each page's text. With ``--geometry`` the
+extractor also keeps every word's box, font and size, aligned to that
+text. The data lives in NumPy structured arrays (40 bytes per word, with
+font names interned), and a uniform grid over each page answers two
+questions quickly:
+
+- which words lie in a rectangle (``words_in_bbox``)
+- where a chunk or character range lies on the page (``locate_chunk``,
+  ``words_for_chars``), so retrieval hits can be highlighted
+
+Each word records its character offset into the page's ``text`` (after
+column ordering and boilerplate stripping). It also records the index of
+the whitespace token it falls in, counted the way chunker.py and
+reg.chunk_text count. As a result, a chunk's ``start_idx``/``end_idx`` map
+straight to words. Words that cannot be aligned to the text, such as
+stripped headers, have offset and token -1. Coordinates are PDF points
+with the origin at the top left, as in the ``bbox`` of formula
+candidates.
+
+Layout (one file per document, next to the output):
+
+    CRR.geometry.npz
+      words.npy          one row per word, page by page in text order
+      pages.npy          one row per page (word range, token range, size)
+      fonts.npy          font names indexed by font id
+      cell_ptr.npy       per page, GRID_SIZE**2 + 1 offsets into cell_words
+      cell_words.npy     page-local word ids, grouped by grid cell
+      meta.npy           JSON string (format, version, grid size, source)
+
+Usage:
+    extractor = RegulatoryPDFExtractor('CRR.pdf', geometry=True)
+    extractor.save_as_json('CRR.json')
+    extractor.geometry.save(geometry_path('CRR.json'))
+
+    geometry = PageGeometry.load('CRR.geometry.npz')
+    hits = geometry.words_in_bbox(12, (50, 100, 300, 140))
+    boxes = geometry.locate_chunk(221, 520)   # [{'page': 12, 'bbox': [...]}, ...]
+
+or, from the command line:
+
+    python page_geometry.py CRR.geometry.npz --chunks CRR.chunks.csv --chunk-id CH_DOC_1_221
+    python page_geometry.py CRR.geometry.npz --page 12 --bbox 50 100 300 140
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy not installed. Run: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+from chunker import token_offsets
+
+GEOMETRY_FORMAT = 'regclassifier-geometry'
+GEOMETRY_VERSION = 1
+
+# Grid cells per page side; a cell is about 19 x 26 points on an A4 page
+GRID_SIZE = 32
+
+# How far (in characters) the aligner looks ahead of, or back from, the
+# current text position for the next word, and how many following words
+# must line up after a jump before it is accepted
+ALIGN_WINDOW = 400
+ALIGN_CONFIRM = 2
+
+# Words whose tops lie within this many points share a line (as _group_rows)
+LINE_TOLERANCE = 3.0
+
+WORD_DTYPE = np.dtype([
+    ('page', '<i4'),
+    ('x0', '<f4'), ('y0', '<f4'), ('x1', '<f4'), ('y1', '<f4'),
+    ('font_id', '<i4'), ('size', '<f4'),
+    ('offset', '<i4'), ('length', '<i4'),
+    ('token', '<i4'),
+])
+
+PAGE_DTYPE = np.dtype([
+    ('page_number', '<i4'),
+    ('width', '<f4'), ('height', '<f4'),
+    ('word_start', '<i8'), ('word_count', '<i4'),
+    ('token_start', '<i8'), ('token_count', '<i4'),
+    ('cell_start', '<i8'),
+])
+
+
+def geometry_path(output_path: str) -> Path:
+    """Return the geometry file path for an output file (CRR.json -> CRR.geometry.npz)."""
+    return Path(output_path).with_suffix('.geometry.npz')
+
+
+def reading_order(boxes: np.ndarray, layout: str, width: float,
+                  y_tolerance: float = LINE_TOLERANCE) -> np.ndarray:
+    """
+    Order word boxes the way the extractor orders text.
+
+    On two-column pages the left column comes before the right one (by
+    word centre). Within a column, words are grouped into lines by their
+    tops and read left to right.
+
+    Args:
+        boxes: (n, 4) array of x0, y0, x1, y1.
+        layout: Page layout from ``metadata['layout']``.
+        width: Page width in points.
+
+    Returns:
+        Indices into ``boxes`` in reading order.
+    """
+    if not len(boxes):
+        return np.zeros(0, dtype=np.int64)
+    if layout == 'two_column':
+        column = ((boxes[:, 0] + boxes[:, 2]) / 2 >= width / 2).astype(np.int64)
+    else:
+        column = np.zeros(len(boxes), dtype=np.int64)
+
+    order = np.lexsort((boxes[:, 0], boxes[:, 1], column))
+    line = np.empty(len(boxes), dtype=np.int64)
+    current, anchor, anchor_column = -1, None, None
+    for index in order.tolist():
+        top = boxes[index, 1]
+        if anchor is None or column[index] != anchor_column or abs(top - anchor) > y_tolerance:
+            current += 1
+            anchor, anchor_column = top, column[index]
+        line[index] = current
+    return np.lexsort((boxes[:, 0], line))
+
+
+def align_words(words: Sequence[str], order: np.ndarray, text: str,
+                window: int = ALIGN_WINDOW) -> np.ndarray:
+    """
+    Find each word's character offset in the page text.
+
+    Words are matched in reading order with a moving cursor, so repeated
+    words resolve to the right occurrence. A word normally follows the
+    previous one with only whitespace in between. Otherwise the aligner
+    jumps to a token start within ``window`` characters ahead of (or,
+    for rows read in a slightly different order, behind) the cursor, but
+    only if the next ``ALIGN_CONFIRM`` words follow on from there. Words
+    with no such match, e.g. from lines removed by boilerplate stripping,
+    are left unaligned (-1).
+
+    Returns:
+        Offsets (int64), -1 where a word was not found.
+    """
+    order = order.tolist()
+    offsets = np.full(len(words), -1, dtype=np.int64)
+    cursor = 0
+    for rank, index in enumerate(order):
+        word = words[index]
+        if not word:
+            continue
+        position = _follows(text, word, cursor)
+        if position < 0:
+            following = [words[other] for other in order[rank + 1:rank + 1 + ALIGN_CONFIRM]]
+            position = _jump(text, word, following, cursor, min(len(text), cursor + window))
+            if position < 0:
+                position = _jump(text, word, following, max(0, cursor - window), cursor)
+        if position >= 0:
+            offsets[index] = position
+            cursor = position + len(word)
+    return offsets
+
+
+def _follows(text: str, word: str, cursor: int) -> int:
+    """Offset of ``word`` if it comes next after ``cursor`` (skipping whitespace), else -1."""
+    position = cursor
+    while position < len(text) and text[position].isspace():
+        position += 1
+    return position if text.startswith(word, position) else -1
+
+
+def _jump(text: str, word: str, following: List[str], start: int, end: int) -> int:
+    """First token start in ``text[start:end]`` where ``word`` and then ``following`` match."""
+    position = text.find(word, start, end + len(word))
+    while position >= 0:
+        if position == 0 or text[position - 1].isspace():
+            cursor = position + len(word)
+            for other in following:
+                if not other:
+                    continue
+                found = _follows(text, other, cursor)
+                if found < 0:
+                    break
+                cursor = found + len(other)
+            else:
+                return position
+        position = text.find(word, position + 1, end + len(word))
+    return -1
+
+
+class GeometryBuilder:
+    """
+    Collect word geometry page by page during extraction.
+
+    Pages may arrive in any order (or from worker processes, via
+    ``merge``); ``build`` sorts them and builds the spatial index.
+    """
+
+    def __init__(self):
+        self.fonts: Dict[str, int] = {}
+        self._pages: Dict[int, Tuple[np.ndarray, float, float, int]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(page[0]) for page in self._pages.values())
+
+    def _font_id(self, name: str) -> int:
+        font_id = self.fonts.get(name)
+        if font_id is None:
+            font_id = self.fonts[name] = len(self.fonts)
+        return font_id
+
+    def add_page(self, page_data: Dict[str, Any],
+                 words: Sequence[Tuple[float, float, float, float, str, str, float]]):
+        """
+        Align one page's words to its final text and store them.
+
+        Args:
+            page_data: Page dictionary, after boilerplate stripping.
+            words: (x0, y0, x1, y1, text, font, size) per word, any order.
+        """
+        text = page_data['text']
+        metadata = page_data['metadata']
+        width = float(metadata.get('width') or 0.0)
+        height = float(metadata.get('height') or 0.0)
+        starts = token_offsets(text)
+
+        rows = np.zeros(len(words), dtype=WORD_DTYPE)
+        if len(words):
+            boxes = np.array([word[:4] for word in words], dtype=np.float64)
+            strings = [word[4] for word in words]
+            order = reading_order(boxes, metadata.get('layout', 'single_column'), width)
+            offsets = align_words(strings, order, text)
+            tokens = np.searchsorted(np.asarray(starts, dtype=np.int64), offsets, 'right') - 1
+            aligned = offsets >= 0
+
+            rows['page'] = page_data['page_number']
+            rows['x0'], rows['y0'], rows['x1'], rows['y1'] = boxes.T
+            rows['font_id'] = [self._font_id(word[5]) for word in words]
+            rows['size'] = [word[6] for word in words]
+            rows['offset'] = offsets
+            rows['length'] = [len(string) for string in strings]
+            rows['token'] = np.where(aligned, tokens, -1)
+
+            # Text order, unaligned words last (in reading order)
+            rank = np.empty(len(words), dtype=np.int64)
+            rank[order] = np.arange(len(words))
+            rows = rows[np.lexsort((rank, offsets, ~aligned))]
+
+        self._pages[page_data['page_number']] = (rows, width, height, len(starts))
+
+    def merge(self, other: 'GeometryBuilder'):
+        """Add the pages collected by another builder (e.g. a worker's)."""
+        remap = np.array([self._font_id(name) for name in
+                          sorted(other.fonts, key=other.fonts.get)] or [0], dtype=np.int32)
+        for page_number, (rows, width, height, tokens) in other._pages.items():
+            rows = rows.copy()
+            rows['font_id'] = remap[rows['font_id']]
+            self._pages[page_number] = (rows, width, height, tokens)
+
+    def build(self, source: Optional[str] = None) -> 'PageGeometry':
+        """Concatenate pages in page order and build the grid index."""
+        page_numbers = sorted(self._pages)
+        pages = np.zeros(len(page_numbers), dtype=PAGE_DTYPE)
+        words, cell_ptr, cell_words = [], [], []
+        word_start = token_start = cell_start = 0
+        for row, page_number in enumerate(page_numbers):
+            rows, width, height, tokens = self._pages[page_number]
+            ptr, cells = _page_grid(rows, width, height)
+            pages[row] = (page_number, width, height, word_start, len(rows),
+                          token_start, tokens, cell_start)
+            words.append(rows)
+            cell_ptr.append(ptr)
+            cell_words.append(cells)
+            word_start += len(rows)
+            token_start += tokens
+            cell_start += len(cells)
+
+        fonts = sorted(self.fonts, key=self.fonts.get)
+        return PageGeometry(
+            np.concatenate(words) if words else np.zeros(0, dtype=WORD_DTYPE),
+            pages, fonts,
+            np.stack(cell_ptr) if cell_ptr else np.zeros((0, GRID_SIZE * GRID_SIZE + 1), np.int32),
+            np.concatenate(cell_words) if cell_words else np.zeros(0, dtype=np.int32),
+            {'source': source} if source else {})
+
+    def save(self, path: str, source: Optional[str] = None) -> 'PageGeometry':
+        """Build and write the geometry file; returns the built geometry."""
+        geometry = self.build(source)
+        geometry.save(path)
+        return geometry
+
+
+def _page_grid(rows: np.ndarray, width: float, height: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bucket one page's words into a GRID_SIZE x GRID_SIZE grid.
+
+    Returns:
+        (cell_ptr, cell_words): word ids of cell c are
+        ``cell_words[cell_ptr[c]:cell_ptr[c + 1]]``. A word is listed in
+        every cell its box overlaps.
+    """
+    cells = GRID_SIZE * GRID_SIZE
+    if not len(rows):
+        return np.zeros(cells + 1, dtype=np.int32), np.zeros(0, dtype=np.int32)
+
+    cx0, cx1 = _grid_span(rows['x0'], rows['x1'], width)
+    cy0, cy1 = _grid_span(rows['y0'], rows['y1'], height)
+    span_x = cx1 - cx0 + 1
+    counts = span_x * (cy1 - cy0 + 1)
+
+    word_ids = np.repeat(np.arange(len(rows), dtype=np.int32), counts)
+    step = np.arange(len(word_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell = ((cy0[word_ids] + step // span_x[word_ids]) * GRID_SIZE
+            + cx0[word_ids] + step % span_x[word_ids])
+
+    order = np.argsort(cell, kind='stable')
+    ptr = np.zeros(cells + 1, dtype=np.int32)
+    np.cumsum(np.bincount(cell, minlength=cells), out=ptr[1:])
+    return ptr, word_ids[order]
+
+
+def _grid_span(low: np.ndarray, high: np.ndarray, extent: float) -> Tuple[np.ndarray, np.ndarray]:
+    """First and last grid cell (clipped to the page) covered by [low, high]."""
+    scale = GRID_SIZE / extent if extent > 0 else 0.0
+    first = np.clip(np.floor(low * scale), 0, GRID_SIZE - 1).astype(np.int64)
+    last = np.clip(np.floor(high * scale), 0, GRID_SIZE - 1).astype(np.int64)
+    return first, np.maximum(first, last)
+
+
+class PageGeometry:
+    """Read-only word geometry for one document, with spatial and text lookups."""
+
+    def __init__(self, words: np.ndarray, pages: np.ndarray, fonts: List[str],
+                 cell_ptr: np.ndarray, cell_words: np.ndarray,
+                 meta: Optional[Dict[str, Any]] = None):
+        self.words = words
+        self.pages = pages
+        self.fonts = list(fonts)
+        self.cell_ptr = cell_ptr
+        self.cell_words = cell_words
+        self.meta = meta or {}
+        self._rows = {int(page_number): row for row, page_number in enumerate(pages['page_number'])}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @classmethod
+    def load(cls, path: str) -> 'PageGeometry':
+        """Read a geometry file written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format') != GEOMETRY_FORMAT:
+                raise ValueError(f"Not a geometry file: {path}")
+            if meta.get('version', 0) > GEOMETRY_VERSION or meta.get('grid') != GRID_SIZE:
+                raise ValueError(f"Unsupported geometry file version or grid: {path}")
+            return cls(data['words'], data['pages'], data['fonts'].tolist(),
+                       data['cell_ptr'], data['cell_words'], meta)
+
+    def save(self, path: str):
+        """Write the arrays to one .npz file (atomically)."""
+        path = Path(path)
+        meta = {**self.meta, 'format': GEOMETRY_FORMAT, 'version': GEOMETRY_VERSION,
+                'grid': GRID_SIZE}
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, words=self.words, pages=self.pages,
+                         fonts=np.array(self.fonts, dtype=str),
+                         cell_ptr=self.cell_ptr, cell_words=self.cell_words,
+                         meta=np.array(json.dumps(meta)))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _page_row(self, page_number: int) -> int:
+        row = self._rows.get(page_number)
+        if row is None:
+            raise KeyError(f"No geometry for page {page_number}")
+        return row
+
+    def page_words(self, page_number: int) -> np.ndarray:
+        """All words of a page, in text order (a view into ``words``)."""
+        page = self.pages[self._page_row(page_number)]
+        start = int(page['word_start'])
+        return self.words[start:start + int(page['word_count'])]
+
+    def font(self, font_id: int) -> str:
+        """Font name for a font id."""
+        return self.fonts[font_id]
+
+    def words_in_bbox(self, page_number: int, bbox: Sequence[float],
+                      contained: bool = False) -> np.ndarray:
+        """
+        Words on a page that overlap (or, with ``contained``, lie inside) a box.
+
+        Only the grid cells under the box are scanned.
+
+        Args:
+            page_number: 1-based page number.
+            bbox: (x0, y0, x1, y1) in points, origin top left.
+            contained: Require the whole word box inside ``bbox``.
+
+        Returns:
+            Indices into ``words``, in text order.
+        """
+        page = self.pages[self._page_row(page_number)]
+        x0, y0, x1, y1 = bbox
+        cx0, cx1 = _grid_span(np.array([x0]), np.array([x1]), float(page['width']))
+        cy0, cy1 = _grid_span(np.array([y0]), np.array([y1]), float(page['height']))
+        ptr = self.cell_ptr[self._page_row(page_number)]
+        base = int(page['cell_start'])
+
+        # Cells of one grid row under the box are contiguous in cell_words
+        parts = []
+        for cy in range(int(cy0[0]), int(cy1[0]) + 1):
+            first = cy * GRID_SIZE
+            parts.append(self.cell_words[base + ptr[first + cx0[0]]:base + ptr[first + cx1[0] + 1]])
+        local = np.unique(np.concatenate(parts))
+
+        candidates = self.words[int(page['word_start']) + local]
+        if contained:
+            keep = ((candidates['x0'] >= x0) & (candidates['x1'] <= x1)
+                    & (candidates['y0'] >= y0) & (candidates['y1'] <= y1))
+        else:
+            keep = ((candidates['x1'] >= x0) & (candidates['x0'] <= x1)
+                    & (candidates['y1'] >= y0) & (candidates['y0'] <= y1))
+        return int(page['word_start']) + local[keep]
+
+    def words_for_chars(self, page_number: int, start: int, end: int) -> np.ndarray:
+        """Words overlapping characters ``start:end`` of a page's text."""
+        page = self.pages[self._page_row(page_number)]
+        first = int(page['word_start'])
+        words = self.words[first:first + int(page['word_count'])]
+        keep = ((words['offset'] >= 0) & (words['offset'] < end)
+                & (words['offset'] + words['length'] > start))
+        return first + np.flatnonzero(keep)
+
+    def words_for_tokens(self, start_idx: int, end_idx: int) -> np.ndarray:
+        """
+        Words in document tokens ``start_idx..end_idx`` (1-based, inclusive).
+
+        These are the positions in chunk ids and in the ``start_idx``/
+        ``end_idx`` columns of chunk files.
+        """
+        token_start = self.pages['token_start']
+        first_row = max(int(np.searchsorted(token_start, start_idx - 1, 'right')) - 1, 0)
+        last_row = int(np.searchsorted(token_start, end_idx - 1, 'right'))
+        parts = []
+        for page in self.pages[first_row:last_row]:
+            first = int(page['word_start'])
+            tokens = self.words['token'][first:first + int(page['word_count'])]
+            low = start_idx - 1 - int(page['token_start'])
+            high = end_idx - 1 - int(page['token_start'])
+            parts.append(first + np.flatnonzero((tokens >= low) & (tokens <= high)))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def boxes(self, indices: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Merge words into one highlight box per page line.
+
+        A new box starts where the page changes, the text moves left (next
+        line or column) or a word does not overlap the previous one
+        vertically by at least half its height.
+
+        Args:
+            indices: Word indices in text order (as the lookups return them).
+
+        Returns:
+            List of ``{'page': int, 'bbox': [x0, y0, x1, y1]}``.
+        """
+        words = self.words[np.asarray(indices, dtype=np.int64)]
+        if not len(words):
+            return []
+        overlap = (np.minimum(words['y1'][1:], words['y1'][:-1])
+                   - np.maximum(words['y0'][1:], words['y0'][:-1]))
+        breaks = ((words['page'][1:] != words['page'][:-1])
+                  | (words['x0'][1:] < words['x0'][:-1])
+                  | (overlap <= 0.5 * (words['y1'][1:] - words['y0'][1:])))
+        starts = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+        x0 = np.minimum.reduceat(words['x0'], starts)
+        y0 = np.minimum.reduceat(words['y0'], starts)
+        x1 = np.maximum.reduceat(words['x1'], starts)
+        y1 = np.maximum.reduceat(words['y1'], starts)
+        return [{'page': int(page), 'bbox': [round(float(value), 2) for value in bbox]}
+                for page, *bbox in zip(words['page'][starts], x0, y0, x1, y1)]
+
+    def locate_chunk(self, start_idx: int, end_idx: int) -> List[Dict[str, Any]]:
+        """Highlight boxes for a chunk's token range (``start_idx``/``end_idx``)."""
+        return self.boxes(self.words_for_tokens(start_idx, end_idx))
+
+    def nbytes(self) -> int:
+        """Memory used by the arrays."""
+        return (self.words.nbytes + self.pages.nbytes
+                + self.cell_ptr.nbytes + self.cell_words.nbytes)
+
+
+def _read_chunk_ranges(path: str) -> Dict[str, Tuple[int, int]]:
+    """Map chunk id -> (start_idx, end_idx) from a chunk CSV or NDJSON file."""
+    ranges = {}
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = (json.loads(line) for line in f if line.strip()) if path.endswith('.ndjson') \
+            else csv.DictReader(f)
+        for row in rows:
+            ranges[row['chunk_id']] = (int(row['start_idx']), int(row['end_idx']))
+    return ranges
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Look up word boxes in a geometry file written with --geometry')
+    parser.add_argument('geometry', help='Geometry file (<output>.geometry.npz)')
+    parser.add_argument('--chunks', help='Chunk CSV/NDJSON file from --chunks')
+    parser.add_argument('--chunk-id', action='append', default=[],
+                        help='Chunk to locate (repeatable; default: all chunks in --chunks)')
+    parser.add_argument('--page', type=int, help='Page for --bbox')
+    parser.add_argument('--bbox', type=float, nargs=4, metavar=('X0', 'Y0', 'X1', 'Y1'),
+                        help='Print the words overlapping this box on --page')
+    args = parser.parse_args()
+
+    geometry = PageGeometry.load(args.geometry)
+
+    if args.bbox is not None:
+        if args.page is None:
+            parser.error("--bbox requires --page")
+        for index in geometry.words_in_bbox(args.page, args.bbox):
+            word = geometry.words[index]
+            print(json.dumps({'word': int(index), 'offset': int(word['offset']),
+                              'length': int(word['length']),
+                              'bbox': [round(float(word[key]), 2) for key in ('x0', 'y0', 'x1', 'y1')],
+                              'font': geometry.font(int(word['font_id'])),
+                              'size': round(float(word['size']), 2)}))
+    elif args.chunks is not None:
+        ranges = _read_chunk_ranges(args.chunks)
+        missing = [chunk_id for chunk_id in args.chunk_id if chunk_id not in ranges]
+        if missing:
+            parser.error(f"Unknown chunk id(s): {', '.join(missing)}")
+        for chunk_id in args.chunk_id or ranges:
+            print(json.dumps({'chunk_id': chunk_id, 'boxes': geometry.locate_chunk(*ranges[chunk_id])}))
+    else:
+        words = len(geometry)
+        print(f"{args.geometry}: {words} words on {len(geometry.pages)} pages, "
+              f"{len(geometry.fonts)} fonts, {geometry.nbytes() / 1e6:.1f} MB "
+              f"({geometry.nbytes() / max(words, 1):.0f} bytes/word incl. index)")
+
+
+if __name__ == '__main__':
+    main()
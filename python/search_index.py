@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Prebuilt BM25/TF-IDF inverted index for chunk retrieval.
+
+reg.hybrid_search recomputes IDF over the whole TF-IDF matrix on every
+query and finds each query term with a linear vocabulary scan. This index
+moves that work to ingest time: terms are hashed into a fixed number of
+buckets (no vocabulary lookup at query time), postings are stored as a
+compressed sparse term-by-document matrix, and IDF and BM25 document-length
+norms are precomputed whenever documents are added. A query reads only the
+posting rows of its own terms.
+
+Layout (append-only; each add writes a new segment):
+
+    index/
+      index.json                 parameters, document count, segment list
+      documents.json             document keys (chunk ids) by document id
+      vocabulary.json            term -> bucket for every indexed term
+      stats/
+        generation.npy           write generation, equal to index.json's
+        doc_length.npy           tokens per document (0 once replaced)
+        live.npy                 False for documents replaced by a later add
+        df.npy                   document frequency per bucket
+        idf_bm25.npy             log((N - df + 0.5) / (df + 0.5) + 1)
+        idf_tfidf.npy            log(N / max(1, df)), as in reg.ta_features
+        norms.npy                k1 * (1 - b + b * doc_length / avgdl)
+      segment-00000/             sparse bucket x document matrix (CSR)
+        buckets.npy              sorted bucket ids (row labels)
+        indptr.npy               row start offsets into doc_ids/tf
+        doc_ids.npy              document ids (column indices)
+        tf.npy                   term frequencies (values)
+
+Terms are lowercased, split on non-alphanumerics, and stop words and words
+shorter than 3 characters are dropped, following reg.ta_features
+(without lemmatization). Scores match reg.hybrid_search_improved's BM25
+(k1=1.5, b=0.75) up to hash collisions and lemmatization.
+
+index.json is written last, so a reader that opens the index during an add
+can find stats from that add next to the previous index.json; it compares
+their generations and retries until they agree.
+
+Usage:
+    index = SearchIndex('index/')
+    index.add_documents((chunk['chunk_id'], chunk['text']) for chunk in chunks)
+    for key, score in index.query('own funds requirements for credit risk', k=10):
+        ...
+
+    python search_index.py build index/ CRR.chunks.csv CRD.chunks.csv
+    python search_index.py query index/ "liquidity coverage ratio" -k 10
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy not installed. Run: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+INDEX_FORMAT = 'regclassifier-search-index'
+INDEX_VERSION = 2
+
+# Hash buckets for the vocabulary (2^20 keeps collisions rare for regulatory text)
+DEFAULT_BUCKETS = 1 << 20
+
+# BM25 parameters from reg.hybrid_search_improved
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+# reg.ta_features removeShortWords(docsTok, 3)
+MIN_TERM_LENGTH = 3
+
+SCORINGS = ('bm25', 'tfidf')
+
+# Attempts, OPEN_RETRY_SECONDS apart, to open an index whose stats and
+# index.json come from different writes (an add is in progress)
+OPEN_ATTEMPTS = 20
+OPEN_RETRY_SECONDS = 0.05
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me might more most must my
+myself no nor not now of off on once only or other our ours ourselves out over
+own same shall she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up upon
+us very was we were what when where whether which while who whom why will with
+within without would you your yours yourself yourselves
+""".split())
+
+_TERM = re.compile(r'[a-z0-9]+')
+
+_STATS = ('doc_length', 'live', 'df', 'idf_bm25', 'idf_tfidf', 'norms')
+_SEGMENT = ('buckets', 'indptr', 'doc_ids', 'tf')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stop words and short words."""
+    return [term for term in _TERM.findall(text.lower())
+            if len(term) >= MIN_TERM_LENGTH and term not in STOP_WORDS]
+
+
+def term_bucket(term: str, buckets: int = DEFAULT_BUCKETS) -> int:
+    """Stable hash bucket of a term (the same in every process and run)."""
+    digest = hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % buckets
+
+
+def _save_arrays(directory: Path, arrays: Dict[str, np.ndarray]):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(directory / f"{name}.npy", array)
+
+
+def _load_arrays(directory: Path, names: Tuple[str, ...], mmap: bool) -> Dict[str, np.ndarray]:
+    return {name: np.load(directory / f"{name}.npy", mmap_mode='r' if mmap else None)
+            for name in names}
+
+
+def _write_json(path: Path, value: Any):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class SearchIndex:
+    """Sparse inverted index with precomputed BM25 and TF-IDF weights."""
+
+    def __init__(self, path: str, buckets: int = DEFAULT_BUCKETS,
+                 k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        """
+        Open an index directory, creating an empty index if it has none.
+
+        Args:
+            path: Index directory.
+            buckets, k1, b: Parameters for a new index (an existing index
+                keeps the ones it was built with).
+        """
+        self.path = Path(path)
+        if (self.path / 'index.json').exists():
+            self._load()
+        else:
+            self.manifest = {'format': INDEX_FORMAT, 'version': INDEX_VERSION,
+                             'buckets': buckets, 'k1': k1, 'b': b, 'generation': 0,
+                             'documents': 0, 'live_documents': 0, 'segments': []}
+            self.keys = []
+            self.stats = {
+                'doc_length': np.zeros(0, dtype=np.int32),
+                'live': np.zeros(0, dtype=bool),
+                'df': np.zeros(buckets, dtype=np.int32),
+            }
+            self._update_weights()
+
+        self.segments = [_load_arrays(self.path / name, _SEGMENT, mmap=True)
+                         for name in self.manifest['segments']]
+        self._key_ids = {key: doc_id for doc_id, key in enumerate(self.keys)
+                         if self.stats['live'][doc_id]}
+
+    def _load(self):
+        """Read index.json, documents and stats from the same write."""
+        for _ in range(OPEN_ATTEMPTS):
+            with open(self.path / 'index.json', 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            if self.manifest.get('format') != INDEX_FORMAT:
+                raise ValueError(f"Not a search index: {self.path}")
+            if self.manifest.get('version') != INDEX_VERSION:
+                raise ValueError(f"Unsupported search index version "
+                                 f"{self.manifest.get('version')} in {self.path}")
+            try:
+                with open(self.path / 'documents.json', 'r', encoding='utf-8') as f:
+                    keys = json.load(f)
+                self.stats = _load_arrays(self.path / 'stats', _STATS, mmap=True)
+                # Read last: stats only move forward, so a match covers the arrays
+                generation = int(np.load(self.path / 'stats' / 'generation.npy'))
+            except FileNotFoundError:
+                generation = None  # stats directory being swapped
+            # documents.json is append-only and written before index.json
+            documents = self.manifest['documents']
+            if generation == self.manifest['generation'] and len(keys) >= documents:
+                self.keys: List[str] = keys[:documents]
+                return
+            time.sleep(OPEN_RETRY_SECONDS)
+        raise ValueError(f"Search index {self.path} is being written or was left half-written: "
+                         f"stats generation {generation} does not match index.json generation "
+                         f"{self.manifest['generation']}")
+
+    def __len__(self) -> int:
+        return self.manifest['live_documents']
+
+    @property
+    def buckets(self) -> int:
+        return self.manifest['buckets']
+
+    def _update_weights(self):
+        """Recompute IDF and BM25 norms after the document set changed."""
+        df = self.stats['df']
+        live = self.stats['live']
+        lengths = self.stats['doc_length'].astype(np.float64)
+        count = int(live.sum())
+        avgdl = lengths[live].mean() if count else 1.0
+        k1, b = self.manifest['k1'], self.manifest['b']
+
+        self.stats['idf_bm25'] = np.log((count - df + 0.5) / (df + 0.5) + 1).astype(np.float32)
+        self.stats['idf_tfidf'] = np.log(max(count, 1) / np.maximum(1, df)).astype(np.float32)
+        self.stats['norms'] = (k1 * (1 - b + b * lengths / max(avgdl, 1e-9))).astype(np.float32)
+        self.manifest['live_documents'] = count
+        self.manifest['avg_doc_length'] = round(float(avgdl), 4)
+
+    def _retire(self, doc_ids: List[int], df: np.ndarray):
+        """Remove replaced documents from document frequencies."""
+        retired = np.asarray(doc_ids, dtype=np.int64)
+        for segment in self.segments:
+            mask = np.isin(segment['doc_ids'], retired)
+            if mask.any():
+                rows = np.repeat(segment['buckets'], np.diff(segment['indptr']))
+                np.subtract.at(df, rows[mask], 1)
+        self.stats['live'][retired] = False
+        self.stats['doc_length'][retired] = 0
+
+    def add_documents(self, documents: Iterable[Tuple[str, str]]) -> int:
+        """
+        Index ``(key, text)`` pairs as a new segment.
+
+        A key that is already indexed (e.g. a re-extracted chunk) replaces
+        the earlier document.
+
+        Returns:
+            Number of documents added.
+        """
+        first = len(self.keys)
+        keys, lengths, token_buckets = [], [], []
+        cache: Dict[str, int] = {}
+        for key, text in documents:
+            keys.append(key)
+            terms = tokenize(text)
+            lengths.append(len(terms))
+            for term in terms:
+                bucket = cache.get(term)
+                if bucket is None:
+                    bucket = cache[term] = term_bucket(term, self.buckets)
+                token_buckets.append(bucket)
+        if not keys:
+            return 0
+
+        # Writable copies; the loaded stats are memory-mapped read-only
+        self.stats = {name: np.array(self.stats[name]) for name in ('doc_length', 'live', 'df')}
+        df = self.stats['df']
+        replaced = [self._key_ids[key] for key in keys if key in self._key_ids]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Duplicate document keys in one add")
+        if replaced:
+            self._retire(replaced, df)
+
+        # One (bucket, document) pair per token; unique pairs are postings and
+        # their multiplicities term frequencies, already in CSR order
+        token_docs = np.repeat(np.arange(first, first + len(keys), dtype=np.int64), lengths)
+        pairs, tf = np.unique(np.array(token_buckets, dtype=np.int64) * (1 << 40) + token_docs,
+                              return_counts=True)
+        rows = pairs >> 40
+        buckets, sizes = np.unique(rows, return_counts=True)
+        segment = {
+            'buckets': buckets,
+            'indptr': np.concatenate(([0], np.cumsum(sizes))).astype(np.int64),
+            'doc_ids': pairs & ((1 << 40) - 1),
+            'tf': tf.astype(np.float32),
+        }
+        np.add.at(df, buckets, sizes)
+
+        self.stats['doc_length'] = np.concatenate(
+            (self.stats['doc_length'], np.array(lengths, dtype=np.int32)))
+        self.stats['live'] = np.concatenate((self.stats['live'], np.ones(len(keys), dtype=bool)))
+        self._update_weights()
+
+        name = f"segment-{len(self.manifest['segments']):05d}"
+        self.keys.extend(keys)
+        self._key_ids.update((key, first + offset) for offset, key in enumerate(keys))
+        self.manifest['documents'] = len(self.keys)
+        self.manifest['segments'].append(name)
+        self.segments.append(segment)
+        self._write(new_segment=(name, segment), vocabulary=cache)
+        return len(keys)
+
+    def _write(self, new_segment=None, vocabulary=None, replace_segments=False):
+        """
+        Write stats, documents, vocabulary and index.json (last, atomically).
+
+        Stats and index.json carry the same new generation, which readers
+        check (see _load) to detect a write in progress.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest['generation'] += 1
+        staging = Path(tempfile.mkdtemp(prefix='.index-', dir=self.path))
+        try:
+            if new_segment is not None:
+                _save_arrays(staging / new_segment[0], new_segment[1])
+            _save_arrays(staging / 'stats',
+                         {**self.stats, 'generation': np.array(self.manifest['generation'])})
+
+            if new_segment is not None:
+                os.replace(staging / new_segment[0], self.path / new_segment[0])
+            if (self.path / 'stats').exists():
+                os.replace(self.path / 'stats', staging / 'previous-stats')
+            os.replace(staging / 'stats', self.path / 'stats')
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        if vocabulary:
+            vocabulary_file = self.path / 'vocabulary.json'
+            known = {}
+            if vocabulary_file.exists():
+                with open(vocabulary_file, 'r', encoding='utf-8') as f:
+                    known = json.load(f)
+            known.update(vocabulary)
+            _write_json(vocabulary_file, known)
+        _write_json(self.path / 'documents.json', self.keys)
+        _write_json(self.path / 'index.json', self.manifest)
+
+    def compact(self):
+        """Merge all segments into one, dropping postings of replaced documents."""
+        if len(self.segments) <= 1 and self.manifest['live_documents'] == self.manifest['documents']:
+            return
+        live = np.asarray(self.stats['live'])
+        rows, doc_ids, tf = [], [], []
+        for segment in self.segments:
+            keep = live[segment['doc_ids']]
+            rows.append(np.repeat(segment['buckets'], np.diff(segment['indptr']))[keep])
+            doc_ids.append(np.asarray(segment['doc_ids'])[keep])
+            tf.append(np.asarray(segment['tf'])[keep])
+        rows, doc_ids, tf = np.concatenate(rows), np.concatenate(doc_ids), np.concatenate(tf)
+        order = np.lexsort((doc_ids, rows))
+        rows, doc_ids, tf = rows[order], doc_ids[order], tf[order]
+        buckets, sizes = np.unique(rows, return_counts=True)
+        merged = {
+            'buckets': buckets.astype(np.int64),
+            'indptr': np.concatenate(([0], np.cumsum(sizes))).astype(np.int64),
+            'doc_ids': doc_ids,
+            'tf': tf,
+        }
+
+        old = list(self.manifest['segments'])
+        name = f"segment-{int(old[-1].rsplit('-', 1)[1]) + 1:05d}"
+        self.stats = {name_: np.array(array) for name_, array in self.stats.items()}
+        self.manifest['segments'] = [name]
+        self.segments = [merged]
+        self._write(new_segment=(name, merged))
+        for segment_name in old:
+            shutil.rmtree(self.path / segment_name, ignore_errors=True)
+
+    def query(self, text: str, k: int = 10, scoring: str = 'bm25') -> List[Tuple[str, float]]:
+        """
+        Return the top ``k`` ``(key, score)`` pairs for a query.
+
+        Args:
+            text: Query text (tokenized like indexed documents).
+            k: Number of results.
+            scoring: ``bm25`` (reg.hybrid_search_improved) or ``tfidf``
+                (reg.hybrid_search: TF-IDF dot product with the
+                L2-normalized query vector).
+        """
+        if scoring not in SCORINGS:
+            raise ValueError(f"Unknown scoring: {scoring} (expected one of {', '.join(SCORINGS)})")
+        terms = tokenize(text)
+        if not terms or not self.segments:
+            return []
+        query_buckets, query_tf = np.unique(
+            np.array([term_bucket(term, self.buckets) for term in terms], dtype=np.int64),
+            return_counts=True)
+
+        if scoring == 'bm25':
+            # hybrid_search_improved adds one BM25 term per query token
+            weights = self.stats['idf_bm25'][query_buckets] * query_tf
+        else:
+            query_vector = self.stats['idf_tfidf'][query_buckets] * query_tf
+            weights = self.stats['idf_tfidf'][query_buckets] * query_vector \
+                / max(float(np.linalg.norm(query_vector)), 1e-9)
+
+        doc_parts, score_parts = [], []
+        for segment in self.segments:
+            # An add of only stop words or short tokens writes a segment with no postings
+            if not len(segment['buckets']):
+                continue
+            rows = np.searchsorted(segment['buckets'], query_buckets)
+            rows = np.minimum(rows, len(segment['buckets']) - 1)
+            present = segment['buckets'][rows] == query_buckets
+            for row, weight in zip(rows[present], weights[present]):
+                start, end = segment['indptr'][row], segment['indptr'][row + 1]
+                doc_ids = np.asarray(segment['doc_ids'][start:end])
+                tf = np.asarray(segment['tf'][start:end])
+                if scoring == 'bm25':
+                    contribution = weight * tf * (self.manifest['k1'] + 1) \
+                        / (tf + self.stats['norms'][doc_ids])
+                else:
+                    contribution = weight * tf
+                doc_parts.append(doc_ids)
+                score_parts.append(contribution)
+        if not doc_parts:
+            return []
+
+        # Accumulate over the touched documents only
+        touched, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        live = np.asarray(self.stats['live'])[touched]
+        touched, scores = touched[live], scores[live]
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.lexsort((touched[top], -scores[top]))]
+        return [(self.keys[touched[i]], float(scores[i])) for i in top]
+
+
+def read_chunks(path: str) -> Iterable[Tuple[str, str]]:
+    """Yield ``(chunk_id, text)`` from a chunk CSV or NDJSON file (``--chunks``)."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if Path(path).suffix == '.ndjson':
+            for line in f:
+                if line.strip():
+                    chunk = json.loads(line)
+                    yield chunk['chunk_id'], chunk['text']
+        else:
+            for row in csv.DictReader(f):
+                yield row['chunk_id'], row['text']
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description='Build or query a BM25/TF-IDF chunk index')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Add chunk files to an index (created if missing)')
+    build.add_argument('index', help='Index directory')
+    build.add_argument('chunks', nargs='+', help='Chunk CSV/NDJSON files from --chunks')
+    build.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS,
+                       help='Hash buckets for a new index (default: %(default)s)')
+    build.add_argument('--compact', action='store_true',
+                       help='Merge segments after adding')
+
+    query = commands.add_parser('query', help='Print the top-k chunks for a query')
+    query.add_argument('index', help='Index directory')
+    query.add_argument('text', help='Query text')
+    query.add_argument('-k', type=int, default=10, help='Results (default: %(default)s)')
+    query.add_argument('--scoring', choices=SCORINGS, default='bm25',
+                       help='Scoring function (default: %(default)s)')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = SearchIndex(args.index, buckets=args.buckets)
+        for path in args.chunks:
+            added = index.add_documents(read_chunks(path))
+            print(f"Indexed {added} chunks from {path}")
+        if args.compact:
+            index.compact()
+        print(f"Index: {len(index)} documents in {len(index.segments)} segment(s) at {args.index}")
+    else:
+        index = SearchIndex(args.index)
+        for key, score in index.query(args.text, args.k, args.scoring):
+            print(f"{score:10.4f}  {key}")
+
+
+if __name__ == '__main__':
+    main()
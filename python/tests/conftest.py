@@ -0,0 +1,57 @@
+"""
+Shared pytest setup for the Python extraction tools.
+
+The modules in python/ are scripts, not a package, so the directory is put
+on sys.path here. Fixture PDFs are generated with PyMuPDF (as
+bench_extractor.py does) instead of being checked in.
+
+Run from the repository root:
+    python -m pytest python/tests -q
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+PYTHON_DIR = Path(__file__).resolve().parent.parent
+if str(PYTHON_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_DIR))
+
+BODY = ("Institutions shall calculate the own funds requirements for credit risk "
+        "in accordance with this Chapter. Competent authorities shall ensure that "
+        "exposures are assigned to the appropriate exposure class. ")
+
+
+def write_pdf(path: Path, pages) -> Path:
+    """Write a PDF with one page per entry: a list of (x, y, text, fontsize)."""
+    fitz = pytest.importorskip('pymupdf')
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page(width=595, height=842)
+        for x, y, text, size in lines:
+            page.insert_text((x, y), text, fontsize=size, fontname='helv')
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def column_lines(x: float, words: str, width: int = 45, top: float = 60,
+                 leading: float = 12.5, size: float = 9):
+    """Wrap text into (x, y, line, size) entries for one column."""
+    import textwrap
+    return [(x, top + index * leading, line, size)
+            for index, line in enumerate(textwrap.wrap(words, width))]
+
+
+@pytest.fixture(scope='session')
+def sample_pdf(tmp_path_factory) -> Path:
+    """Six pages: two-column, single-column and mixed, with distinct text per page."""
+    pages = []
+    for number in range(1, 7):
+        text = f"Page {number} marker. " + BODY * 4
+        if number % 2:
+            pages.append(column_lines(50, text) + column_lines(310, BODY * 4 + f"right {number}."))
+        else:
+            pages.append(column_lines(60, text * 2, width=90))
+    return write_pdf(tmp_path_factory.mktemp('pdf') / 'sample.pdf', pages)
@@ -0,0 +1,91 @@
+"""Article/Annex segmentation of streamed page text."""
+
+from article_segmenter import (ARTICLE_FIELDS, ArticleWriter, classify_line, compare_articles,
+                               read_articles, segment_pages, text_hash)
+
+PAGES = [
+    {'page_number': 1, 'text': (
+        "REGULATION (EU) No 575/2013 OF THE EUROPEAN PARLIAMENT\n"
+        "Having regard to the Treaty on the Functioning of the European Union,\n"
+        "PART ONE\nGENERAL PROVISIONS\n"
+        "TITLE I\nSUBJECT MATTER, SCOPE AND DEFINITIONS\n"
+        "Article 1\nScope\n"
+        "This Regulation lays down uniform rules concerning general prudential\n")},
+    {'page_number': 2, 'text': (
+        "requirements that institutions shall comply with.\n\n"
+        "Article 2\nSupervisory powers\n"
+        "Competent authorities shall have the powers referred to in\n"
+        "Article 4\n"
+        "of this Regulation.\n"
+        "CHAPTER 2\nLevel of application\n"
+        "Article 4\nDefinitions\n"
+        "1. For the purposes of this Regulation, the following definitions apply:\n")},
+    {'page_number': 3, 'text': (
+        "(1) 'credit institution' means an undertaking;\n"
+        "ANNEX I\nClassification of off-balance sheet items\n"
+        "1. Full risk:\n"
+        "Article 4\n"
+        "Amended definitions quoted by an amending act.\n")},
+]
+
+
+def records():
+    return list(segment_pages('CRR', PAGES))
+
+
+def test_records_follow_headings_across_pages():
+    result = records()
+    assert [record['article_id'] for record in result] == [
+        'PRE_CRR', 'ART_CRR_1', 'ART_CRR_2', 'ART_CRR_4', 'ANX_CRR_I', 'ART_CRR_4_2']
+    assert all(tuple(record) == ARTICLE_FIELDS for record in result)
+
+    first = result[1]
+    assert first['heading'] == 'Scope'
+    assert (first['page_start'], first['page_end']) == (1, 2)
+    assert first['part'] == 'PART ONE GENERAL PROVISIONS'
+    assert first['title'] == 'TITLE I SUBJECT MATTER, SCOPE AND DEFINITIONS'
+    assert first['text'].endswith("institutions shall comply with.")
+
+
+def test_cross_reference_is_not_a_heading():
+    article_2 = records()[2]
+    assert "referred to in\nArticle 4\nof this Regulation." in article_2['text']
+    assert article_2['chapter'] == ''
+
+
+def test_structure_levels_reset_below_a_new_heading_and_at_annexes():
+    result = records()
+    assert result[3]['chapter'] == 'CHAPTER 2 Level of application'
+    assert result[3]['part'].startswith('PART ONE')
+    annex = result[4]
+    assert (annex['kind'], annex['number'], annex['heading']) == ('annex', 'I', 'Classification of off-balance sheet items')
+    assert annex['part'] == annex['chapter'] == ''
+
+
+def test_text_hash_ignores_line_wrapping():
+    assert text_hash("own funds\nrequirements") == text_hash("own  funds requirements ")
+    assert text_hash("own funds") != text_hash("own fund")
+
+
+def test_classify_line():
+    assert classify_line("Article 92a") == ('article', '92a')
+    assert classify_line("ANNEX") == ('annex', '')
+    assert classify_line("Sub-section 3") == ('subsection', '3')
+    assert classify_line("Article 92 applies") is None
+
+
+def test_writer_round_trip_and_compare(tmp_path):
+    path = tmp_path / 'CRR.articles.ndjson'
+    with ArticleWriter(str(path)) as writer:
+        for record in records():
+            writer.write(record)
+    old = list(read_articles(str(path)))
+    assert old == records()
+
+    edited = [dict(page) for page in PAGES]
+    edited[0]['text'] = edited[0]['text'].replace("uniform rules", "uniform\nrules")
+    edited[1]['text'] = edited[1]['text'].replace("Supervisory powers", "Supervisory powers\nNew sentence.")
+    statuses = {row['new_id'] or row['old_id']: row['status']
+                for row in compare_articles(old, segment_pages('CRR', edited))}
+    assert statuses['ART_CRR_1'] == 'SAME'
+    assert statuses['ART_CRR_2'] == 'CHANGED'
@@ -0,0 +1,67 @@
+"""BatchRunner process handling and per-file outputs."""
+
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+import batch_runner
+import extract_regulatory_pdf as erp
+
+
+def _sleep():
+    time.sleep(60)
+
+
+def test_kill_falls_back_before_the_child_has_its_own_group():
+    # A child that has not called setsid yet has no process group of its
+    # own, so killpg fails; the child must still be killed and reaped
+    process = multiprocessing.Process(target=_sleep)
+    process.start()
+    started = time.perf_counter()
+    batch_runner._kill(process)
+    assert not process.is_alive()
+    assert time.perf_counter() - started < batch_runner.KILL_JOIN_TIMEOUT
+
+
+def _report_then_hang(input_file, output_file, *args, **kwargs):
+    # A non-daemon thread keeps the child from exiting after it reports
+    threading.Thread(target=_sleep).start()
+    return {'input': input_file, 'output': output_file, 'pages': 1, 'cache_hit': False,
+            'timings': None}
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='the patched job function must reach the child')
+def test_child_that_hangs_after_reporting_is_killed(tmp_path, monkeypatch):
+    monkeypatch.setattr(erp, '_process_file', _report_then_hang)
+    monkeypatch.setattr(batch_runner, 'KILL_JOIN_TIMEOUT', 0.5)
+    source = tmp_path / 'doc.pdf'
+    source.write_bytes(b'%PDF-1.4')
+    runner = batch_runner.BatchRunner(str(tmp_path / 'manifest.jsonl'), verbose=False)
+
+    started = time.perf_counter()
+    reports = runner.run([(str(source), str(tmp_path / 'doc.json'), {})])
+    assert time.perf_counter() - started < 10
+    assert [report['pages'] for report in reports] == [1]
+
+
+def test_failed_file_leaves_no_chunk_or_article_files(tmp_path):
+    bad = tmp_path / 'bad.pdf'
+    bad.write_bytes(b'not a pdf')
+    output = tmp_path / 'bad.json'
+    chunking = {'doc_id': 'DOC_1', 'chunk_tokens': 300, 'overlap': 80}
+    with pytest.raises(Exception):
+        erp._process_file(str(bad), str(output), 'json', include_formulas=False, verbose=False,
+                          chunking=chunking, articles='DOC_1')
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['bad.pdf']
+
+
+def test_side_outputs_are_published_on_success(tmp_path, sample_pdf):
+    output = tmp_path / 'doc.ndjson'
+    chunking = {'doc_id': 'DOC_1', 'chunk_tokens': 50, 'overlap': 10}
+    erp._process_file(str(sample_pdf), str(output), 'ndjson', include_formulas=False,
+                      verbose=False, chunking=chunking, articles='DOC_1')
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'doc.articles.ndjson', 'doc.chunks.csv', 'doc.ndjson']
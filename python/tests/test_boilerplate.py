@@ -0,0 +1,60 @@
+"""Running header, footer and page-number stripping (--strip-boilerplate)."""
+
+import pytest
+
+import extract_regulatory_pdf as erp
+from conftest import BODY, column_lines, write_pdf
+
+HEADER = "Official Journal of the European Union L 176/{}"
+
+
+@pytest.fixture(scope='module')
+def journal_pdf(tmp_path_factory):
+    """Six pages with a running header and a page number, two-column and full-width."""
+    pages = []
+    for number in range(1, 7):
+        text = f"Article {number} " + BODY * 3
+        if number % 2:
+            body = column_lines(50, text, top=90) + column_lines(310, BODY * 3, top=90)
+        else:
+            body = column_lines(60, text + " See L 176/1 of 2013.", width=90, top=90)
+        pages.append([(150, 30, HEADER.format(number), 9)] + body + [(290, 815, str(number), 9)])
+    return write_pdf(tmp_path_factory.mktemp('journal') / 'journal.pdf', pages)
+
+
+def _extract(pdf, **options):
+    return erp.RegulatoryPDFExtractor(str(pdf), verbose=False, **options).extract_all()
+
+
+def test_detects_header_and_page_number(journal_pdf):
+    extractor = erp.RegulatoryPDFExtractor(str(journal_pdf), verbose=False, strip_boilerplate=True)
+    patterns = extractor.detect_boilerplate()
+    top = {pattern['text'] for pattern in patterns if pattern['position'] == 'top'}
+    bottom = [pattern['text'] for pattern in patterns if pattern['position'] == 'bottom']
+    # the whole header and the halves a two-column crop splits it into
+    assert top == {HEADER.format(1), "Official Journal of the European Union", "L 176/1"}
+    assert bottom == ["1"]
+    assert all(pattern['pages'] == 6 for pattern in patterns)
+
+
+@pytest.mark.parametrize('backend', erp.BACKENDS)
+def test_strips_boilerplate_and_keeps_body(journal_pdf, backend):
+    plain = _extract(journal_pdf, backend=backend)
+    stripped = _extract(journal_pdf, backend=backend, strip_boilerplate=True)
+
+    assert all("Official Journal" in page['text'] for page in plain['pages'])
+    for page in stripped['pages']:
+        number = page['page_number']
+        assert "Official Journal" not in page['text']
+        assert str(number) not in page['text'].split("\n")
+        assert f"Article {number}" in page['text']
+        assert page['metadata']['boilerplate']['chars_saved'] > 0
+    # the same citation inside the body text is not an edge line
+    assert "L 176/1 of 2013" in stripped['pages'][1]['text']
+
+    summary = stripped['metadata']['boilerplate']
+    assert summary['pages'] == 6 and summary['removed_lines'] >= 12
+    assert summary['chars_saved'] == sum(page['metadata']['boilerplate']['chars_saved']
+                                         for page in stripped['pages'])
+    assert len(stripped['full_text']) < len(plain['full_text'])
+    assert 'boilerplate' not in plain['metadata']
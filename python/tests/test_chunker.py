@@ -0,0 +1,76 @@
+"""chunker.py windows against a line-by-line port of +reg/chunk_text.m."""
+
+import re
+
+import pytest
+
+from chunker import StreamingChunker, chunk_pages, tokenize, token_offsets, window_bounds
+
+
+def reg_chunk_text(doc_id, text, chunk_tokens, overlap):
+    """Port of reg.chunk_text for one document."""
+    tokens = [token for token in re.sub(r'[ \f\n\r\t\v]+', ' ', text).split(' ') if token]
+    chunks = []
+    length, s = len(tokens), 1
+    while length and s <= length:
+        e = min(length, s + chunk_tokens - 1)
+        chunks.append({'chunk_id': f"CH_{doc_id}_{s}", 'doc_id': doc_id,
+                       'text': " ".join(tokens[s - 1:e]), 'start_idx': s, 'end_idx': e})
+        if e == length:
+            break
+        s = e - overlap + 1
+    return chunks
+
+
+def pages_of(*texts):
+    return [{'page_number': number, 'text': text} for number, text in enumerate(texts, start=1)]
+
+
+PAGES = pages_of("Article 1\nSubject matter\tThis Regulation lays down  uniform rules",
+                 "",
+                 "\n\n  ",
+                 " ".join(f"w{index}" for index in range(1, 238)),
+                 "concerning\fgeneral\vprudential requirements.")
+
+
+@pytest.mark.parametrize('chunk_tokens, overlap', [(300, 80), (10, 0), (10, 9), (7, 3), (1, 0), (400, 0)])
+def test_chunks_match_reg_chunk_text(chunk_tokens, overlap):
+    full_text = "\n\n".join(page['text'] for page in PAGES if page['text'].strip())
+    expected = reg_chunk_text('DOC_1', full_text, chunk_tokens, overlap)
+    chunks = list(chunk_pages('DOC_1', PAGES, chunk_tokens, overlap))
+    assert [{key: chunk[key] for key in expected[0]} for chunk in chunks] == expected
+    assert window_bounds(len(tokenize(full_text)), chunk_tokens, overlap) == [
+        (chunk['start_idx'], chunk['end_idx']) for chunk in expected]
+
+
+def test_page_spans_follow_the_tokens():
+    chunks = list(chunk_pages('DOC_1', PAGES, 10, 2))
+    # Page 1 has ten tokens; the second window crosses the two empty pages
+    assert (chunks[0]['page_start'], chunks[0]['page_end']) == (1, 1)
+    assert (chunks[1]['page_start'], chunks[1]['page_end']) == (1, 4)
+    assert chunks[-1]['page_end'] == 5
+
+
+def test_streaming_chunker_emits_full_windows_early():
+    chunker = StreamingChunker('DOC_1', 5, 1)
+    assert chunker.add_page({'page_number': 1, 'text': 'a b c'}) == []
+    emitted = chunker.add_page({'page_number': 2, 'text': 'd e f g h i'})
+    assert [chunk['chunk_id'] for chunk in emitted] == ['CH_DOC_1_1', 'CH_DOC_1_5']
+    assert [chunk['text'] for chunk in chunker.finish()] == []
+
+
+def test_empty_document_has_no_chunks():
+    assert list(chunk_pages('DOC_1', pages_of('', ' \n '))) == []
+
+
+def test_invalid_windows_are_rejected():
+    with pytest.raises(ValueError):
+        window_bounds(10, 5, 5)
+    with pytest.raises(ValueError):
+        StreamingChunker('DOC_1', 0, 0)
+
+
+def test_token_offsets_point_at_tokens():
+    text = " Article\t4\n\nDefinitions "
+    assert [text[offset:offset + len(token)]
+            for offset, token in zip(token_offsets(text), tokenize(text))] == tokenize(text)
@@ -0,0 +1,67 @@
+"""CorpusWriter/CorpusStore round trips."""
+
+import json
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import extract_regulatory_pdf as erp
+from corpus_store import CorpusWriter, CorpusStore
+from conftest import write_pdf
+
+FORMULA_PAGE = [(60, 80, "The capital requirement is calculated as follows:", 10),
+                (80, 110, "K = LGD × N(G(PD)) − PD × LGD", 10),
+                (60, 140, "where α ≤ 0.25 and σ is the asset correlation.", 10)]
+
+
+@pytest.fixture(scope='module')
+def results(sample_pdf, tmp_path_factory):
+    formula_pdf = write_pdf(tmp_path_factory.mktemp('pdf') / 'formulas.pdf', [FORMULA_PAGE] * 2)
+    return [json.loads(json.dumps(erp.RegulatoryPDFExtractor(str(pdf), verbose=False,
+                                                             backend='pymupdf').extract_all()))
+            for pdf in (sample_pdf, formula_pdf)]
+
+
+def test_round_trip_rebuilds_extract_all_results(tmp_path, results):
+    with CorpusWriter(str(tmp_path / 'corpus')) as writer:
+        ids = [writer.add(result) for result in results]
+    assert ids == [0, 1]
+
+    with CorpusStore(str(tmp_path / 'corpus')) as store:
+        assert len(store) == 2
+        assert results[1]['formulas']
+        for doc_id, result in zip(ids, results):
+            rebuilt = store.result(doc_id)
+            assert rebuilt['pages'] == result['pages']
+            assert rebuilt['formulas'] == result['formulas']
+            assert rebuilt['full_text'] == store.text(doc_id) == result['full_text']
+            assert rebuilt['metadata'] == result['metadata']
+        assert store.page(0, 3) == results[0]['pages'][2]
+
+
+def test_appends_span_shards_and_latest_name_wins(tmp_path, results):
+    path = str(tmp_path / 'corpus')
+    with CorpusWriter(path, shard_docs=1) as writer:
+        writer.add(results[0])
+        writer.add(results[1])
+    with CorpusWriter(path) as writer:
+        writer.add(results[0])
+
+    with CorpusStore(path) as store:
+        assert len(store.manifest['shards']) == 3
+        assert store.find(results[0]['filename']) == 2
+        assert [doc['filename'] for doc in store.iter_documents()] == [
+            results[0]['filename'], results[1]['filename'], results[0]['filename']]
+        assert sum(1 for _ in store.iter_pages()) == 2 * results[0]['total_pages'] + results[1]['total_pages']
+        with pytest.raises(KeyError):
+            store.document(3)
+
+
+def test_failed_batch_publishes_nothing(tmp_path, results):
+    path = str(tmp_path / 'corpus')
+    with pytest.raises(RuntimeError):
+        with CorpusWriter(path) as writer:
+            writer.add(results[0])
+            raise RuntimeError("extraction failed")
+    assert sorted(entry.name for entry in (tmp_path / 'corpus').iterdir()) == []
@@ -0,0 +1,52 @@
+"""ExtractionCache keys, hits and LRU eviction."""
+
+import os
+
+import extract_regulatory_pdf as erp
+from extraction_cache import ExtractionCache
+
+
+def _extract(pdf, **options):
+    return erp.RegulatoryPDFExtractor(str(pdf), verbose=False, **options)
+
+
+def test_cache_hits_on_same_content_and_misses_on_other_options(tmp_path, sample_pdf):
+    cache = ExtractionCache(str(tmp_path / 'cache'))
+    first = _extract(sample_pdf, cache=cache).extract_all()
+    assert first['metadata']['cache']['hit'] is False
+
+    # A copy under another name has the same content hash
+    copy = tmp_path / 'renamed.pdf'
+    copy.write_bytes(sample_pdf.read_bytes())
+    second = _extract(copy, cache=cache).extract_all()
+    assert second['metadata']['cache']['hit'] is True
+    assert second['pages'] == first['pages']
+
+    other = _extract(sample_pdf, cache=cache, strip_boilerplate=True).extract_all()
+    assert other['metadata']['cache']['hit'] is False
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ExtractionCache(str(tmp_path / 'cache'), max_bytes=10 ** 9)
+    payload = {'text': 'x' * 1000}
+    for name in ('a', 'b', 'c'):
+        cache.put(name * 64, payload)
+    assert cache.get('a' * 64) == payload     # refreshes 'a'
+
+    # Make the order deterministic regardless of filesystem timestamp resolution
+    for age, name in enumerate(('c', 'b', 'a')):
+        os.utime(cache._entry_path(name * 64), (1000 + age, 1000 + age))
+
+    cache.max_bytes = 2500
+    cache.evict()
+    assert cache.get('c' * 64) is None
+    assert cache.get('b' * 64) == payload
+    assert cache.get('a' * 64) == payload
+    assert cache.stats() == {'hits': 3, 'misses': 1}
+
+
+def test_corrupt_cache_entry_is_a_miss(tmp_path):
+    cache = ExtractionCache(str(tmp_path / 'cache'))
+    cache.put('d' * 64, {'ok': True})
+    cache._entry_path('d' * 64).write_text('{"truncated', encoding='utf-8')
+    assert cache.get('d' * 64) is None
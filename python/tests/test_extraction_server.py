@@ -0,0 +1,88 @@
+"""ExtractionServer request/response protocol and worker-crash recovery."""
+
+import os
+import json
+import signal
+import threading
+
+import pytest
+
+from extraction_server import ExtractionServer
+
+
+class Client:
+    """Collect responses the way serve_stdio/serve_socket deliver them."""
+
+    def __init__(self, server):
+        self.server = server
+        self.responses = {}
+        self._changed = threading.Condition()
+
+    def respond(self, response):
+        with self._changed:
+            self.responses[response['id']] = response
+            self._changed.notify_all()
+
+    def send(self, request, timeout=60):
+        self.server.handle_line(json.dumps(request), self.respond)
+        with self._changed:
+            assert self._changed.wait_for(lambda: request.get('id') in self.responses, timeout)
+        return self.responses[request.get('id')]
+
+
+@pytest.fixture
+def server():
+    server = ExtractionServer(workers=2, verbose=False)
+    yield server
+    server.close()
+
+
+def test_extract_to_output_and_inline(tmp_path, server, sample_pdf):
+    client = Client(server)
+    output = tmp_path / 'out.json'
+    response = client.send({'id': 1, 'input': str(sample_pdf), 'output': str(output),
+                            'format': 'json', 'backend': 'pymupdf'})
+    assert response['ok'] and response['output'] == str(output)
+    assert json.loads(output.read_text(encoding='utf-8'))['total_pages'] == 6
+
+    response = client.send({'id': 2, 'op': 'extract', 'input': str(sample_pdf), 'backend': 'pymupdf',
+                            'timings': True})
+    assert response['ok'] and response['result']['total_pages'] == 6
+    assert 'timings' in response['result']['metadata']
+
+
+def test_errors_carry_the_request_id(server, tmp_path):
+    client = Client(server)
+    assert client.send({'id': 'a', 'op': 'frobnicate'})['error'] == "Unknown op: frobnicate"
+    assert client.send({'id': 'b', 'op': 'extract'})['error'] == "Missing 'input'"
+    missing = client.send({'id': 'c', 'input': str(tmp_path / 'missing.pdf')})
+    assert not missing['ok'] and 'PDF not found' in missing['error']
+
+    server.handle_line("not json", client.respond)
+    assert client.responses[None]['error'].startswith("Invalid request")
+    server.handle_line("   ", client.respond)      # blank lines get no response
+    assert len(client.responses) == 4
+
+
+def test_health_and_shutdown(server):
+    client = Client(server)
+    health = client.send({'id': 1, 'op': 'health'})
+    assert health['status'] == 'ok' and health['workers'] == 2 and health['pool_restarts'] == 0
+    assert client.send({'id': 2, 'op': 'shutdown'})['status'] == 'shutting_down'
+    assert server.shutdown_requested.is_set()
+
+
+def test_requests_are_answered_after_a_worker_is_killed(server, sample_pdf):
+    client = Client(server)
+    request = {'input': str(sample_pdf), 'backend': 'pymupdf', 'cache': False}
+    os.kill(next(iter(server.pool._processes)), signal.SIGKILL)
+
+    # The request that meets the dead worker is answered (error or, if the
+    # pool was already rebuilt, a result); later requests succeed again
+    first = client.send({'id': 1, **request})
+    assert 'ok' in first
+    assert client.send({'id': 2, **request})['ok']
+
+    health = client.send({'id': 3, 'op': 'health'})
+    assert health['status'] == 'degraded' and health['pool_restarts'] == 1
+    assert health['active'] == 0 and health['queue_depth'] == 0
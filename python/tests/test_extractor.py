@@ -0,0 +1,93 @@
+"""Extractor output invariants: parallel runs and incremental splicing."""
+
+import json
+
+import pytest
+
+import extract_regulatory_pdf as erp
+from conftest import BODY, column_lines, write_pdf
+
+
+def _extract(pdf, **options):
+    return erp.RegulatoryPDFExtractor(str(pdf), verbose=False, **options)
+
+
+@pytest.mark.parametrize('backend', erp.BACKENDS)
+@pytest.mark.parametrize('output_format', ['json', 'text', 'ndjson'])
+def test_parallel_output_is_byte_identical(tmp_path, sample_pdf, backend, output_format):
+    outputs = []
+    for workers in (1, 3):
+        path = tmp_path / f'{workers}.{output_format}'
+        extractor = _extract(sample_pdf, backend=backend)
+        if output_format == 'json':
+            extractor.save_as_json(str(path), workers=workers)
+        elif output_format == 'text':
+            extractor.save_as_text(str(path), workers=workers)
+        else:
+            extractor.save_as_ndjson(str(path), workers=workers)
+        outputs.append(path.read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+def _versioned_pdf(path, texts):
+    return write_pdf(path, [column_lines(60, text, width=90) for text in texts])
+
+
+def test_incremental_splices_only_changed_pages(tmp_path):
+    texts = [f"Article {number} " + BODY * 3 for number in range(1, 6)]
+    old_pdf = _versioned_pdf(tmp_path / 'v1.pdf', texts)
+    # v2: page 3 edited and a new page inserted before page 5
+    new_texts = texts[:2] + ["Article 3 amended. " + BODY] + texts[3:4] + ["Article 4a " + BODY] + texts[4:]
+    new_pdf = _versioned_pdf(tmp_path / 'v2.pdf', new_texts)
+
+    old = _extract(old_pdf)
+    previous = json.loads(json.dumps(old.extract_all()))
+    manifest = old.build_manifest()
+
+    result, new_manifest = _extract(new_pdf).extract_incremental(previous, manifest)
+    full = _extract(new_pdf).extract_all()
+
+    assert result['metadata']['incremental']['changed_pages'] == [3, 5]
+    assert result['pages'] == full['pages']
+    assert result['full_text'] == full['full_text']
+    assert [page['page'] for page in new_manifest['pages']] == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize('options', [{'strip_boilerplate': True}, {'body_font_size': 20}])
+def test_incremental_with_other_options_reextracts_everything(tmp_path, sample_pdf, options):
+    old = _extract(sample_pdf)
+    previous = old.extract_all()
+    manifest = old.build_manifest()
+    result, _ = _extract(sample_pdf, **options).extract_incremental(previous, manifest)
+    assert result['metadata']['incremental']['changed_pages'] == list(range(1, 7))
+    # the estimated body size old now holds is not an option
+    result, _ = _extract(sample_pdf).extract_incremental(previous, manifest)
+    assert result['metadata']['incremental']['changed_pages'] == []
+
+
+@pytest.mark.parametrize('backend', erp.BACKENDS)
+def test_iter_pages_streams_the_extract_all_pages(sample_pdf, backend):
+    full = _extract(sample_pdf, backend=backend).extract_all()
+    pages = _extract(sample_pdf, backend=backend).iter_pages()
+    first = next(pages)
+    assert first == full['pages'][0]
+    assert [first, *pages] == full['pages']
+    assert list(_extract(sample_pdf, backend=backend).iter_pages(3, 4)) == full['pages'][2:4]
+
+
+def test_ndjson_is_one_page_record_per_line_then_a_summary(tmp_path, sample_pdf):
+    full = _extract(sample_pdf).extract_all()
+    path = tmp_path / 'doc.ndjson'
+    seen = []
+    _extract(sample_pdf).save_as_ndjson(str(path), on_page=lambda page: seen.append(page['page_number']))
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record.pop('type') for record in records] == ['page'] * 6 + ['summary']
+    assert records[:-1] == full['pages']
+    assert seen == list(range(1, 7))
+
+    summary = records[-1]
+    assert (summary['filename'], summary['total_pages']) == ('sample.pdf', 6)
+    expected = {key: value for key, value in full['metadata'].items() if key != 'cache'}
+    assert summary['metadata'] == expected
@@ -0,0 +1,53 @@
+"""Formula candidate detection and expression grouping on PyMuPDF span dictionaries."""
+
+import pytest
+
+import extract_regulatory_pdf as erp
+
+
+def span(text, size=10.0, x=0.0, width=None):
+    width = width if width is not None else 5 * len(text)
+    return {'text': text, 'size': size, 'font': 'F0', 'bbox': (x, 100.0, x + width, 110.0)}
+
+
+def blocks(*lines):
+    return [{'type': 0, 'lines': [{'spans': list(spans)} for spans in lines]}]
+
+
+def candidates(sample_pdf, body_size, *lines):
+    extractor = erp.RegulatoryPDFExtractor(str(sample_pdf), verbose=False, body_font_size=body_size)
+    return extractor._formula_candidates(blocks(*lines), 1)
+
+
+def test_spans_on_a_line_are_grouped_into_one_expression(sample_pdf):
+    line = [span("K = LGD × N(", x=0), span("-0.5", size=6, x=60), span(" + ", x=80),
+            span("√R", x=95), span(")", x=105)]
+    (formula,) = candidates(sample_pdf, 10, line)
+    # Short operands are kept only between candidates, so the trailing ")" is not
+    assert formula['text'] == "K = LGD × N(-0.5 + √R"
+    assert formula['spans'] == 4
+    assert formula['bbox'] == [0.0, 100.0, 105.0, 110.0]
+    assert formula['size'] == 10
+
+
+def test_long_prose_ends_an_expression(sample_pdf):
+    prose = "Institutions shall apply the formula in paragraph 1 to every exposure."
+    line = [span("α ≤ 0.25"), span(prose), span("σ")]
+    assert [formula['text'] for formula in candidates(sample_pdf, 10, line)] == ["α ≤ 0.25", "σ"]
+
+
+def test_small_script_needs_a_preceding_expression(sample_pdf):
+    assert candidates(sample_pdf, 10, [span("2", size=6), span("text")]) == []
+
+
+@pytest.mark.parametrize('body_size, size, found', [
+    (10, 9.5, True),
+    (10, 8.8, False),     # 0.9 x 10 = 9
+    (12, 10.2, True),     # 0.9 x 12 = 10.8, capped at the original 9
+    (12, 8.5, False),
+    (8, 7.5, True),       # 0.9 x 8 = 7.2
+    (8, 7.0, False),
+])
+def test_equation_size_cutoff_is_capped_at_nine_points(sample_pdf, body_size, size, found):
+    formulas = candidates(sample_pdf, body_size, [span("EL = PD * LGD * EAD", size=size)])
+    assert bool(formulas) is found
@@ -0,0 +1,85 @@
+"""MinHash/LSH near-duplicate clustering (near_duplicates.py)."""
+
+import csv
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import near_duplicates
+from near_duplicates import (MinHasher, find_near_duplicates, lsh_bands, write_clusters,
+                             write_collapsed)
+
+ARTICLE = ("Institutions shall at all times satisfy the following own funds requirements "
+           "a Common Equity Tier 1 capital ratio of 4.5 percent a Tier 1 capital ratio of "
+           "6 percent and a total capital ratio of 8 percent of the total risk exposure amount "
+           "calculated in accordance with paragraphs 3 and 4 of this Article")
+OTHER = ("The competent authority shall publish on its website the list of institutions "
+         "that have been granted permission to use the internal ratings based approach "
+         "together with the date of each permission and the exposure classes covered")
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.8, 0.9])
+def test_lsh_bands_put_the_s_curve_near_the_threshold(threshold):
+    bands, rows = lsh_bands(threshold, 128)
+    assert bands * rows <= 128
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.15
+
+
+def test_stricter_thresholds_use_longer_bands():
+    assert lsh_bands(0.9, 128)[1] > lsh_bands(0.5, 128)[1]
+
+
+def test_signatures_do_not_depend_on_batching(monkeypatch):
+    hasher = MinHasher(64, 3)
+    texts = [ARTICLE, "", OTHER, "short", ARTICLE.replace("8 percent", "10 percent")]
+    shingle_sets = [hasher.shingles(text) for text in texts]
+    together = hasher.signatures(shingle_sets)
+
+    monkeypatch.setattr(near_duplicates, '_BATCH_SHINGLES', 7)
+    batched = hasher.signatures(shingle_sets)
+    alone = np.vstack([hasher.signatures([shingles]) for shingles in shingle_sets])
+    assert np.array_equal(together, batched) and np.array_equal(together, alone)
+    assert (together[1] == np.iinfo(np.uint32).max).all()     # no shingles, never matched
+    assert len(shingle_sets[3]) == 1                          # shorter than a shingle
+
+
+def test_signature_agreement_estimates_jaccard():
+    hasher = MinHasher(256, 1)
+    words = [f"w{index}" for index in range(100)]
+    # 60 shared of 100 distinct words: Jaccard 0.6
+    a, b = " ".join(words[:80]), " ".join(words[20:])
+    signatures = hasher.signatures([hasher.shingles(a), hasher.shingles(b)])
+    assert abs((signatures[0] == signatures[1]).mean() - 0.6) < 0.1
+
+
+def write_chunks(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['chunk_id', 'doc_id', 'text'])
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_near_duplicates_cluster_across_files(tmp_path):
+    first = write_chunks(tmp_path / 'a.chunks.csv', [
+        {'chunk_id': 'CH_A_1', 'doc_id': 'A', 'text': ARTICLE},
+        {'chunk_id': 'CH_A_2', 'doc_id': 'A', 'text': OTHER}])
+    second = write_chunks(tmp_path / 'b.chunks.csv', [
+        {'chunk_id': 'CH_B_1', 'doc_id': 'B', 'text': ARTICLE.upper() + "."},
+        {'chunk_id': 'CH_B_2', 'doc_id': 'B', 'text': ARTICLE.replace("4.5 percent", "5 percent")},
+        {'chunk_id': 'CH_B_3', 'doc_id': 'B', 'text': ""}])
+
+    found = find_near_duplicates([first, second], threshold=0.7)
+    representative = [found['ids'][index] for index in found['representative']]
+    assert representative == ['CH_A_1', 'CH_A_2', 'CH_A_1', 'CH_A_1', 'CH_B_3']
+    assert found['similarity'][2] == 1.0 and 0.7 <= found['similarity'][3] < 1.0
+
+    write_clusters(str(tmp_path / 'clusters.csv'), found)
+    with open(tmp_path / 'clusters.csv', encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['cluster'] for row in rows] == ['1', '2', '1', '1', '3']
+    assert [row['is_representative'] for row in rows] == ['1', '1', '0', '0', '1']
+
+    write_collapsed(str(tmp_path / 'unique.ndjson'), found)
+    assert len((tmp_path / 'unique.ndjson').read_text(encoding='utf-8').splitlines()) == 3
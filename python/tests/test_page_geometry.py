@@ -0,0 +1,85 @@
+"""Word geometry collected during extraction and its lookups."""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import extract_regulatory_pdf as erp
+from chunker import chunk_pages
+from page_geometry import PageGeometry
+
+
+def _geometry(pdf, workers=1, **options):
+    extractor = erp.RegulatoryPDFExtractor(str(pdf), verbose=False, geometry=True, **options)
+    result = extractor.extract_all(workers=workers)
+    return result, extractor.geometry.build(source=pdf.name)
+
+
+# Without triage, pdfplumber crops full-width pages at the centre and splits
+# words there, which whole-word geometry cannot align to
+@pytest.fixture(scope='module', params=[{'backend': 'pymupdf'},
+                                        {'backend': 'pdfplumber', 'triage': True}],
+                ids=['pymupdf', 'pdfplumber'])
+def extracted(request, sample_pdf):
+    return _geometry(sample_pdf, **request.param)
+
+
+def _word_text(geometry, result, indices):
+    texts = {page['page_number']: page['text'] for page in result['pages']}
+    words = geometry.words[indices]
+    return [texts[int(word['page'])][int(word['offset']):int(word['offset'] + word['length'])]
+            for word in words]
+
+
+def test_words_are_aligned_to_page_text(extracted):
+    result, geometry = extracted
+    assert len(geometry) > 0
+    assert (geometry.words['offset'] >= 0).mean() > 0.99
+    for page in result['pages']:
+        words = geometry.page_words(page['page_number'])
+        aligned = words[words['offset'] >= 0]
+        assert np.all(np.diff(aligned['offset']) > 0)    # text order
+
+
+def test_chunk_token_range_maps_back_to_its_words(extracted):
+    result, geometry = extracted
+    for chunk in chunk_pages('DOC_1', result['pages'], 40, 10):
+        indices = geometry.words_for_tokens(chunk['start_idx'], chunk['end_idx'])
+        assert " ".join(_word_text(geometry, result, indices)) == chunk['text']
+        boxes = geometry.locate_chunk(chunk['start_idx'], chunk['end_idx'])
+        assert {box['page'] for box in boxes} == set(range(chunk['page_start'], chunk['page_end'] + 1))
+
+
+def test_bbox_lookup_matches_a_full_scan(extracted):
+    _, geometry = extracted
+    bbox = (40, 100, 300, 200)
+    words = geometry.words
+    on_page = words['page'] == 1
+    overlap = (on_page & (words['x1'] >= bbox[0]) & (words['x0'] <= bbox[2])
+               & (words['y1'] >= bbox[1]) & (words['y0'] <= bbox[3]))
+    inside = (on_page & (words['x0'] >= bbox[0]) & (words['x1'] <= bbox[2])
+              & (words['y0'] >= bbox[1]) & (words['y1'] <= bbox[3]))
+    assert geometry.words_in_bbox(1, bbox).tolist() == np.flatnonzero(overlap).tolist()
+    assert geometry.words_in_bbox(1, bbox, contained=True).tolist() == np.flatnonzero(inside).tolist()
+    assert inside.any()
+
+
+def test_parallel_geometry_matches_serial(sample_pdf):
+    _, serial = _geometry(sample_pdf, backend='pymupdf')
+    _, parallel = _geometry(sample_pdf, workers=3, backend='pymupdf')
+    assert np.array_equal(serial.words, parallel.words)
+    assert np.array_equal(serial.pages, parallel.pages)
+    assert serial.fonts == parallel.fonts
+
+
+def test_save_and_load_round_trip(tmp_path, extracted):
+    _, geometry = extracted
+    path = tmp_path / 'doc.geometry.npz'
+    geometry.save(str(path))
+    loaded = PageGeometry.load(str(path))
+    assert np.array_equal(loaded.words, geometry.words)
+    assert np.array_equal(loaded.cell_words, geometry.cell_words)
+    assert loaded.words_in_bbox(2, (0, 0, 595, 842)).tolist() == \
+        geometry.words_in_bbox(2, (0, 0, 595, 842)).tolist()
+    with pytest.raises(KeyError):
+        loaded.page_words(99)
@@ -0,0 +1,74 @@
+"""SearchIndex add/query/replace/compact behaviour."""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import search_index
+from search_index import SearchIndex
+
+
+def test_query_ranks_matching_documents(tmp_path):
+    index = SearchIndex(str(tmp_path / 'index'))
+    index.add_documents([('a', 'liquidity coverage ratio requirements'),
+                         ('b', 'credit risk own funds'),
+                         ('c', 'liquidity liquidity buffers')])
+    keys = [key for key, _ in index.query('liquidity', k=10)]
+    assert keys == ['c', 'a']
+    assert index.query('nonexistentterm') == []
+
+
+def test_replacing_a_key_retires_the_old_document(tmp_path):
+    index = SearchIndex(str(tmp_path / 'index'))
+    index.add_documents([('a', 'liquidity coverage'), ('b', 'credit risk')])
+    index.add_documents([('a', 'market risk')])
+    assert [key for key, _ in index.query('liquidity')] == []
+    assert {key for key, _ in index.query('risk')} == {'a', 'b'}
+    assert len(index) == 2
+
+
+def test_reopened_and_compacted_index_gives_same_results(tmp_path):
+    path = str(tmp_path / 'index')
+    index = SearchIndex(path)
+    index.add_documents([('a', 'liquidity coverage ratio'), ('b', 'credit risk')])
+    index.add_documents([('c', 'liquidity risk')])
+    before = index.query('liquidity risk', k=5)
+    index.compact()
+    assert SearchIndex(path).query('liquidity risk', k=5) == pytest.approx(before)
+
+
+def test_segment_without_postings_does_not_break_queries(tmp_path):
+    # Regression: an add of only stop words / short tokens wrote an empty
+    # segment, after which every query raised IndexError
+    path = str(tmp_path / 'index')
+    index = SearchIndex(path)
+    index.add_documents([('a', 'liquidity coverage ratio')])
+    index.add_documents([('stop', 'the of and to in a')])
+    index.add_documents([('b', 'liquidity buffers')])
+    assert {key for key, _ in index.query('liquidity')} == {'a', 'b'}
+    assert {key for key, _ in SearchIndex(path).query('liquidity', scoring='tfidf')} == {'a', 'b'}
+
+    empty = SearchIndex(str(tmp_path / 'empty'))
+    empty.add_documents([('stop', 'of the')])
+    assert empty.query('liquidity') == []
+
+
+def test_reader_waits_for_index_json_to_catch_up_with_stats(tmp_path, monkeypatch):
+    path = str(tmp_path / 'index')
+    index = SearchIndex(path)
+    index.add_documents([('a', 'liquidity coverage ratio')])
+
+    # An add whose index.json has not been written yet: stats, segment and
+    # documents are a generation ahead of the manifest readers find
+    write_json = search_index._write_json
+    held = []
+    monkeypatch.setattr(search_index, '_write_json', lambda file, value: (
+        held.append((file, value)) if file.name == 'index.json' else write_json(file, value)))
+    index.add_documents([('b', 'liquidity buffers')])
+    monkeypatch.setattr(search_index, 'OPEN_RETRY_SECONDS', 0)
+    with pytest.raises(ValueError, match='generation'):
+        SearchIndex(path)
+
+    # The writer finishes while a reader is retrying
+    monkeypatch.setattr(search_index.time, 'sleep', lambda seconds: write_json(*held[0]))
+    assert {key for key, _ in SearchIndex(path).query('liquidity')} == {'a', 'b'}
@@ -0,0 +1,76 @@
+"""Page triage (--triage) and --tables auto routing."""
+
+import pytest
+
+import extract_regulatory_pdf as erp
+from conftest import BODY, column_lines
+
+
+@pytest.fixture(scope='module')
+def routed_pdf(tmp_path_factory):
+    fitz = pytest.importorskip('pymupdf')
+    doc = fitz.open()
+
+    def text_page(lines):
+        page = doc.new_page(width=595, height=842)
+        for x, y, text, size in lines:
+            page.insert_text((x, y), text, fontsize=size, fontname='helv')
+        return page
+
+    text_page(column_lines(50, BODY * 4) + column_lines(310, BODY * 4))        # two columns
+    text_page(column_lines(60, BODY * 6, width=90))                            # full width
+    page = text_page(column_lines(60, BODY, width=90))                         # ruled table
+    for row in range(4):
+        for col in range(3):
+            rect = fitz.Rect(60 + col * 150, 200 + row * 30, 210 + col * 150, 230 + row * 30)
+            page.draw_rect(rect, color=(0, 0, 0), width=0.8)
+            page.insert_text((rect.x0 + 5, rect.y0 + 20), f"r{row}c{col}", fontsize=9)
+    text_page(column_lines(60, BODY, width=90) + [(80, 200, "RWA = 12.5 * K * EAD", 10)])
+    doc.new_page(width=595, height=842)                                         # blank
+
+    path = tmp_path_factory.mktemp('pdf') / 'routed.pdf'
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_triage_page_decisions():
+    text = erp.triage_page(900, 450, 430, True, 0.0, (0, 0), False, False)
+    assert text['kind'] == 'text' and text['routes'] == {
+        'text': True, 'columns': True, 'tables': False, 'formulas': False}
+    # Text across the centre, or too little on one side, is not two-column
+    assert not erp.triage_page(900, 450, 430, False, 0.0, (0, 0), False, False)['routes']['columns']
+    assert not erp.triage_page(900, 800, 50, True, 0.0, (0, 0), False, False)['routes']['columns']
+    assert erp.triage_page(0, 0, 0, False, 0.9, (0, 0), False, False)['kind'] == 'scanned'
+    assert erp.triage_page(0, 0, 0, False, 0.0, (0, 0), False, False)['kind'] == 'blank'
+    assert erp.triage_page(50, 50, 0, False, 0.0, (5, 4), False, False)['routes']['tables']
+    assert not erp.triage_page(50, 50, 0, False, 0.0, (5, 1), False, False)['routes']['tables']
+    assert erp.triage_page(50, 50, 0, False, 0.0, (0, 0), False, True)['routes']['formulas']
+
+
+@pytest.mark.parametrize('backend', erp.BACKENDS)
+def test_triaged_pages_are_routed_by_content(routed_pdf, backend):
+    result = erp.RegulatoryPDFExtractor(str(routed_pdf), verbose=False, backend=backend,
+                                        triage=True, tables='auto').extract_all()
+    pages = result['pages']
+    routes = [page['metadata']['triage']['routes'] for page in pages]
+    assert [route['columns'] for route in routes] == [True, False, False, False, False]
+    assert [route['tables'] for route in routes] == [False, False, True, False, False]
+    assert [route['formulas'] for route in routes] == [False, False, False, True, False]
+    assert pages[4]['metadata']['triage']['kind'] == 'blank'
+
+    assert pages[0]['metadata']['layout'] == 'two_column'
+    assert pages[1]['metadata']['layout'] == 'single_column'
+    # Full-width prose is not cut at the page centre
+    assert "own funds requirements" in pages[1]['text']
+    assert [bool(page['tables']) for page in pages] == [False, False, True, False, False]
+    assert result['metadata']['triage']['routed_pages'] == {'columns': 1, 'tables': 1, 'formulas': 1}
+
+
+def test_defaults_process_every_page_in_full(routed_pdf):
+    extractor = erp.RegulatoryPDFExtractor(str(routed_pdf), verbose=False)
+    assert (extractor.triage, extractor.tables) == (False, 'always')
+    result = extractor.extract_all()
+    assert all('triage' not in page['metadata'] for page in result['pages'])
+    assert 'triage' not in result['metadata']
+    assert result['pages'][2]['tables']
@@ -0,0 +1,90 @@
+"""Paragraph-level, move-aware diff of two versions (version_diff.py)."""
+
+import csv
+import json
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from version_diff import diff_versions, split_paragraphs
+
+P = {n: f"Paragraph {n}. Institutions shall report item {n} of the own funds template "
+        f"to the competent authority together with the supporting schedule {n}."
+     for n in range(1, 9)}
+
+
+def write(directory, name, *paragraphs):
+    directory.mkdir(exist_ok=True)
+    (directory / name).write_text("\n\n".join(paragraphs) + "\n", encoding='utf-8')
+
+
+@pytest.fixture
+def versions(tmp_path):
+    old, new = tmp_path / 'old', tmp_path / 'new'
+    write(old, 'a.txt', P[1], P[2], P[3], P[4], P[5], P[6])
+    # P2 moved after P3, P4 edited, P5 deleted, P6 re-wrapped, P7 inserted
+    edited = P[4].replace("competent authority", "designated authority")
+    write(new, 'a.txt', P[1], P[3], P[2], edited, P[6].replace(" the ", "\nthe ", 1), P[7])
+    write(old, 'same.txt', P[8])
+    write(new, 'same.txt', P[8])
+    write(old, 'gone.txt', "Repealed provision on transitional arrangements for market risk.")
+    write(new, 'new.txt', "New provision on crypto-asset exposures and their risk weights.")
+    return old, new, tmp_path / 'out'
+
+
+def test_paragraphs_are_classified(versions):
+    old, new, out = versions
+    result = diff_versions(str(old), str(new), str(out))
+    assert {key: result[key] for key in ('added', 'removed', 'changed', 'same')} == \
+        {'added': 1, 'removed': 1, 'changed': 1, 'same': 1}
+
+    with open(out / 'summary.csv', encoding='utf-8', newline='') as f:
+        rows = {row['file']: row for row in csv.DictReader(f)}
+    a = rows['a.txt']
+    assert a['status'] == 'CHANGED'
+    assert {key: int(a[key]) for key in ('unchanged', 'moved', 'changed', 'inserted', 'deleted')} == \
+        {'unchanged': 3, 'moved': 1, 'changed': 1, 'inserted': 1, 'deleted': 1}
+    assert (rows['same.txt']['status'], rows['gone.txt']['status'], rows['new.txt']['status']) == \
+        ('SAME', 'REMOVED', 'ADDED')
+
+    report = json.loads((out / 'report.json').read_text(encoding='utf-8'))
+    changes = next(entry for entry in report['files'] if entry['file'] == 'a.txt')['changes']
+    # In new-text order; the deleted paragraph sorts at the position it held
+    assert [change['type'] for change in changes] == ['moved', 'changed', 'deleted', 'inserted']
+    edit = changes[1]
+    assert {'op': 'replace', 'old': 'competent', 'new': 'designated'}.items() <= edit['edits'][0].items()
+
+
+def test_patch_lists_only_changed_files(versions):
+    old, new, out = versions
+    diff_versions(str(old), str(new), str(out))
+    patch = (out / 'patch.txt').read_text(encoding='utf-8')
+    assert patch.startswith("=== a.txt ===\n")
+    assert "=== same.txt ===" not in patch
+    assert ": moved" in patch and ": inserted" in patch and ": deleted" in patch
+    assert f"+ {P[7]}" in patch
+    assert f"- {P[5]}" in patch
+
+
+def test_move_between_files(tmp_path):
+    old, new = tmp_path / 'old', tmp_path / 'new'
+    write(old, 'a.txt', P[1], P[2])
+    write(old, 'b.txt', P[3])
+    write(new, 'a.txt', P[1])
+    write(new, 'b.txt', P[3], P[2])
+    result = diff_versions(str(old), str(new), str(tmp_path / 'out'))
+    assert result['blocks']['moved'] == 1
+    assert result['blocks']['deleted'] == result['blocks']['inserted'] == 0
+
+
+def test_two_files_are_compared_whatever_their_names(tmp_path):
+    write(tmp_path, 'CRR_2024.txt', P[1], P[2])
+    write(tmp_path, 'CRR_2025.txt', P[1], P[2])
+    result = diff_versions(str(tmp_path / 'CRR_2024.txt'), str(tmp_path / 'CRR_2025.txt'),
+                           str(tmp_path / 'out'))
+    assert result['same'] == 1 and result['blocks']['unchanged'] == 2
+
+
+def test_split_paragraphs_ignores_blank_runs():
+    assert [text for _, text in split_paragraphs("one\ntwo\n\n \n\nthree")] == ["one\ntwo", "three"]
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Hash-based, move-aware diff of two regulation versions.
+
+reg.crr_diff_versions aligns files by name and compares them line by line,
+so a paragraph that moved shows up as a deletion plus an addition and a
+re-wrapped line counts as a change. This engine compares extractor output
+(text or JSON files, or two directories of them) by paragraph instead:
+
+1. Every paragraph gets a fingerprint: a polynomial rolling hash of its
+   whitespace-separated words (computed for all paragraphs at once with
+   NumPy prefix sums), so line wrapping does not matter.
+2. A hash index over the old version's fingerprints matches unchanged and
+   moved paragraphs in one pass; the longest in-order run of matches within
+   a file is unchanged, other matches (including ones from another file)
+   are moves.
+3. Remaining paragraphs are paired by shared word shingles (rolling hashes
+   of ``--shingle`` consecutive words) when their Jaccard similarity
+   reaches ``--similarity``; only these pairs get a detailed word diff.
+   Unpaired paragraphs are inserted or deleted.
+
+Outputs in ``--out-dir`` (default ``runs/crr_diff``, as in MATLAB):
+    summary.csv   file,status (ADDED/REMOVED/CHANGED/SAME) plus block counts
+    patch.txt     "=== file ===" sections with "- old" / "+ new" lines
+    report.json   every move and change with paragraph, line and page
+                  positions and fingerprints
+
+Usage:
+    python version_diff.py CRR_2024/ CRR_2025/ --out-dir runs/crr_diff
+    python version_diff.py CRR_2024.json CRR_2025.json --out-dir runs/crr_diff
+"""
+
+import re
+import csv
+import sys
+import json
+import time
+import bisect
+import difflib
+import hashlib
+import argparse
+from collections import Counter, deque
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy not installed. Run: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+DEFAULT_OUT_DIR = 'runs/crr_diff'
+
+# Words per shingle when pairing changed paragraphs
+DEFAULT_SHINGLE = 4
+
+# Minimum Jaccard similarity of shingle sets for a changed pair
+DEFAULT_SIMILARITY = 0.5
+
+# Shingles shared by more paragraphs than this (boilerplate) are not used for pairing
+MAX_SHINGLE_POSTINGS = 64
+
+# Odd multiplier (invertible modulo 2^64) for the rolling hash
+_BASE = 0x100000001B3
+_BASE_INVERSE = pow(_BASE, -1, 1 << 64)
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t\f\v\r]*\n\s*')
+_TEXT_HEADER_RULE = '=' * 60
+
+FILE_PATTERNS = ('*.txt', '*.json')
+
+
+def load_document(path: Path) -> Tuple[str, Optional[List[Tuple[int, int]]]]:
+    """
+    Read one extractor output file.
+
+    Returns:
+        ``(text, pages)`` where ``pages`` lists ``(offset, page_number)``
+        for JSON results and is None for text files.
+    """
+    if path.suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        # Rebuild full_text page by page to keep page offsets
+        parts, pages, offset = [], [], 0
+        for page in result['pages']:
+            if not page['text'].strip():
+                continue
+            if parts:
+                offset += 2
+            pages.append((offset, page['page_number']))
+            parts.append(page['text'])
+            offset += len(page['text'])
+        return "\n\n".join(parts), pages
+
+    text = path.read_text(encoding='utf-8')
+    # Drop the summary header save_as_text writes before full_text
+    head = text[:2000].split('\n')
+    if head and head[0].startswith('=== ') and _TEXT_HEADER_RULE in head:
+        rule = text.index(_TEXT_HEADER_RULE + '\n')
+        text = text[rule + len(_TEXT_HEADER_RULE) + 1:].lstrip('\n')
+    return text, None
+
+
+def collect_documents(path: str) -> Dict[str, Path]:
+    """Map file names to paths for a file or a directory of extractor outputs."""
+    root = Path(path)
+    if root.is_file():
+        return {root.name: root}
+    if not root.is_dir():
+        raise FileNotFoundError(f"Not found: {path}")
+    files = {}
+    for pattern in FILE_PATTERNS:
+        for file_path in sorted(root.glob(pattern)):
+            if not file_path.name.endswith('.manifest.json'):
+                files[file_path.name] = file_path
+    return files
+
+
+def split_paragraphs(text: str) -> List[Tuple[int, str]]:
+    """Split text at blank lines into ``(offset, paragraph)`` pairs."""
+    paragraphs, start = [], 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        if text[start:match.start()].strip():
+            paragraphs.append((start, text[start:match.start()]))
+        start = match.end()
+    if text[start:].strip():
+        paragraphs.append((start, text[start:]))
+    return paragraphs
+
+
+def _powers(base: int, count: int) -> np.ndarray:
+    powers = np.full(count, base, dtype=np.uint64)
+    powers[0] = 1
+    return np.cumprod(powers, dtype=np.uint64)
+
+
+def span_hashes(ids: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Rolling hashes of ``ids[start:end]`` for many spans at once.
+
+    The hash of a span is ``sum(ids[i] * B^-(i - start))`` modulo 2^64, so
+    equal word sequences hash equally wherever they occur. All spans are
+    computed from one prefix sum.
+    """
+    count = len(ids)
+    prefix = np.zeros(count + 1, dtype=np.uint64)
+    np.cumsum(ids * _powers(_BASE_INVERSE, count), dtype=np.uint64, out=prefix[1:])
+    return (prefix[ends] - prefix[starts]) * _powers(_BASE, count + 1)[starts]
+
+
+class WordIds:
+    """Stable 64-bit ids for words, shared by both versions."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+
+    def __call__(self, words: List[str]) -> np.ndarray:
+        ids = self._ids
+        for word in set(words).difference(ids):
+            ids[word] = int.from_bytes(
+                hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+        return np.fromiter((ids[word] for word in words), dtype=np.uint64, count=len(words))
+
+
+class _Version:
+    """All paragraphs of one version with their fingerprints and shingles."""
+
+    def __init__(self, files: Dict[str, Path], word_ids: WordIds, shingle: int):
+        self.names = list(files)
+        self.file: List[str] = []
+        self.paragraph: List[int] = []
+        self.line: List[int] = []
+        self.page: List[Optional[int]] = []
+        self.text: List[str] = []
+        self.words: List[List[str]] = []
+        self.blocks: Dict[str, List[int]] = {}
+
+        for name, path in files.items():
+            text, pages = load_document(path)
+            newlines = [match.start() for match in re.finditer('\n', text)]
+            page_offsets = [offset for offset, _ in pages] if pages else []
+            self.blocks[name] = []
+            for number, (offset, paragraph) in enumerate(split_paragraphs(text), start=1):
+                self.blocks[name].append(len(self.text))
+                self.file.append(name)
+                self.paragraph.append(number)
+                self.line.append(bisect.bisect_left(newlines, offset) + 1)
+                self.page.append(pages[bisect.bisect_right(page_offsets, offset) - 1][1]
+                                 if pages else None)
+                self.text.append(paragraph)
+                self.words.append(paragraph.split())
+
+        lengths = np.array([len(words) for words in self.words], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        ids = word_ids([word for words in self.words for word in words])
+        self.fingerprint = span_hashes(ids, starts, ends).tolist() if len(ids) else [0] * len(lengths)
+
+        # Shingles: every run of `shingle` words inside one paragraph; shorter
+        # paragraphs are a single shingle (their fingerprint)
+        block_of = np.repeat(np.arange(len(lengths)), lengths)
+        positions = np.arange(max(len(ids) - shingle + 1, 0))
+        positions = positions[block_of[positions] == block_of[positions + shingle - 1]] \
+            if len(positions) else positions
+        hashes = span_hashes(ids, positions, positions + shingle) if len(positions) else positions
+        owners = block_of[positions] if len(positions) else positions
+        bounds = np.searchsorted(owners, np.arange(len(lengths) + 1))
+        self.shingles = []
+        for block in range(len(lengths)):
+            values = hashes[bounds[block]:bounds[block + 1]].tolist()
+            self.shingles.append(set(values) if values else {self.fingerprint[block]})
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def position(self, block: int) -> Dict[str, Any]:
+        """Where a paragraph is, for the JSON report."""
+        position = {'file': self.file[block], 'paragraph': self.paragraph[block],
+                    'line': self.line[block], 'fingerprint': f"{self.fingerprint[block]:016x}"}
+        if self.page[block] is not None:
+            position['page'] = self.page[block]
+        return position
+
+    def label(self, block: int, other_file: Optional[str] = None) -> str:
+        """Human-readable position for patch headers."""
+        where = f"paragraph {self.paragraph[block]} (line {self.line[block]})"
+        if other_file is not None and self.file[block] != other_file:
+            where = f"{self.file[block]} {where}"
+        return where
+
+
+def _longest_increasing(values: List[int]) -> List[int]:
+    """Indices of a longest strictly increasing subsequence (patience sorting)."""
+    tails, tail_indices, previous = [], [], [-1] * len(values)
+    for index, value in enumerate(values):
+        slot = bisect.bisect_left(tails, value)
+        if slot == len(tails):
+            tails.append(value)
+            tail_indices.append(index)
+        else:
+            tails[slot] = value
+            tail_indices[slot] = index
+        previous[index] = tail_indices[slot - 1] if slot else -1
+    chain, index = [], tail_indices[-1] if tail_indices else -1
+    while index != -1:
+        chain.append(index)
+        index = previous[index]
+    return chain[::-1]
+
+
+def match_exact(old: _Version, new: _Version) -> Dict[int, int]:
+    """Match identical paragraphs (new block -> old block), same file first."""
+    by_file: Dict[Tuple[int, str], deque] = {}
+    by_hash: Dict[int, deque] = {}
+    for block in range(len(old)):
+        by_file.setdefault((old.fingerprint[block], old.file[block]), deque()).append(block)
+
+    matches, used = {}, set()
+    for block in range(len(new)):
+        candidates = by_file.get((new.fingerprint[block], new.file[block]))
+        if candidates:
+            matches[block] = candidates.popleft()
+            used.add(matches[block])
+
+    for block in range(len(old)):
+        if block not in used:
+            by_hash.setdefault(old.fingerprint[block], deque()).append(block)
+    for block in range(len(new)):
+        if block not in matches:
+            candidates = by_hash.get(new.fingerprint[block])
+            if candidates:
+                matches[block] = candidates.popleft()
+    return matches
+
+
+def match_similar(old: _Version, new: _Version, old_blocks: List[int], new_blocks: List[int],
+                  threshold: float) -> List[Tuple[int, int, float]]:
+    """
+    Pair changed paragraphs by shingle overlap.
+
+    Returns:
+        ``(new_block, old_block, jaccard)`` pairs, best first, each block
+        used at most once.
+    """
+    postings: Dict[int, List[int]] = {}
+    for block in old_blocks:
+        for value in old.shingles[block]:
+            postings.setdefault(value, []).append(block)
+
+    candidates = []
+    for block in new_blocks:
+        votes: Counter = Counter()
+        shingles = new.shingles[block]
+        for value in shingles:
+            posting = postings.get(value)
+            if posting and len(posting) <= MAX_SHINGLE_POSTINGS:
+                votes.update(posting)
+        for other, shared in votes.items():
+            similarity = shared / (len(shingles) + len(old.shingles[other]) - shared)
+            if similarity >= threshold:
+                candidates.append((-similarity, old.file[other] != new.file[block], block, other))
+
+    candidates.sort()
+    pairs, taken_new, taken_old = [], set(), set()
+    for negative, _, block, other in candidates:
+        if block not in taken_new and other not in taken_old:
+            taken_new.add(block)
+            taken_old.add(other)
+            pairs.append((block, other, round(-negative, 4)))
+    return pairs
+
+
+def word_edits(old_words: List[str], new_words: List[str]) -> List[Dict[str, str]]:
+    """Word-level edits between two paragraphs."""
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    return [{'op': tag, 'old': ' '.join(old_words[i1:i2]), 'new': ' '.join(new_words[j1:j2])}
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def _line_diff(old_text: str, new_text: str) -> List[str]:
+    old_lines, new_lines = old_text.split('\n'), new_text.split('\n')
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    lines = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != 'equal':
+            lines.extend(f"- {line}" for line in old_lines[i1:i2])
+            lines.extend(f"+ {line}" for line in new_lines[j1:j2])
+    return lines
+
+
+def _block_counts() -> Dict[str, int]:
+    return {'unchanged': 0, 'moved': 0, 'moved_out': 0, 'changed': 0, 'inserted': 0, 'deleted': 0}
+
+
+def diff_versions(dir_a: str, dir_b: str, out_dir: str = DEFAULT_OUT_DIR,
+                  shingle: int = DEFAULT_SHINGLE,
+                  similarity: float = DEFAULT_SIMILARITY) -> Dict[str, Any]:
+    """
+    Diff two versions and write summary.csv, patch.txt and report.json.
+
+    Args:
+        dir_a: Old version (directory of .txt/.json extractor outputs, or one file).
+        dir_b: New version (same form; two files are compared with each other
+            whatever their names).
+        out_dir: Output directory (created if missing).
+        shingle: Words per shingle for pairing changed paragraphs.
+        similarity: Minimum shingle Jaccard similarity for a changed pair.
+
+    Returns:
+        Counts like reg.crr_diff_versions (``added``, ``removed``,
+        ``changed``, ``same``, ``outdir``) plus paragraph-level ``blocks``
+        totals.
+    """
+    started = time.perf_counter()
+    files_a, files_b = collect_documents(dir_a), collect_documents(dir_b)
+    if Path(dir_a).is_file() and Path(dir_b).is_file():
+        files_a = {name: files_a[old] for name, old in zip(files_b, files_a)}
+
+    word_ids = WordIds()
+    old = _Version(files_a, word_ids, shingle)
+    new = _Version(files_b, word_ids, shingle)
+
+    matches = match_exact(old, new)
+
+    # Within a file, the longest in-order run of matches is unchanged; every
+    # other match moved
+    unchanged = set()
+    for name, blocks in new.blocks.items():
+        pairs = [(block, matches[block]) for block in blocks
+                 if block in matches and old.file[matches[block]] == name]
+        unchanged.update(pairs[index][0]
+                         for index in _longest_increasing([other for _, other in pairs]))
+
+    matched_old = set(matches.values())
+    changed = match_similar(old, new,
+                            [block for block in range(len(old)) if block not in matched_old],
+                            [block for block in range(len(new)) if block not in matches],
+                            similarity)
+    changed_new = {block for block, _, _ in changed}
+    changed_old = {other for _, other, _ in changed}
+
+    # Changes per file, with a sort key for the patch
+    names = list(dict.fromkeys(list(files_a) + list(files_b)))
+    counts = {name: _block_counts() for name in names}
+    entries: Dict[str, List[Tuple[Tuple[int, int], Dict[str, Any], List[str]]]] = \
+        {name: [] for name in names}
+
+    for block, other in matches.items():
+        name = new.file[block]
+        if block in unchanged:
+            counts[name]['unchanged'] += 1
+            continue
+        counts[name]['moved'] += 1
+        if old.file[other] != name:
+            counts[old.file[other]]['moved_out'] += 1
+        entries[name].append(((new.paragraph[block], 0),
+                              {'type': 'moved', 'a': old.position(other), 'b': new.position(block)},
+                              [f"@@ {old.label(other, name)} -> {new.label(block)}: moved"]))
+
+    for block, other, score in changed:
+        name = new.file[block]
+        counts[name]['changed'] += 1
+        if old.file[other] != name:
+            counts[old.file[other]]['moved_out'] += 1
+        entries[name].append(((new.paragraph[block], 0),
+                              {'type': 'changed', 'a': old.position(other), 'b': new.position(block),
+                               'similarity': score,
+                               'edits': word_edits(old.words[other], new.words[block])},
+                              [f"@@ {old.label(other, name)} -> {new.label(block)}: changed"]
+                              + _line_diff(old.text[other], new.text[block])))
+
+    for block in range(len(new)):
+        if block not in matches and block not in changed_new:
+            name = new.file[block]
+            counts[name]['inserted'] += 1
+            entries[name].append(((new.paragraph[block], 1),
+                                  {'type': 'inserted', 'b': new.position(block),
+                                   'text': new.text[block]},
+                                  [f"@@ {new.label(block)}: inserted"]
+                                  + [f"+ {line}" for line in new.text[block].split('\n')]))
+
+    for block in range(len(old)):
+        if block not in matched_old and block not in changed_old:
+            name = old.file[block]
+            counts[name]['deleted'] += 1
+            # Deletions sort after the new paragraph that now holds their place
+            entries[name].append(((old.paragraph[block], 2),
+                                  {'type': 'deleted', 'a': old.position(block),
+                                   'text': old.text[block]},
+                                  [f"@@ {old.label(block)}: deleted"]
+                                  + [f"- {line}" for line in old.text[block].split('\n')]))
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    summary = {'added': 0, 'removed': 0, 'changed': 0, 'same': 0}
+    totals = _block_counts()
+    report_files = []
+    with open(out / 'summary.csv', 'w', encoding='utf-8', newline='') as summary_file, \
+            open(out / 'patch.txt', 'w', encoding='utf-8') as patch:
+        writer = csv.writer(summary_file)
+        writer.writerow(['file', 'status', *totals])
+        for name in names:
+            if name not in files_b:
+                status = 'REMOVED'
+            elif name not in files_a:
+                status = 'ADDED'
+            elif any(counts[name][key] for key in totals if key != 'unchanged'):
+                status = 'CHANGED'
+            else:
+                status = 'SAME'
+            summary[status.lower()] += 1
+            for key, value in counts[name].items():
+                totals[key] += value
+            writer.writerow([name, status, *counts[name].values()])
+
+            entries[name].sort(key=lambda entry: entry[0])
+            if status == 'CHANGED':
+                patch.write(f"=== {name} ===\n")
+                for _, _, lines in entries[name]:
+                    patch.write("\n".join(lines) + "\n")
+            report_files.append({'file': name, 'status': status, 'blocks': counts[name],
+                                 'changes': [change for _, change, _ in entries[name]]})
+
+    report = {'a': str(dir_a), 'b': str(dir_b), **summary, 'blocks': totals,
+              'paragraphs': {'a': len(old), 'b': len(new)},
+              'shingle': shingle, 'similarity': similarity,
+              'seconds': round(time.perf_counter() - started, 4), 'files': report_files}
+    with open(out / 'report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    return {**summary, 'blocks': totals, 'outdir': str(out), 'seconds': report['seconds']}
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description='Move-aware paragraph diff of two regulation versions')
+    parser.add_argument('a', help='Old version: extractor output file or directory of them')
+    parser.add_argument('b', help='New version: extractor output file or directory of them')
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR,
+                        help='Directory for summary.csv, patch.txt, report.json '
+                             '(default: %(default)s)')
+    parser.add_argument('--shingle', type=int, default=DEFAULT_SHINGLE,
+                        help='Words per shingle for pairing changed paragraphs '
+                             '(default: %(default)s)')
+    parser.add_argument('--similarity', type=float, default=DEFAULT_SIMILARITY,
+                        help='Minimum shingle Jaccard similarity for a changed paragraph '
+                             '(default: %(default)s; lower pairs more, higher reports more '
+                             'insertions/deletions)')
+    args = parser.parse_args()
+
+    if args.shingle < 1:
+        parser.error("--shingle must be positive")
+    if not 0 < args.similarity <= 1:
+        parser.error("--similarity must be in (0, 1]")
+
+    try:
+        result = diff_versions(args.a, args.b, args.out_dir, args.shingle, args.similarity)
+    except (FileNotFoundError, ValueError, KeyError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    blocks = result['blocks']
+    print(f"Diff summary: added={result['added']} removed={result['removed']} "
+          f"changed={result['changed']} same={result['same']} -> {result['outdir']}")
+    print(f"Paragraphs: {blocks['unchanged']} unchanged, {blocks['moved']} moved, "
+          f"{blocks['changed']} changed, {blocks['inserted']} inserted, "
+          f"{blocks['deleted']} deleted ({result['seconds']:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
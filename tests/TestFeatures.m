@@ -60,5 +60,28 @@ classdef TestFeatures < fixtures.RegTestCase
             tc.verifyGreaterThan(simSimilar, simDissimilar, ...
                 'Semantically similar texts should have higher cosine similarity than dissimilar texts');
         end
+
+        function testPrecomputeEmbeddingsRepresentative(tc)
+            %TESTPRECOMPUTEEMBEDDINGSREPRESENTATIVE Test near-duplicate reuse.
+            %   Rows mapped to a representative get that row's embedding,
+            %   and representatives match embedding every text.
+            str = ["capital requirements apply framework provisions rules";
+                   "capital requirements apply framework provisions rules.";
+                   "market risk trading desk"];
+            C = struct('embeddings_backend','fasttext','fasttext',struct('language','en'));
+
+            E = reg.precompute_embeddings(str, C, 'Representative', [1; 1; 3]);
+            tc.verifySize(E, [3, size(E,2)], ...
+                'Embedding matrix should have one row per input text');
+            tc.verifyEqual(E(2,:), E(1,:), ...
+                'Duplicate row should reuse its representative embedding');
+
+            Efull = reg.precompute_embeddings(str, C);
+            tc.verifyEqual(E([1 3],:), Efull([1 3],:), 'AbsTol', 1e-6, ...
+                'Representative rows should match embedding every text');
+
+            tc.verifyError(@() reg.precompute_embeddings(str, C, 'Representative', [1 1]), ...
+                'reg:precompute_embeddings:RepresentativeSize');
+        end
     end
 end